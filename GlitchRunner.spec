@@ -1,11 +1,17 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
+import sys
+import subprocess
 
+# Pack the assets before bundling them; assets.pack is a build product and
+# is not in the repository, so a clean checkout has none
+subprocess.run([sys.executable, os.path.join(SPECPATH, 'build_assets.py')], check=True)
 
 a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[('assets', 'assets'), ('resource_path.py', '.')],
+    datas=[('assets.pack', '.'), ('resource_path.py', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -16,12 +22,13 @@ a = Analysis(
 )
 pyz = PYZ(a.pure)
 
+# One-dir build: the executable sits next to its libraries and assets.pack
+# in dist/GlitchRunner/, so nothing is unpacked to a temporary folder at launch
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='GlitchRunner',
     debug=False,
     bootloader_ignore_signals=False,
@@ -36,3 +43,12 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=True,
+    upx_exclude=[],
+    name='GlitchRunner',
+)
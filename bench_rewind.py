@@ -0,0 +1,100 @@
+"""
+Rewind capture benchmark for Glitch Runner
+
+Plays level 5, the level with the most enemies, headlessly with scripted
+random input and lets glitches fire as they would in play. After every
+simulation tick it captures the state into a RewindBuffer and times the
+capture on this (the game) thread. Then it rewinds through the whole
+history and times each step back, which runs once per frame while the
+rewind key is held.
+
+Fails (exit status 1) if the mean or 99th percentile capture or step back
+is over REWIND_CAPTURE_BUDGET_MS, a small fraction of the frame budget.
+
+Usage: python bench_rewind.py [--ticks N] [--seed N]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+# Add the current directory to the path to ensure imports work
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.env import init_headless
+from src.constants import REWIND_CAPTURE_BUDGET_MS, FRAME_BUDGET_MS, REWIND_SECONDS, FPS
+from src.rewind import RewindBuffer
+
+# Level with the most enemies (20)
+BENCH_LEVEL = 4
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def run_benchmark(ticks, seed):
+    """Play the level; returns capture and step back times in ms, history KB and the enemy count"""
+    import pygame
+    from src.game import Game
+    game = Game(headless=True, seed=seed, rewind=False)
+    game.handle_events([pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN)])
+    game.load_level(BENCH_LEVEL)
+    game.reset_level()
+
+    # Keep the player alive so the whole run stays in one level's history
+    game.player.invincible_duration = float('inf')
+    game.player.set_invincible()
+
+    buffer = RewindBuffer()
+    keys = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_SPACE)
+    script = random.Random(seed)
+    captures = []
+    for _ in range(ticks):
+        events = []
+        if script.random() < 0.1:
+            kind = script.choice((pygame.KEYDOWN, pygame.KEYUP))
+            events.append(pygame.event.Event(kind, key=script.choice(keys)))
+        game.handle_events(events)
+        game.update()
+
+        start = time.perf_counter()
+        buffer.capture(game)
+        captures.append((time.perf_counter() - start) * 1000)
+
+    history_kb = buffer.bytes // 1024
+    steps = []
+    while True:
+        start = time.perf_counter()
+        if not buffer.step_back(game):
+            break
+        steps.append((time.perf_counter() - start) * 1000)
+    return captures, steps, history_kb, len(game.current_level.enemies)
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Measure the game-thread cost of capturing rewind history")
+    parser.add_argument('--ticks', type=int, default=REWIND_SECONDS * FPS * 3, help="simulation ticks to capture")
+    parser.add_argument('--seed', type=int, default=1, help="session seed")
+    args = parser.parse_args()
+
+    init_headless()
+    captures, steps, history_kb, enemies = run_benchmark(args.ticks, args.seed)
+
+    print(f"Level {BENCH_LEVEL + 1}: {enemies} enemies, {args.ticks} ticks captured, "
+          f"{len(steps)} stepped back ({history_kb} KB of history)")
+    failed = False
+    for name, times in (('Capture', captures), ('Step back', steps)):
+        ordered = sorted(times)
+        mean = sum(ordered) / len(ordered)
+        p99 = percentile(ordered, 0.99)
+        print(f"{name}: mean {mean:.3f} ms, p99 {p99:.3f} ms, max {ordered[-1]:.3f} ms "
+              f"(budget {REWIND_CAPTURE_BUDGET_MS} ms of a {FRAME_BUDGET_MS} ms frame)")
+        if mean > REWIND_CAPTURE_BUDGET_MS or p99 > REWIND_CAPTURE_BUDGET_MS:
+            print(f"FAIL: {name.lower()} is over budget")
+            failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Startup time check for Glitch Runner
+
+Launches the game in fresh processes with --profile-startup, which exit
+after the first menu frame, and prints the time each phase took. Interpreter
+start-up is the time from launching the process to main.py starting to time
+itself. The quality preset is passed on the command line so the one-time
+calibration benchmark is not part of the measurement.
+
+Fails (exit status 1) if the median launch takes longer than
+STARTUP_BUDGET_MS, or if the game does not start. With --headless the game
+draws to SDL's dummy video and audio drivers, so the check runs on CI
+machines without a display or sound card. Slower CI machines can pass their
+own --budget.
+
+Usage: python bench_startup.py [--runs N] [--headless] [--budget MS]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+# Add the current directory to the path to ensure imports work
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.constants import STARTUP_BUDGET_MS, DEFAULT_QUALITY
+from src.startup import REPORT_PREFIX
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def launch(headless=False):
+    """Start the game once; returns (wall ms, phases) up to its first frame"""
+    command = [sys.executable, os.path.join(GAME_DIR, 'main.py'), '--profile-startup', '--quality', DEFAULT_QUALITY]
+    env = dict(os.environ)
+    if headless:
+        env.update(SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy')
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=GAME_DIR, env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    for line in result.stdout.splitlines():
+        if line.startswith(REPORT_PREFIX):
+            report = json.loads(line[len(REPORT_PREFIX):])
+            break
+    else:
+        raise RuntimeError(f"The game did not report its startup:\n{result.stdout}{result.stderr}")
+
+    # Whatever the game did not time itself is interpreter start-up and exit
+    phases = [('interpreter', wall_ms - report['total_ms'])] + [tuple(phase) for phase in report['phases']]
+    return wall_ms, phases
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Measure the time from launch to the first menu frame")
+    parser.add_argument('--runs', type=int, default=5, help="number of launches")
+    parser.add_argument('--headless', action='store_true', help="launch without a display or sound device (CI)")
+    parser.add_argument('--budget', type=float, default=STARTUP_BUDGET_MS, help="median launch time allowed, in ms")
+    args = parser.parse_args()
+
+    # The first launch may fill the sound cache; the median ignores it
+    try:
+        runs = sorted((launch(args.headless) for _ in range(args.runs)), key=lambda run: run[0])
+    except RuntimeError as e:
+        print(f"FAIL: {e}")
+        return 1
+    wall_ms, phases = runs[len(runs) // 2]
+
+    print(f"Median of {args.runs} launches:")
+    for phase, ms in phases:
+        print(f"  {phase:<12} {ms:8.1f} ms")
+    print(f"  {'total':<12} {wall_ms:8.1f} ms (budget {args.budget:g} ms)")
+
+    if wall_ms > args.budget:
+        print("FAIL: startup is over budget")
+        return 1
+    print("OK")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Telemetry overhead benchmark for Glitch Runner
+
+Records a stream of gameplay-like events into a Telemetry buffer while its
+background writer drains it to a temporary directory, and times every
+record() call on this (the game) thread. Then it reads the files back to
+check that every event that was not dropped reached disk.
+
+Fails (exit status 1) if the mean or 99th percentile cost per event is over
+TELEMETRY_EVENT_BUDGET_US, or if events were lost.
+
+Usage: python bench_telemetry.py [--events N] [--format jsonl|binary]
+"""
+import os
+import sys
+import time
+import glob
+import argparse
+import tempfile
+
+# Add the current directory to the path to ensure imports work
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.constants import TELEMETRY_EVENT_BUDGET_US, TELEMETRY_CAPACITY, TELEMETRY_FORMAT
+from src.telemetry import Telemetry, FRAME, DEATH, GLITCH, read_telemetry
+
+BATCH = 64  # Events timed together, to keep the timer's own cost out of the numbers
+
+def run_benchmark(events, file_format, directory):
+    """Record events and return (per-batch costs in us per event, telemetry)"""
+    # Small files so the run also exercises rotation
+    telemetry = Telemetry(enabled=True, directory=directory, file_format=file_format,
+                          file_bytes=256 * 1024, max_files=1000)
+    telemetry.start({'benchmark': True})
+
+    costs = []
+    frame = 0
+    while frame * BATCH < events:
+        # Let the writer catch up as it would between frames, without
+        # timing the wait
+        if telemetry.pending > TELEMETRY_CAPACITY // 2:
+            telemetry.wake.set()
+            while telemetry.pending > TELEMETRY_CAPACITY // 4:
+                time.sleep(0.001)
+
+        start = time.perf_counter()
+        for i in range(BATCH // 4):
+            telemetry.record(FRAME, frame, 100, 3.5)
+            telemetry.record(DEATH, frame, 100, 400, 300, 1, 2)
+            telemetry.record(GLITCH, frame, 100, 5)
+            telemetry.record(FRAME, frame, 100, 4.25)
+        costs.append((time.perf_counter() - start) * 1e6 / BATCH)
+        frame += 1
+
+    telemetry.close(frame, 100)
+    return costs, telemetry
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Measure the game-thread cost of recording telemetry")
+    parser.add_argument('--events', type=int, default=200000, help="number of events to record")
+    parser.add_argument('--format', choices=('jsonl', 'binary'), default=TELEMETRY_FORMAT,
+                        help="telemetry file format (default: the game's)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        costs, telemetry = run_benchmark(args.events, args.format, directory)
+
+        # Everything recorded, less what was dropped, must be on disk
+        paths = sorted(glob.glob(os.path.join(directory, 'telemetry-*')))
+        on_disk = sum(len(read_telemetry(path)[1]) for path in paths)
+        size = sum(os.path.getsize(path) for path in paths)
+
+    costs.sort()
+    mean = sum(costs) / len(costs)
+    p99 = costs[min(len(costs) - 1, int(len(costs) * 0.99))]
+    recorded = telemetry.written
+
+    print(f"Format: {args.format}")
+    print(f"Events: {recorded} recorded, {telemetry.dropped} dropped, {on_disk} read back "
+          f"from {len(paths)} files ({size // 1024} KB)")
+    print(f"Cost per event: mean {mean:.2f} us, p99 {p99:.2f} us, max {costs[-1]:.2f} us "
+          f"(budget {TELEMETRY_EVENT_BUDGET_US} us)")
+
+    failed = False
+    if mean > TELEMETRY_EVENT_BUDGET_US or p99 > TELEMETRY_EVENT_BUDGET_US:
+        print("FAIL: recording is over budget")
+        failed = True
+    if on_disk != recorded or telemetry.dropped:
+        print("FAIL: events were lost")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+"""
+Asset pack builder for Glitch Runner
+
+Packs the images, sounds and fonts in assets/ into a single asset pack
+(ASSET_PACK_FILE) that the game memory-maps at launch instead of opening
+each file. The executable builds ship only the pack.
+
+Usage: python build_assets.py [--output PATH]
+"""
+import os
+import sys
+import argparse
+
+# Add the current directory to the path to ensure imports work
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.constants import ASSET_PACK_FILE
+from src.assets import build_pack
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Pack the game assets into a single file")
+    parser.add_argument('--output', default=os.path.join(GAME_DIR, ASSET_PACK_FILE), help="asset pack to write")
+    args = parser.parse_args()
+
+    manifest = build_pack(os.path.join(GAME_DIR, 'assets'), args.output)
+    data_bytes = sum(size for offset, size, kind in manifest.values())
+    print(f"Packed {len(manifest)} assets ({data_bytes // 1024} KB) into {args.output} "
+          f"({os.path.getsize(args.output) // 1024} KB)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
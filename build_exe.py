@@ -64,13 +64,21 @@ def build_executable():
         print("ERROR: PyInstaller not found. Please install it with 'pip install pyinstaller'")
         return False
     
-    # Build the executable
-    build_cmd = f"{pyinstaller_cmd} --name GlitchRunner --onefile --windowed --add-data assets:assets --add-data resource_path.py:. --clean main.py"
+    # Pack the assets so the executable carries a single asset file
+    try:
+        subprocess.run(f"{sys.executable} build_assets.py", shell=True, check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"ERROR: Packing assets failed with error code {e.returncode}")
+        return False
+    
+    # Build a one-dir executable; a one-file build would unpack everything
+    # to a temporary folder on every launch
+    build_cmd = f"{pyinstaller_cmd} --name GlitchRunner --onedir --windowed --add-data assets.pack:. --add-data resource_path.py:. --clean main.py"
     print(f"Running: {build_cmd}")
     
     try:
         subprocess.run(build_cmd, shell=True, check=True)
-        print("\nBuild successful! Executable created in the 'dist' folder.")
+        print("\nBuild successful! Executable created in the 'dist/GlitchRunner' folder.")
         return True
     except subprocess.CalledProcessError as e:
         print(f"ERROR: Build failed with error code {e.returncode}")
@@ -88,7 +96,7 @@ def main():
     
     if success:
         print("\nExecutable build complete!")
-        print("You can find your executable in the 'dist' folder.")
+        print("You can find your executable in the 'dist/GlitchRunner' folder.")
     else:
         print("\nExecutable build failed. Please check the errors above.")
     
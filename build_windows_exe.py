@@ -44,13 +44,20 @@ def build_windows_executable():
     
     # Create a spec file for PyInstaller
     spec_content = """# -*- mode: python ; coding: utf-8 -*-
+import os
+import sys
+import subprocess
+
+# Pack the assets before bundling them; assets.pack is a build product and
+# is not in the repository, so a clean checkout has none
+subprocess.run([sys.executable, os.path.join(SPECPATH, 'build_assets.py')], check=True)
 
 block_cipher = None
 
 a = Analysis(['main.py'],
              pathex=[],
              binaries=[],
-             datas=[('assets', 'assets'), ('resource_path.py', '.')],
+             datas=[('assets.pack', '.'), ('resource_path.py', '.')],
              hiddenimports=[],
              hookspath=[],
              hooksconfig={},
@@ -63,12 +70,12 @@ a = Analysis(['main.py'],
 pyz = PYZ(a.pure, a.zipped_data,
              cipher=block_cipher)
 
+# One-dir build: the executable sits next to its libraries and assets.pack
+# in dist/GlitchRunner/, so nothing is unpacked to a temporary folder at launch
 exe = EXE(pyz,
           a.scripts,
-          a.binaries,
-          a.zipfiles,
-          a.datas,  
           [],
+          exclude_binaries=True,
           name='GlitchRunner',
           debug=False,
           bootloader_ignore_signals=False,
@@ -82,19 +89,27 @@ exe = EXE(pyz,
           codesign_identity=None,
           entitlements_file=None,
           icon='assets/images/icon.ico' if os.path.exists('assets/images/icon.ico') else None)
+coll = COLLECT(exe,
+               a.binaries,
+               a.zipfiles,
+               a.datas,
+               strip=False,
+               upx=True,
+               upx_exclude=[],
+               name='GlitchRunner')
 """
     
     # Write the spec file
     with open('GlitchRunner.spec', 'w') as f:
         f.write(spec_content)
     
-    # Run PyInstaller with Wine
+    # Run PyInstaller with Wine; the spec packs the assets first
     build_cmd = "wine pyinstaller GlitchRunner.spec"
     print(f"Running: {build_cmd}")
     
     try:
         subprocess.run(build_cmd, shell=True, check=True)
-        print("\nBuild successful! Windows executable created in the 'dist' folder.")
+        print("\nBuild successful! Windows executable created in the 'dist/GlitchRunner' folder.")
         return True
     except subprocess.CalledProcessError as e:
         print(f"ERROR: Build failed with error code {e.returncode}")
@@ -112,7 +127,7 @@ def main():
     
     if success:
         print("\nWindows executable build complete!")
-        print("You can find your executable in the 'dist' folder.")
+        print("You can find your executable in the 'dist/GlitchRunner' folder.")
     else:
         print("\nWindows executable build failed. Please check the errors above.")
     
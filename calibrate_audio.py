@@ -0,0 +1,157 @@
+"""
+Audio latency calibration for Glitch Runner
+
+For each candidate mixer buffer size this plays a click through the game's
+SoundManager.play_sound many times while the main thread simulates frame
+load, and measures the onset latency: the time from the play_sound call to
+the mixer callback that mixes the click's first samples. The click is far
+shorter than any buffer, so the callback that starts mixing it also
+finishes it, and the channel end event it posts marks the onset.
+
+The audible onset follows about one buffer period later, when the device
+plays the mixed buffer, plus whatever the OS audio stack adds; pygame
+cannot observe either, so the table shows the mix onset and the period
+separately. A buffer is stable when the mixer picks a new sound up within
+one period (late callbacks are how an underrunning buffer shows up). The
+smallest stable buffer is saved to the user config and used by main.py on
+the next launch.
+
+Usage: python calibrate_audio.py [--trials N] [--dry-run]
+"""
+import os
+import sys
+import time
+import argparse
+from array import array
+
+# Add the current directory to the path to ensure imports work
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pygame
+from src.constants import AUDIO_BUFFER_CANDIDATES, FPS
+from src.audio_setup import get_audio_settings
+from src.config import update_config, CONFIG_PATH
+from src.sound_manager import SoundManager
+
+CLICK_SAMPLES = 32             # Length of the test click, well under one buffer
+CLICK_SOUND = 'calibration_click'  # Played with the default sound settings, so never rate limited
+FRAME_LOAD = 0.6               # Fraction of a frame the main thread keeps busy
+TOLERANCE_MS = 4               # Scheduling slack allowed on top of the buffer period
+TIMEOUT_MS = 1000              # Give up on a trial after this long
+
+def make_click(channels):
+    """Build a short square-wave click as a Sound"""
+    data = array('h')
+    for i in range(CLICK_SAMPLES):
+        value = 8000 if (i // 8) % 2 else -8000
+        data.extend([value] * channels)
+    return pygame.mixer.Sound(buffer=data.tobytes())
+
+def busy_wait(seconds):
+    """Keep the main thread busy like a game frame would"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def make_sound_manager(click):
+    """Return a SoundManager on the open mixer whose only sound is the click
+
+    The game's own sounds are not loaded; the click goes through the same
+    voice pool and play_sound path as they do.
+    """
+    manager = SoundManager(enabled=False)
+    manager.setup_channels()
+    manager.sounds[CLICK_SOUND] = click
+
+    # Whichever voice play_sound picks posts an event when the click ends
+    for channels in manager.channel_groups.values():
+        for channel in channels:
+            channel.set_endevent(pygame.USEREVENT)
+    return manager
+
+def measure_buffer(settings, buffer, trials):
+    """Return per-trial onset latencies (ms) and the rate the mixer actually opened at, or None"""
+    frequency, size, channels, _ = settings
+    pygame.mixer.quit()
+    try:
+        pygame.mixer.init(frequency, size, channels, buffer)
+    except pygame.error as e:
+        print(f"  buffer {buffer}: mixer failed to open ({e})")
+        return None
+
+    frequency, _, channels = pygame.mixer.get_init()
+    manager = make_sound_manager(make_click(channels))
+
+    latencies = []
+    for _ in range(trials):
+        # Simulate a frame's worth of game work between clicks
+        busy_wait(FRAME_LOAD / FPS)
+        pygame.event.clear()
+        start = time.perf_counter()
+        channel = manager.play_sound(CLICK_SOUND)
+        if channel is None:
+            latencies.append(float(TIMEOUT_MS))
+            continue
+
+        # Wait for the mixer callback that mixes the click to post its end event
+        finished = None
+        while (time.perf_counter() - start) * 1000 < TIMEOUT_MS:
+            if pygame.event.get(pygame.USEREVENT):
+                finished = time.perf_counter()
+                break
+            time.sleep(0.0002)
+        latencies.append(float(TIMEOUT_MS) if finished is None else (finished - start) * 1000)
+
+    return latencies, frequency
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def is_stable(latencies, buffer, frequency):
+    """A buffer is stable when the mixer picks new sounds up within one period"""
+    period_ms = buffer / frequency * 1000
+    limit = period_ms + TOLERANCE_MS
+    ordered = sorted(latencies)
+    return percentile(ordered, 0.95) <= limit and ordered[-1] <= 2 * limit
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Calibrate the audio buffer size")
+    parser.add_argument('--trials', type=int, default=30, help="clicks played per buffer size")
+    parser.add_argument('--dry-run', action='store_true', help="report only, do not save the result")
+    args = parser.parse_args()
+
+    pygame.display.init()  # The event queue needs the video subsystem
+    settings = get_audio_settings()
+
+    print("=== Glitch Runner Audio Calibration ===")
+    print("Onset latency from play_sound to the mixer; add about one period for the device")
+    print(f"{'buffer':>8} {'period':>8} {'avg':>8} {'p95':>8} {'max':>8}  result")
+    chosen = None
+    for buffer in AUDIO_BUFFER_CANDIDATES:
+        measured = measure_buffer(settings, buffer, args.trials)
+        if measured is None:
+            continue
+        latencies, frequency = measured
+        ordered = sorted(latencies)
+        stable = is_stable(latencies, buffer, frequency)
+        print(f"{buffer:>8} {buffer / frequency * 1000:>6.1f}ms "
+              f"{sum(ordered) / len(ordered):>6.1f}ms {percentile(ordered, 0.95):>6.1f}ms "
+              f"{ordered[-1]:>6.1f}ms  {'ok' if stable else 'underrun'}")
+        if stable and chosen is None:
+            chosen = buffer
+
+    pygame.quit()
+
+    if chosen is None:
+        print("\nNo buffer size was stable; keeping the current setting.")
+        return 1
+
+    print(f"\nSmallest stable buffer: {chosen} samples")
+    if not args.dry_run:
+        update_config('audio', {'buffer': chosen})
+        print(f"Saved to {CONFIG_PATH}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Gameplay determinism check for Glitch Runner
+
+Plays the same scripted session (seeded random key presses) headlessly under
+several configurations and compares the per-tick gameplay state hashes (see
+src/state_hash.py). The session is run without drawing and then drawn at
+every quality preset; drawing must never change gameplay, so every run has
+to match the first one.
+
+It also checks the bot environments: every instance of a VectorEnv must step
+exactly like a standalone GlitchRunnerEnv seeded with seed + i. That holds
+however many instances there are and across automatic episode resets.
+
+To check that a change leaves gameplay alone, save the hashes before making
+it and compare against them after:
+
+    python check_determinism.py --save before.json
+    (make the change)
+    python check_determinism.py --baseline before.json
+
+Fails (exit status 1) at the first run that diverges, reporting the tick.
+
+Usage: python check_determinism.py [--ticks N] [--seed N] [--envs N] [--save FILE] [--baseline FILE]
+"""
+import os
+import sys
+import json
+import random
+import argparse
+
+# Add the current directory to the path to ensure imports work
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.env import init_headless, GlitchRunnerEnv, VectorEnv, ACTIONS
+from src.constants import QUALITY_ORDER
+from src.state_hash import encode_hashes, decode_hashes, first_divergence
+
+# Keys pressed and released at random by the scripted session
+SESSION_KEYS = ('K_LEFT', 'K_RIGHT', 'K_SPACE')
+
+def play_session(ticks, seed, quality=None):
+    """Play the scripted session and return its state hashes; draws each frame if quality is set"""
+    import pygame
+    from src.game import Game
+    game = Game(headless=True, seed=seed, quality=quality, hash_state=True, rewind=False)
+    keys = [getattr(pygame, name) for name in SESSION_KEYS]
+
+    # The script has a generator of its own so it presses the same keys in every run
+    script = random.Random(seed)
+    for tick in range(ticks):
+        events = []
+        # Enter starts the game and skips the game over and level complete screens
+        if tick % 120 == 0:
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN))
+        if script.random() < 0.1:
+            kind = script.choice((pygame.KEYDOWN, pygame.KEYUP))
+            events.append(pygame.event.Event(kind, key=script.choice(keys)))
+        game.handle_events(events)
+        game.update()
+        if quality:
+            game.render()
+    return game.state_hashes
+
+def env_actions(seed, steps):
+    """Scripted bot actions for one environment instance"""
+    script = random.Random(seed)
+    return [script.randrange(len(ACTIONS)) for _ in range(steps)]
+
+def check_vector_env(num_envs, steps, seed):
+    """Return the first (instance, step) where a VectorEnv instance differs from a standalone env, or None"""
+    vector = VectorEnv(num_envs, seed=seed)
+    vector.reset(seed)
+    actions = [env_actions(seed + i, steps) for i in range(num_envs)]
+    vector_obs = []
+    for step in range(steps):
+        obs, rewards, dones, infos = vector.step([actions[i][step] for i in range(num_envs)])
+        vector_obs.append(obs.tobytes())
+
+    size = len(vector_obs[0]) // num_envs
+    for i in range(num_envs):
+        env = GlitchRunnerEnv(seed=seed + i)
+        env.reset(seed + i)
+        for step in range(steps):
+            obs, reward, done, info = env.step(actions[i][step])
+            if done:
+                obs = env.reset()
+            if obs.tobytes() != vector_obs[step][i * size:(i + 1) * size]:
+                return i, step
+    return None
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Check that drawing and code changes leave gameplay unchanged")
+    parser.add_argument('--ticks', type=int, default=3000, help="simulation ticks per run")
+    parser.add_argument('--seed', type=int, default=1, help="session seed")
+    parser.add_argument('--envs', type=int, default=3, help="instances in the vector env check (0 skips it)")
+    parser.add_argument('--save', metavar='FILE', help="write the hashes of the first run to FILE")
+    parser.add_argument('--baseline', metavar='FILE', help="compare every run with hashes saved by --save")
+    args = parser.parse_args()
+
+    init_headless()
+    reference = play_session(args.ticks, args.seed)
+    runs = [('drawn at ' + name, name) for name in QUALITY_ORDER]
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if (baseline['ticks'], baseline['seed']) != (args.ticks, args.seed):
+            print(f"The baseline is of {baseline['ticks']} ticks with seed {baseline['seed']}; "
+                  f"run with --ticks {baseline['ticks']} --seed {baseline['seed']}")
+            return 1
+        # Compare the baseline with this tree's undrawn run first
+        runs.insert(0, ('baseline', None))
+
+    failed = False
+    for name, quality in runs:
+        if name == 'baseline':
+            hashes, compared = reference, decode_hashes(baseline['hashes'])
+        else:
+            hashes, compared = play_session(args.ticks, args.seed, quality), reference
+        tick = first_divergence(hashes, compared)
+        if tick is None:
+            print(f"OK       {name}: {len(hashes)} ticks match")
+        else:
+            print(f"DIVERGED {name}: first differs at tick {tick}")
+            failed = True
+
+    if args.envs:
+        divergence = check_vector_env(args.envs, args.ticks, args.seed)
+        if divergence is None:
+            print(f"OK       VectorEnv({args.envs}): every instance matches a standalone env")
+        else:
+            print(f"DIVERGED VectorEnv({args.envs}): instance {divergence[0]} first differs at step {divergence[1]}")
+            failed = True
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'ticks': args.ticks, 'seed': args.seed, 'hashes': encode_hashes(reference)}, f)
+        print(f"Hashes written to: {args.save}")
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
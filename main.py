@@ -3,36 +3,49 @@
 Glitch Runner - A 2D platformer game
 Version 2.0 - June 16, 2025
 """
-import pygame
 import sys
 import os
-
-# Try to import the resource_path function
-try:
-    from resource_path import resource_path
-except ImportError:
-    # If not available, define it here
-    def resource_path(relative_path):
-        """Get absolute path to resource, works for dev and for PyInstaller"""
-        try:
-            # PyInstaller creates a temp folder and stores path in _MEIPASS
-            base_path = sys._MEIPASS
-        except Exception:
-            base_path = os.path.abspath(".")
-        
-        return os.path.join(base_path, relative_path)
+import argparse
 
 # Add the current directory to the path to ensure imports work
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# Start timing the launch before pygame is imported
+from src.startup import STARTUP
+
+import pygame
 from src.game import Game
+from src.audio_setup import configure_audio
+from src.constants import QUALITY_ORDER, PIPELINED_RENDERING, DEV_MODE, TIME_SCALE, CAPTURE_FORMAT, PROFILE_FRAMES
+from src.capture import CAPTURE_FORMATS
+STARTUP.mark('imports')
 
 def main():
+    # Parse command line options
+    parser = argparse.ArgumentParser(description="Glitch Runner")
+    parser.add_argument('--record', metavar='DIR', help="record this session's inputs to DIR for replay verification")
+    parser.add_argument('--quality', choices=QUALITY_ORDER, help="graphics quality preset for this session")
+    parser.add_argument('--calibrate', action='store_true', help="re-run the graphics quality benchmark and save the result")
+    parser.add_argument('--pipelined', action='store_true', default=PIPELINED_RENDERING, help="draw each frame on a render thread while the next is simulated")
+    parser.add_argument('--dev', action='store_true', default=DEV_MODE, help="reload level data from src/level_data.py when it is saved")
+    parser.add_argument('--time-scale', type=float, default=TIME_SCALE, help="game speed; 0.5 is half speed, 2 is double speed")
+    parser.add_argument('--capture', metavar='DIR', help="capture every presented frame to DIR (F9 starts and stops capturing)")
+    parser.add_argument('--capture-format', choices=CAPTURE_FORMATS, default=CAPTURE_FORMAT, help="PNG sequence or raw RGB frame stream")
+    parser.add_argument('--profile-frames', type=int, default=PROFILE_FRAMES, help="game loop iterations profiled when F10 is pressed")
+    parser.add_argument('--profile-startup', action='store_true', help="print how long each startup phase took and exit after the first frame")
+    args = parser.parse_args()
+    
+    # Configure the mixer for low latency before pygame starts it
+    configure_audio()
+    
     # Initialize pygame
     pygame.init()
+    STARTUP.mark('pygame_init')
     
     # Create game instance
-    game = Game()
+    game = Game(record_dir=args.record, quality=args.quality, recalibrate=args.calibrate, pipelined=args.pipelined,
+                dev=args.dev, profile_startup=args.profile_startup, time_scale=args.time_scale,
+                capture_dir=args.capture, capture_format=args.capture_format, profile_frames=args.profile_frames)
     
     # Run the game
     game.run()
@@ -0,0 +1,251 @@
+"""
+Game assets and the asset pack
+
+Assets are named by their path inside the assets directory, such as
+'sounds/jump.wav'. get_assets() returns the shared Assets, which reads them
+from a single asset pack file when there is one (the built game ships only
+that file) and from the loose files in assets/ otherwise.
+
+An asset pack is one file laid out as:
+- a header: PACK_MAGIC, the format version and the manifest length
+- the manifest: JSON mapping each asset name to [offset, size, kind]
+- the asset data, each one starting on a PACK_ALIGN boundary
+
+The pack is memory-mapped, so opening it reads only the manifest. Assets are
+decoded from views into the mapping, without opening any other file.
+pygame's loaders take encoded data only as a path or a file object, so each
+view is wrapped in a PackFile: the loader's reads copy just the bytes they
+ask for, and the asset is never copied as a whole.
+Checking whether an asset exists is a manifest lookup instead of a
+filesystem probe. build_assets.py writes the pack; rebuild it after
+changing anything in assets/. Run from a source checkout, the game skips a
+pack that is older than anything in assets/, so an edited asset is never
+hidden behind a stale pack; the frozen game has no assets/ to compare with.
+"""
+import io
+import os
+import sys
+import json
+import mmap
+import struct
+import pygame
+from src.constants import ASSET_PACK_FILE
+
+# Try to import the resource_path function
+try:
+    from resource_path import resource_path
+except ImportError:
+    # If not available, define it here
+    def resource_path(relative_path):
+        """Get absolute path to resource, works for dev and for PyInstaller"""
+        try:
+            # PyInstaller creates a temp folder and stores path in _MEIPASS
+            base_path = sys._MEIPASS
+        except Exception:
+            base_path = os.path.abspath(".")
+
+        return os.path.join(base_path, relative_path)
+
+PACK_MAGIC = b'GRPK'
+PACK_VERSION = 1
+PACK_HEADER = struct.Struct('<4sII')  # Magic, version, manifest length
+PACK_ALIGN = 16
+
+# Asset kinds by file extension; other files (notes, templates) are not packed
+PACK_KINDS = {
+    '.png': 'image',
+    '.jpg': 'image',
+    '.wav': 'sound',
+    '.mp3': 'sound',
+    '.ogg': 'sound',
+    '.ttf': 'font',
+}
+
+# Directories of assets/ the game loads from
+PACK_DIRECTORIES = ('images', 'sounds', 'fonts')
+
+class AssetPack:
+    """Read-only, memory-mapped asset pack"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, length = PACK_HEADER.unpack_from(self.map, 0)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            self.map.close()
+            raise ValueError(f"{path} is not a version {PACK_VERSION} asset pack")
+        manifest = json.loads(self.map[PACK_HEADER.size:PACK_HEADER.size + length])
+        self.entries = {name: tuple(entry) for name, entry in manifest.items()}
+
+        # Assets are read front to back at launch; let the OS read ahead
+        if hasattr(self.map, 'madvise') and hasattr(mmap, 'MADV_WILLNEED'):
+            self.map.madvise(mmap.MADV_WILLNEED)
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def view(self, name):
+        """Return a memoryview of an asset's bytes"""
+        offset, size, kind = self.entries[name]
+        return memoryview(self.map)[offset:offset + size]
+
+    def close(self):
+        self.entries = {}
+        self.map.close()
+
+class PackFile(io.RawIOBase):
+    """Read-only file object over a view of an asset's bytes, for pygame's loaders"""
+
+    def __init__(self, view):
+        super().__init__()
+        self.view = view
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += len(self.view)
+        self.position = max(offset, 0)
+        return self.position
+
+    def read(self, size=-1):
+        # pygame only ever calls read, so copy the requested range straight out
+        end = len(self.view) if size is None or size < 0 else self.position + size
+        data = bytes(self.view[self.position:end])
+        self.position += len(data)
+        return data
+
+    def readinto(self, buffer):
+        data = self.view[self.position:self.position + len(buffer)]
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+def pack_names(directory):
+    """Return the names of every packable asset under an assets directory, sorted"""
+    names = []
+    for subdirectory in PACK_DIRECTORIES:
+        for root, dirs, files in os.walk(os.path.join(directory, subdirectory)):
+            for filename in files:
+                if os.path.splitext(filename)[1].lower() in PACK_KINDS:
+                    path = os.path.join(root, filename)
+                    names.append(os.path.relpath(path, directory).replace(os.sep, '/'))
+    return sorted(names)
+
+def newest_change(directory):
+    """Return the latest modification time of the packable assets and their directories"""
+    newest = 0.0
+    for subdirectory in PACK_DIRECTORIES:
+        for root, dirs, files in os.walk(os.path.join(directory, subdirectory)):
+            # A directory's time changes when files are added or removed
+            newest = max(newest, os.path.getmtime(root))
+            for filename in files:
+                if os.path.splitext(filename)[1].lower() in PACK_KINDS:
+                    newest = max(newest, os.path.getmtime(os.path.join(root, filename)))
+    return newest
+
+def pack_is_current(pack_path, directory):
+    """Return whether the game should load from the pack at pack_path"""
+    if not os.path.exists(pack_path):
+        return False
+    if getattr(sys, 'frozen', False):
+        return True
+    # Source checkout: the loose files win once any of them is newer
+    return os.path.getmtime(pack_path) >= newest_change(directory)
+
+def build_pack(directory, path):
+    """Write every packable asset under directory into an asset pack at path; returns the manifest"""
+    names = pack_names(directory)
+    sizes = [os.path.getsize(os.path.join(directory, name)) for name in names]
+
+    # Offsets depend on the manifest length, and the manifest holds the
+    # offsets, so grow the reserved space until the manifest fits in it
+    reserved = 0
+    while True:
+        offset = PACK_HEADER.size + reserved
+        manifest = {}
+        for name, size in zip(names, sizes):
+            offset += -offset % PACK_ALIGN
+            manifest[name] = [offset, size, PACK_KINDS[os.path.splitext(name)[1].lower()]]
+            offset += size
+        encoded = json.dumps(manifest, separators=(',', ':'), sort_keys=True).encode()
+        if len(encoded) <= reserved:
+            break
+        reserved = len(encoded) + 256
+
+    # Write to a temporary file first so a failed build never leaves a partial pack
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(encoded)))
+        f.write(encoded.ljust(reserved, b' '))
+        for name in names:
+            f.write(b'\0' * (manifest[name][0] - f.tell()))
+            with open(os.path.join(directory, name), 'rb') as asset:
+                f.write(asset.read())
+    os.replace(temp_path, path)
+    return manifest
+
+class Assets:
+    """Game assets, from the asset pack if there is one and from loose files otherwise"""
+
+    def __init__(self, pack_path=None, directory=None):
+        self.directory = directory or resource_path('assets')
+        pack_path = pack_path or resource_path(ASSET_PACK_FILE)
+        self.pack = AssetPack(pack_path) if pack_is_current(pack_path, self.directory) else None
+
+        # The music file being streamed, kept open while it plays
+        self.music_file = None
+
+    def exists(self, name):
+        if self.pack is not None:
+            return name in self.pack
+        return os.path.exists(os.path.join(self.directory, name))
+
+    def find(self, names):
+        """Return the first of names that exists, or None"""
+        for name in names:
+            if self.exists(name):
+                return name
+        return None
+
+    def open(self, name):
+        """Return an asset as something pygame's loaders accept: a file object or a path"""
+        if self.pack is not None:
+            return PackFile(self.pack.view(name))
+        return os.path.join(self.directory, name)
+
+    def load_image(self, name):
+        return pygame.image.load(self.open(name), name)
+
+    def load_sound(self, name):
+        return pygame.mixer.Sound(self.open(name))
+
+    def load_font(self, name, size):
+        return pygame.font.Font(self.open(name), size)
+
+    def load_music(self, name):
+        """Load a music file into the mixer's music stream"""
+        self.music_file = self.open(name)
+        pygame.mixer.music.load(self.music_file, name)
+
+# Opened on first use
+_assets = None
+
+def get_assets():
+    """Return the assets shared by the whole game"""
+    global _assets
+    if _assets is None:
+        _assets = Assets()
+    return _assets
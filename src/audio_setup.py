@@ -0,0 +1,30 @@
+"""
+Audio backend setup
+
+The mixer must be configured with pygame.mixer.pre_init() before
+pygame.init(); otherwise SDL picks a large default buffer and sounds trail
+the action that triggered them.
+"""
+import pygame
+from src.constants import AUDIO_FREQUENCY, AUDIO_SAMPLE_SIZE, AUDIO_CHANNELS, AUDIO_BUFFER
+from src.config import load_config
+
+def get_audio_settings(config=None):
+    """Return (frequency, size, channels, buffer) from the user config or defaults"""
+    if config is None:
+        config = load_config()
+    audio = config.get('audio', {})
+    return (
+        int(audio.get('frequency', AUDIO_FREQUENCY)),
+        int(audio.get('size', AUDIO_SAMPLE_SIZE)),
+        int(audio.get('channels', AUDIO_CHANNELS)),
+        int(audio.get('buffer', AUDIO_BUFFER)),
+    )
+
+def configure_audio(settings=None):
+    """Apply the audio settings; call before pygame.init()"""
+    if settings is None:
+        settings = get_audio_settings()
+    frequency, size, channels, buffer = settings
+    pygame.mixer.pre_init(frequency, size, channels, buffer)
+    return settings
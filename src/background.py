@@ -1,26 +1,32 @@
 import pygame
-import os
-import random
 import math
 from src.constants import *
+from src.render_queue import LAYER_BACKGROUND
+from src.render_scale import scaled_size
+from src.quality import QUALITY
+from src.assets import get_assets
 
 class Background:
     """Class to handle the game background with simple effects"""
     
-    def __init__(self, level_num):
+    def __init__(self, level_num, rng):
         self.level_num = level_num
         
+        # Cosmetic random stream of the game
+        self.random = rng.visual
+        
         # Try to load background image
         self.use_image = False
         self.background = None
-        bg_path = os.path.join('assets', 'images', 'backgrounds', f'level{level_num}_bg.png')
+        self.scaled_background = None
+        bg_name = f'images/backgrounds/level{level_num}_bg.png'
         
-        if os.path.exists(bg_path):
+        if get_assets().exists(bg_name):
             try:
-                self.background = pygame.image.load(bg_path).convert()
+                self.background = get_assets().load_image(bg_name).convert()
                 self.use_image = True
             except pygame.error:
-                print(f"Could not load background image: {bg_path}")
+                print(f"Could not load background image: {bg_name}")
         
         # Get background color from level data - using more neutral colors
         if level_num == 1:
@@ -34,8 +40,8 @@ class Background:
         else:  # Level 5
             self.bg_color = (50, 10, 20)  # Darker red
         
-        # Create procedural background elements
-        self.grid_size = 80  # Much larger grid for minimal visual noise
+        # Create procedural background elements (grid size comes from the
+        # quality preset)
         self.grid_color = (255, 255, 255, 2)  # Extremely transparent white
         
         # Visual elements
@@ -54,18 +60,18 @@ class Background:
         self.glitch_blocks = []
         
         # Generate horizontal lines
-        num_lines = self.level_num  # More lines for higher levels
+        num_lines = round(self.level_num * QUALITY.background_elements)  # More lines for higher levels
         for _ in range(num_lines):
-            y = random.randint(0, SCREEN_HEIGHT)
-            width = random.randint(100, 300)
-            x = random.randint(0, SCREEN_WIDTH - width)
+            y = self.random.randint(0, SCREEN_HEIGHT)
+            width = self.random.randint(100, 300)
+            x = self.random.randint(0, SCREEN_WIDTH - width)
             
             # Higher opacity for higher levels
-            opacity = random.randint(10, 20) if self.level_num < 4 else random.randint(20, 40)
+            opacity = self.random.randint(10, 20) if self.level_num < 4 else self.random.randint(20, 40)
             
             # More varied colors for levels 4-5
             if self.level_num >= 4:
-                color = (random.randint(150, 255), random.randint(150, 255), random.randint(150, 255), opacity)
+                color = (self.random.randint(150, 255), self.random.randint(150, 255), self.random.randint(150, 255), opacity)
             else:
                 color = (200, 200, 200, opacity)  # Light gray for lower levels
                 
@@ -73,29 +79,29 @@ class Background:
                 'x': x,
                 'y': y,
                 'width': width,
-                'height': 1 if self.level_num < 4 else random.randint(1, 3),
+                'height': 1 if self.level_num < 4 else self.random.randint(1, 3),
                 'color': color,
-                'lifetime': random.randint(60, 180),
+                'lifetime': self.random.randint(60, 180),
                 'age': 0
             })
         
         # Generate glitch blocks only for levels 4-5
         if self.level_num >= 4:
-            num_blocks = self.level_num - 2  # 2 for level 4, 3 for level 5
+            num_blocks = round((self.level_num - 2) * QUALITY.background_elements)  # 2 for level 4, 3 for level 5
             for _ in range(num_blocks):
-                x = random.randint(0, SCREEN_WIDTH - 50)
-                y = random.randint(0, SCREEN_HEIGHT - 50)
-                width = random.randint(10, 30)
-                height = random.randint(10, 30)
-                opacity = random.randint(15, 35)
-                color = (random.randint(150, 255), random.randint(150, 255), random.randint(150, 255), opacity)
+                x = self.random.randint(0, SCREEN_WIDTH - 50)
+                y = self.random.randint(0, SCREEN_HEIGHT - 50)
+                width = self.random.randint(10, 30)
+                height = self.random.randint(10, 30)
+                opacity = self.random.randint(15, 35)
+                color = (self.random.randint(150, 255), self.random.randint(150, 255), self.random.randint(150, 255), opacity)
                 self.glitch_blocks.append({
                     'x': x,
                     'y': y,
                     'width': width,
                     'height': height,
                     'color': color,
-                    'lifetime': random.randint(30, 120),
+                    'lifetime': self.random.randint(30, 120),
                     'age': 0
                 })
     
@@ -110,13 +116,13 @@ class Background:
                 # Levels 2-3: infrequent updates
                 if self.glitch_timer >= 180:  # Every 3 seconds
                     self.glitch_timer = 0
-                    if random.random() < 0.1:  # 10% chance
+                    if self.random.random() < 0.1:  # 10% chance
                         self.generate_elements()
             else:
                 # Levels 4-5: more frequent updates
                 if self.glitch_timer >= 90:  # Every 1.5 seconds
                     self.glitch_timer = 0
-                    if random.random() < 0.3:  # 30% chance
+                    if self.random.random() < 0.3:  # 30% chance
                         self.generate_elements()
             
             # Update glitch lines
@@ -131,48 +137,53 @@ class Background:
                 if block['age'] >= block['lifetime']:
                     self.glitch_blocks.remove(block)
     
-    def draw_procedural_background(self, surface):
+    def draw_procedural_background(self, queue):
         """Draw a procedurally generated background"""
         # Fill with base color
-        surface.fill(self.bg_color)
+        queue.fill(LAYER_BACKGROUND, self.bg_color)
+        
+        # The effect governor may drop the grid and glitch elements
+        if not QUALITY.background_detail:
+            return
+        
+        grid_size = QUALITY.grid_size
         
         # Draw grid based on level
         if self.level_num <= 3:
             # Levels 1-3: Simple grid with increasing opacity
             opacity = self.level_num + 1  # 2 for level 1, 3 for level 2, 4 for level 3
-            for x in range(0, SCREEN_WIDTH, self.grid_size):
-                pygame.draw.line(surface, (255, 255, 255, opacity), (x, 0), (x, SCREEN_HEIGHT), 1)
-            for y in range(0, SCREEN_HEIGHT, self.grid_size):
-                pygame.draw.line(surface, (255, 255, 255, opacity), (0, y), (SCREEN_WIDTH, y), 1)
+            for x in range(0, SCREEN_WIDTH, grid_size):
+                queue.line(LAYER_BACKGROUND, (255, 255, 255, opacity), (x, 0), (x, SCREEN_HEIGHT), 1, fixed=True)
+            for y in range(0, SCREEN_HEIGHT, grid_size):
+                queue.line(LAYER_BACKGROUND, (255, 255, 255, opacity), (0, y), (SCREEN_WIDTH, y), 1, fixed=True)
         
         elif self.level_num == 4:
             # Level 4: Slightly distorted grid
-            for x in range(0, SCREEN_WIDTH, self.grid_size):
+            for x in range(0, SCREEN_WIDTH, grid_size):
                 points = [(x, 0)]
-                for y in range(self.grid_size, SCREEN_HEIGHT, self.grid_size):
+                for y in range(grid_size, SCREEN_HEIGHT, grid_size):
                     offset = math.sin(y / 50 + self.glitch_timer / 15) * 3
                     points.append((x + offset, y))
-                pygame.draw.lines(surface, (255, 255, 255, 5), False, points, 1)
+                queue.lines(LAYER_BACKGROUND, (255, 255, 255, 5), points, 1, fixed=True)
             
-            for y in range(0, SCREEN_HEIGHT, self.grid_size):
+            for y in range(0, SCREEN_HEIGHT, grid_size):
                 points = [(0, y)]
-                for x in range(self.grid_size, SCREEN_WIDTH, self.grid_size):
+                for x in range(grid_size, SCREEN_WIDTH, grid_size):
                     offset = math.sin(x / 50 + self.glitch_timer / 15) * 3
                     points.append((x, y + offset))
-                pygame.draw.lines(surface, (255, 255, 255, 5), False, points, 1)
+                queue.lines(LAYER_BACKGROUND, (255, 255, 255, 5), points, 1, fixed=True)
         
         else:  # Level 5
             # Level 5: More corrupted grid
-            for x in range(0, SCREEN_WIDTH, self.grid_size):
-                for y in range(0, SCREEN_HEIGHT, self.grid_size):
-                    if random.random() < 0.7:  # 70% chance to draw each cell
+            for x in range(0, SCREEN_WIDTH, grid_size):
+                for y in range(0, SCREEN_HEIGHT, grid_size):
+                    if self.random.random() < 0.7:  # 70% chance to draw each cell
                         cell_color = (
-                            min(255, self.bg_color[0] + random.randint(0, 20)),
-                            min(255, self.bg_color[1] + random.randint(0, 20)),
-                            min(255, self.bg_color[2] + random.randint(0, 20))
+                            min(255, self.bg_color[0] + self.random.randint(0, 20)),
+                            min(255, self.bg_color[1] + self.random.randint(0, 20)),
+                            min(255, self.bg_color[2] + self.random.randint(0, 20))
                         )
-                        pygame.draw.rect(surface, cell_color, 
-                                        (x, y, self.grid_size, self.grid_size), 1)
+                        queue.rect(LAYER_BACKGROUND, cell_color, (x, y, grid_size, grid_size), 1, fixed=True)
         
         # Draw glitch lines
         for line in self.glitch_lines:
@@ -183,7 +194,7 @@ class Background:
             # Create a surface for the line with alpha
             line_surface = pygame.Surface((line['width'], line['height']), pygame.SRCALPHA)
             line_surface.fill(color)
-            surface.blit(line_surface, (line['x'], line['y']))
+            queue.blit(LAYER_BACKGROUND, line_surface, line['x'], line['y'], fixed=True)
         
         # Draw glitch blocks (only for levels 4-5)
         for block in self.glitch_blocks:
@@ -194,13 +205,19 @@ class Background:
             # Create a surface for the block with alpha
             block_surface = pygame.Surface((block['width'], block['height']), pygame.SRCALPHA)
             block_surface.fill(color)
-            surface.blit(block_surface, (block['x'], block['y']))
+            queue.blit(LAYER_BACKGROUND, block_surface, block['x'], block['y'], fixed=True)
     
-    def draw(self, surface):
-        """Draw the background"""
+    def draw(self, queue):
+        """Queue the background behind everything else"""
         if self.use_image:
-            # Use the loaded image
-            surface.blit(self.background, (0, 0))
+            # Use the loaded image, rescaled once per render scale
+            if queue.scale == 1:
+                queue.blit(LAYER_BACKGROUND, self.background, 0, 0, fixed=True)
+            else:
+                size = scaled_size(queue.scale)
+                if self.scaled_background is None or self.scaled_background.get_size() != size:
+                    self.scaled_background = pygame.transform.scale(self.background, size)
+                queue.blit(LAYER_BACKGROUND, self.scaled_background, 0, 0, fixed=True, prescaled=True)
         else:
             # Use procedurally generated background
-            self.draw_procedural_background(surface)
+            self.draw_procedural_background(queue)
@@ -0,0 +1,145 @@
+"""
+Gameplay capture
+
+Records the presented frames of a session (attract-mode footage, bug
+repros) to a directory, either as a PNG sequence or as one raw RGB frame
+stream. Either way an index.jsonl is written alongside: a header line with
+the frame size and format, then one line per frame with the simulation
+frame it shows, when it was presented and where it was written.
+
+The game thread only copies each presented frame into a surface from a
+fixed pool and queues it, which takes a fraction of a millisecond. A
+background writer converts the frame to bytes, gives the surface back to
+the pool and encodes it. PNGs are compressed with zlib, which releases the
+GIL, instead of pygame.image.save, which holds it for most of the encode.
+The writer thread runs at a lower OS priority so it only gets the CPU time
+the game leaves over. If the writer falls behind and the pool runs dry,
+frames are dropped and counted rather than making the game wait. The frame
+numbers in the index show where frames were dropped.
+"""
+import os
+import json
+import time
+import zlib
+import queue
+import struct
+import threading
+from collections import deque
+import pygame
+from src.constants import *
+
+# Key that starts and stops capturing
+CAPTURE_KEY = pygame.K_F9
+
+CAPTURE_FORMATS = ('png', 'raw')
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+def png_chunk(tag, data):
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+def encode_png(pixels, width, height, level=CAPTURE_PNG_LEVEL):
+    """Encode RGB pixel bytes as a PNG file"""
+    stride = width * 3
+    # Each row starts with its filter type; 0 leaves the row as it is
+    rows = b''.join(b'\0' + pixels[y * stride:(y + 1) * stride] for y in range(height))
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)  # 8-bit RGB
+    return (PNG_SIGNATURE + png_chunk(b'IHDR', header)
+            + png_chunk(b'IDAT', zlib.compress(rows, level)) + png_chunk(b'IEND', b''))
+
+class FrameCapture:
+    """Copies presented frames into pooled surfaces for a background writer"""
+
+    def __init__(self, directory, file_format=CAPTURE_FORMAT, size=(SCREEN_WIDTH, SCREEN_HEIGHT),
+                 pool_size=CAPTURE_POOL_SIZE):
+        if file_format not in CAPTURE_FORMATS:
+            raise ValueError(f"Unknown capture format {file_format!r}")
+        self.directory = os.path.join(directory, 'capture_' + time.strftime('%Y%m%d_%H%M%S'))
+        self.file_format = file_format
+        self.size = size
+
+        # Surfaces free to copy a frame into, and frames waiting to be written
+        self.free = deque(pygame.Surface(size) for _ in range(pool_size))
+        self.frames = queue.SimpleQueue()
+        self.captured = 0
+        self.dropped = 0
+        self.written = 0
+        self.start_time = time.perf_counter()
+
+        # Writer state
+        self.index = None
+        self.stream = None
+        self.stream_offset = 0
+        self.writer = None
+        self.error = None
+
+    def start(self):
+        """Create the capture directory and start the background writer"""
+        os.makedirs(self.directory, exist_ok=True)
+        self.index = open(os.path.join(self.directory, 'index.jsonl'), 'w')
+        width, height = self.size
+        self.index.write(json.dumps({'format': self.file_format, 'width': width, 'height': height,
+                                     'pixel_format': 'rgb24', 'fps': FPS}) + '\n')
+        if self.file_format == 'raw':
+            self.stream = open(os.path.join(self.directory, 'frames.rgb'), 'wb')
+        self.writer = threading.Thread(target=self._write_loop, name="capture", daemon=True)
+        self.writer.start()
+        print(f"Capturing frames to {self.directory}")
+
+    def capture(self, screen, frame):
+        """Queue a copy of the presented screen; drops it if every pooled surface is in use"""
+        if self.writer is None or self.error is not None:
+            return
+        try:
+            surface = self.free.popleft()
+        except IndexError:
+            self.dropped += 1
+            return
+        surface.blit(screen, (0, 0))
+        self.frames.put((frame, time.perf_counter() - self.start_time, surface))
+        self.captured += 1
+
+    def stop(self):
+        """Write every queued frame and close the files"""
+        if self.writer is None:
+            return
+        self.frames.put(None)
+        self.writer.join()
+        self.writer = None
+        self.index.close()
+        if self.stream:
+            self.stream.close()
+        if self.error is not None:
+            print(f"Capture stopped, could not write: {self.error}")
+        print(f"Captured {self.written} frames to {self.directory} ({self.dropped} dropped)")
+
+    def _write_loop(self):
+        # Run below the game thread's priority so encoding never delays a
+        # frame, where the OS lets a thread set its own (Linux)
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), CAPTURE_WRITER_NICE)
+        except (AttributeError, OSError):
+            pass
+        width, height = self.size
+        while True:
+            item = self.frames.get()
+            if item is None:
+                break
+            frame, seconds, surface = item
+            pixels = pygame.image.tobytes(surface, 'RGB')
+            self.free.append(surface)
+            try:
+                if self.file_format == 'png':
+                    location = {'file': f"frame_{self.written:06d}.png"}
+                    with open(os.path.join(self.directory, location['file']), 'wb') as f:
+                        f.write(encode_png(pixels, width, height))
+                else:
+                    location = {'offset': self.stream_offset}
+                    self.stream.write(pixels)
+                    self.stream_offset += len(pixels)
+                self.index.write(json.dumps(dict(location, frame=frame, seconds=round(seconds, 4))) + '\n')
+            except OSError as e:
+                # Capturing must never take the game down
+                self.error = e
+                break
+            self.written += 1
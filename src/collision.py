@@ -0,0 +1,121 @@
+"""
+Swept AABB collision
+
+Entities move by sweeping their rect along the frame's motion and stopping at
+the first surface they would touch, instead of moving first and then pushing
+out of whatever they overlap. Nothing can tunnel through a platform however
+fast it moves or however large the time step.
+"""
+import pygame
+
+INF = float('inf')
+
+def sweep(rect, dx, dy, obstacle):
+    """Find when a rect moving by (dx, dy) first touches an obstacle
+
+    Returns (time, normal_x, normal_y) with time in [0, 1] as a fraction of
+    the motion and the normal of the obstacle face that was hit, or None if
+    the motion does not reach it. Rects already overlapping the obstacle, or
+    only sliding along one of its faces, are not hits.
+    """
+    # Entry and exit times along x
+    if dx > 0:
+        tx_entry = (obstacle.left - rect.right) / dx
+        tx_exit = (obstacle.right - rect.left) / dx
+    elif dx < 0:
+        tx_entry = (obstacle.right - rect.left) / dx
+        tx_exit = (obstacle.left - rect.right) / dx
+    elif rect.right <= obstacle.left or rect.left >= obstacle.right:
+        return None
+    else:
+        tx_entry, tx_exit = -INF, INF
+
+    # Entry and exit times along y
+    if dy > 0:
+        ty_entry = (obstacle.top - rect.bottom) / dy
+        ty_exit = (obstacle.bottom - rect.top) / dy
+    elif dy < 0:
+        ty_entry = (obstacle.bottom - rect.top) / dy
+        ty_exit = (obstacle.top - rect.bottom) / dy
+    elif rect.bottom <= obstacle.top or rect.top >= obstacle.bottom:
+        return None
+    else:
+        ty_entry, ty_exit = -INF, INF
+
+    entry = max(tx_entry, ty_entry)
+    exit_time = min(tx_exit, ty_exit)
+    if entry >= exit_time or entry < 0 or entry > 1:
+        return None
+
+    # The later axis to start overlapping is the face that was hit
+    if tx_entry > ty_entry:
+        return entry, (-1 if dx > 0 else 1), 0
+    return entry, 0, (-1 if dy > 0 else 1)
+
+def move_and_collide(rect, dx, dy, obstacles, max_iterations=3):
+    """Move rect by whole pixels (dx, dy), stopping at and sliding along obstacles
+
+    The rect is moved in place. Returns a list of (normal_x, normal_y,
+    obstacle) for every surface hit, in the order they were hit.
+    """
+    hits = []
+    for _ in range(max_iterations):
+        if dx == 0 and dy == 0:
+            break
+
+        # Earliest contact along the remaining motion
+        first = None
+        for obstacle in obstacles:
+            hit = sweep(rect, dx, dy, obstacle)
+            if hit is not None and (first is None or hit[0] < first[0][0]):
+                first = (hit, obstacle)
+
+        if first is None:
+            rect.x += dx
+            rect.y += dy
+            break
+
+        (time, normal_x, normal_y), obstacle = first
+
+        # Move to the contact point: exactly flush on the blocked axis,
+        # truncated toward the start on the free one so nothing overlaps
+        if normal_x:
+            step_x = (obstacle.left - rect.right) if dx > 0 else (obstacle.right - rect.left)
+            step_y = int(dy * time)
+        else:
+            step_x = int(dx * time)
+            step_y = (obstacle.top - rect.bottom) if dy > 0 else (obstacle.bottom - rect.top)
+        rect.x += step_x
+        rect.y += step_y
+        hits.append((normal_x, normal_y, obstacle))
+
+        # Slide the rest of the motion along the surface
+        dx -= step_x
+        dy -= step_y
+        if normal_x:
+            dx = 0
+        else:
+            dy = 0
+    return hits
+
+def pixel_step(rect, velocity_x, velocity_y):
+    """Whole-pixel motion a rect makes for the given velocity
+
+    Matches how pygame rounds float assignments to Rect coordinates, so swept
+    movement lands on the same pixels as rect.x += velocity did.
+    """
+    moved = rect.move(0, 0)
+    moved.x += velocity_x
+    moved.y += velocity_y
+    return moved.x - rect.x, moved.y - rect.y
+
+def resting_on(rect, obstacles):
+    """Return the obstacle the rect is standing on (bottom flush with its top), if any"""
+    for obstacle in obstacles:
+        if rect.bottom == obstacle.top and rect.right > obstacle.left and rect.left < obstacle.right:
+            return obstacle
+    return None
+
+def swept_rect(previous, current):
+    """Area covered by a rect moving in a straight line between two frames"""
+    return pygame.Rect(previous).union(current)
@@ -0,0 +1,51 @@
+"""
+User configuration file
+
+Settings that differ per machine (audio buffer size, quality preset, ...)
+are stored as JSON in the user's home directory, or in the file named by the
+GLITCH_RUNNER_CONFIG environment variable. Missing or unreadable files give
+an empty configuration so the defaults in src/constants.py apply.
+"""
+import json
+import os
+
+CONFIG_PATH = os.environ.get(
+    'GLITCH_RUNNER_CONFIG',
+    os.path.join(os.path.expanduser('~'), '.glitch_runner', 'config.json')
+)
+
+# Machine-local caches (rendered audio, ...) live next to the config file
+CACHE_DIR = os.path.join(os.path.dirname(CONFIG_PATH), 'cache')
+
+# Session telemetry files (see src/telemetry.py)
+TELEMETRY_DIR = os.path.join(os.path.dirname(CONFIG_PATH), 'telemetry')
+
+# Captured gameplay frames (see src/capture.py)
+CAPTURE_DIR = os.path.join(os.path.dirname(CONFIG_PATH), 'captures')
+
+# On-demand profiles (see src/profiler.py)
+PROFILE_DIR = os.path.join(os.path.dirname(CONFIG_PATH), 'profiles')
+
+def load_config(path=CONFIG_PATH):
+    """Load the user configuration as a dictionary"""
+    try:
+        with open(path) as f:
+            config = json.load(f)
+        return config if isinstance(config, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def save_config(config, path=CONFIG_PATH):
+    """Write the user configuration, creating its directory if needed"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(config, f, indent=2, sort_keys=True)
+
+def update_config(section, values, path=CONFIG_PATH):
+    """Merge values into one section of the user configuration and save it"""
+    config = load_config(path)
+    config.setdefault(section, {}).update(values)
+    save_config(config, path)
+    return config
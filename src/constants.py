@@ -3,6 +3,23 @@ SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 FPS = 60
 
+# Display and internal render resolution
+DISPLAY_SCALED = True          # Let SDL upscale the window to fit large displays
+DYNAMIC_RESOLUTION = True      # Lower the internal render scale to hold the frame rate
+RENDER_SCALES = (1.0, 0.5)     # Internal render scales, largest first; integer ratios upscale fastest
+FRAME_BUDGET_MS = 12           # Target update + render time per frame
+RENDER_SCALE_COOLDOWN = 30     # Frames to wait after a scale change before the next
+RENDER_SCALE_HEADROOM = 0.7    # Fraction of the budget a larger scale must fit in
+PIPELINED_RENDERING = False    # Draw frame N on a render thread while frame N+1 is simulated
+
+# Effect governor (sheds effect fidelity under frame pressure, see src/governor.py)
+EFFECT_GOVERNOR = True
+GOVERNOR_COOLDOWN = 30         # Frames to let frame times settle after an adjustment
+GOVERNOR_RESTORE_RATIO = 0.6   # Restore a step once frames take under this fraction of the budget
+GOVERNOR_MAX_RESTORE_WAIT = 1800  # Longest wait before retrying a step that did not fit
+GOVERNOR_LOG_SIZE = 4          # Adjustments listed in the debug overlay
+SCANLINE_SPACING = 3           # Pixels between tinted scanlines when overlay blending is shed
+
 # Colors
 BG_COLOR = (50, 50, 50)
 PLAYER_COLOR = (0, 255, 0)
@@ -15,6 +32,21 @@ EXIT_COLOR = (0, 255, 255)    # Cyan for level exit
 DEFAULT_MUSIC_VOLUME = 0.3
 DEFAULT_SFX_VOLUME = 0.5  # Increased from 0.2 to make sound effects more audible
 
+# Audio backend settings (overridable in the user config, see src/config.py)
+AUDIO_FREQUENCY = 44100
+AUDIO_SAMPLE_SIZE = -16       # Signed 16-bit samples
+AUDIO_CHANNELS = 2
+AUDIO_BUFFER = 512            # Samples per mixer callback; smaller is lower latency
+AUDIO_BUFFER_CANDIDATES = (128, 256, 512, 1024, 2048)
+
+# Mixer channels reserved for each sound category
+SOUND_CHANNEL_GROUPS = {
+    'player': 3,   # Jumps, landings, wall slides
+    'glitch': 2,   # Glitch activations
+    'event': 2,    # Level start/complete, game completed
+    'death': 1,    # Death sounds
+}
+
 # Player settings
 PLAYER_WIDTH = 32
 PLAYER_HEIGHT = 32
@@ -27,6 +59,31 @@ MAX_FALL_SPEED = 15
 ENEMY_WIDTH = 40
 ENEMY_HEIGHT = 40
 ENEMY_SPEED = 2
+ENEMY_ANIMATION_FRAMES = 4  # Length of an enemy's animation loop, in animation time
+ENEMY_JUMP_POWER = JUMP_POWER * 0.7  # Jumpers don't jump as high as the player
+ENEMY_CHASE_RANGE = 250     # Jumpers chase a player closer than this (pixels)
+ENEMY_CHASE_JUMP_DELAY = 30 # Frames a chasing jumper waits on the ground between jumps
+
+# Enemy navigation (see src/navigation.py)
+NAV_CELL_SIZE = 20            # Line-of-sight grid cell size in pixels
+NAV_SIGHT_CACHE_SIZE = 4096   # Cached line-of-sight results per level
+
+# Tint and alpha variants of sprites (flashes, fades), see src/variant_cache.py
+VARIANT_CACHE_BYTES = 4 * 1024 * 1024  # Memory kept for cached variants
+VARIANT_ALPHA_STEP = 15                # Alpha levels are rounded to multiples of this
+
+# Level exit settings
+EXIT_PULSE_FRAMES = 32  # Frames in the precomputed exit portal pulse
+
+# Input settings
+INPUT_BUFFER_CAPACITY = 256  # Player input samples held by the ring buffer
+LATENCY_WINDOW = 300         # Frames of input latency kept for statistics
+
+# Rewind settings (see src/rewind.py)
+REWIND_ENABLED = True
+REWIND_SECONDS = 10            # History kept for rewinding
+REWIND_KEYFRAME_INTERVAL = 30  # Ticks between full state keyframes
+REWIND_CAPTURE_BUDGET_MS = 0.5 # Most game-thread time capturing one tick may take (bench_rewind.py)
 
 # Glitch settings
 GLITCH_INTERVAL = 10  # Seconds between glitches
@@ -37,8 +94,77 @@ GLITCH_NOTIFICATION_TIME = 2  # How long to show glitch notifications
 SHAKE_INTENSITY_LEVEL4 = 5    # Pixels for level 4 constant shake
 SHAKE_INTENSITY_LEVEL5 = 8    # Pixels for level 5 constant shake
 
+# Graphics quality presets (the preset in use is chosen per machine, see src/quality.py)
+QUALITY_PRESETS = {
+    'high': {
+        'grid_size': 80,              # Background grid cell size in pixels
+        'background_elements': 1.0,   # Fraction of background glitch lines and blocks drawn
+        'noise_step': 2,              # Pixel spacing of level static noise
+        'shake_scale': 1.0,           # Multiplier on the level screen shake intensity
+        'pixel_sizes': (2, 3, 4, 6, 8),  # Block sizes the pixelation glitch picks from
+    },
+    'medium': {
+        'grid_size': 120,
+        'background_elements': 0.6,
+        'noise_step': 4,
+        'shake_scale': 0.75,
+        'pixel_sizes': (4, 6, 8),
+    },
+    'low': {
+        'grid_size': 160,
+        'background_elements': 0.3,
+        'noise_step': 8,
+        'shake_scale': 0.5,
+        'pixel_sizes': (6, 8),
+    },
+}
+QUALITY_ORDER = ('high', 'medium', 'low')  # Highest quality first
+DEFAULT_QUALITY = 'high'
+QUALITY_BENCHMARK_FRAMES = 90  # Frames rendered per preset by the startup calibration
+
 # Game settings
 LEVEL_COUNT = 5  # Updated number of levels in the game
 
+# Environment settings (programmatic play for bots)
+ENV_EXIT_REWARD = 1.0        # Reward for reaching the level exit
+ENV_DEATH_PENALTY = -1.0     # Reward for dying
+ENV_TIME_PENALTY = -0.001    # Reward applied on every step
+ENV_MAX_STEPS = 60 * FPS     # Steps before an episode is truncated
+ENV_NEAREST_ENEMIES = 4      # Enemies included in each observation
+ENV_NEAREST_PROJECTILES = 2  # Projectiles included in each observation
+
+# Telemetry (per-session gameplay events, see src/telemetry.py)
+TELEMETRY_ENABLED = True
+TELEMETRY_FORMAT = 'jsonl'          # 'jsonl' or 'binary'
+TELEMETRY_CAPACITY = 8192           # Events buffered in memory between writes
+TELEMETRY_FLUSH_INTERVAL = 0.5      # Seconds between background writes
+TELEMETRY_FILE_BYTES = 1024 * 1024  # Start a new file past this size
+TELEMETRY_MAX_FILES = 20            # Older telemetry files are deleted
+TELEMETRY_EVENT_BUDGET_US = 5       # Most game-thread time recording one event may take
+
+# Startup
+FONT_FILE = 'freesansbold.ttf'  # Bundled font in assets/fonts
+ASSET_PACK_FILE = 'assets.pack' # Packed assets, used instead of assets/ when present (build_assets.py)
+STARTUP_BUDGET_MS = 1000        # Longest a launch may take to its first menu frame (bench_startup.py)
+
+# Gameplay capture (see src/capture.py)
+CAPTURE_FORMAT = 'png'  # 'png' sequence or 'raw' RGB frame stream
+CAPTURE_POOL_SIZE = 8   # Frames buffered for the writer before frames are dropped
+CAPTURE_PNG_LEVEL = 1   # zlib level; higher is smaller but slower to write
+CAPTURE_WRITER_NICE = 10  # How much lower the writer thread's OS priority is than the game's
+
+# On-demand profiling (see src/profiler.py)
+PROFILE_FRAMES = 120          # Game loop iterations profiled per capture
+PROFILE_SUMMARY_LINES = 5     # Functions listed on screen
+PROFILE_SUMMARY_FRAMES = 600  # Frames the summary stays on screen
+PROFILE_REPORT_LINES = 40     # Functions listed in the text report
+
+# Game clock
+TIME_SCALE = 1.0      # Ticks simulated per frame; below 1 slows the game down, above 1 fast-forwards it
+TIME_SCALE_MIN = 0.125
+TIME_SCALE_MAX = 8.0
+
 # Debug settings
 DEBUG_MODE = False  # Set to True to show debug information
+DEV_MODE = False    # Reload src/level_data.py while the game runs (see src/hot_reload.py)
+LEVEL_RELOAD_INTERVAL = 0.25  # Seconds between checks of the level data file in dev mode
@@ -1,27 +1,42 @@
 import pygame
-import random
+import math
 from src.constants import *
+from src.collision import move_and_collide, pixel_step, resting_on, swept_rect
+from src.render_queue import LAYER_ENEMIES, LAYER_PROJECTILES, LAYER_DEBUG
+from src.sprite_cycle import get_cycle
+from src.fonts import get_font
 
-class Enemy(pygame.sprite.Sprite):
-    def __init__(self, x, y, patrol_distance=100, enemy_type="basic"):
-        super().__init__()
-        
-        self.enemy_type = enemy_type
-        
-        # Create enemy sprite
-        self.image = pygame.Surface((ENEMY_WIDTH, ENEMY_HEIGHT))
-        
+def draw_enemy_frame(enemy_type):
+    """Return a function drawing an enemy type's decoration; it looks the same at every phase"""
+    def draw_frame(surface, phase):
         # Different colors/shapes for different enemy types
         if enemy_type == "basic":
-            self.image.fill(ENEMY_COLOR)
+            surface.fill(ENEMY_COLOR)
         elif enemy_type == "jumper":
-            self.image.fill((255, 100, 0))  # Orange
+            surface.fill((255, 100, 0))  # Orange
             # Add a triangle on top to indicate jumper
-            pygame.draw.polygon(self.image, (255, 200, 0), [(0, 0), (ENEMY_WIDTH, 0), (ENEMY_WIDTH//2, -10)])
+            pygame.draw.polygon(surface, (255, 200, 0), [(0, 0), (ENEMY_WIDTH, 0), (ENEMY_WIDTH//2, -10)])
         elif enemy_type == "shooter":
-            self.image.fill((150, 0, 0))  # Dark red
+            surface.fill((150, 0, 0))  # Dark red
             # Add a circle to indicate shooter
-            pygame.draw.circle(self.image, (255, 255, 0), (ENEMY_WIDTH//2, ENEMY_HEIGHT//2), 10)
+            pygame.draw.circle(surface, (255, 255, 0), (ENEMY_WIDTH//2, ENEMY_HEIGHT//2), 10)
+    return draw_frame
+
+def enemy_cycle(enemy_type):
+    """Return the shared animation cycle for an enemy type"""
+    # Enemy decorations do not move yet, so each type has a single frame
+    return get_cycle(('enemy', enemy_type), (ENEMY_WIDTH, ENEMY_HEIGHT), 1,
+                     ENEMY_ANIMATION_FRAMES, draw_enemy_frame(enemy_type))
+
+class Enemy(pygame.sprite.Sprite):
+    def __init__(self, x, y, patrol_distance=100, enemy_type="basic"):
+        super().__init__()
+        
+        self.enemy_type = enemy_type
+        
+        # Create enemy sprite from the shared animation of its type
+        self.cycle = enemy_cycle(enemy_type)
+        self.image = self.cycle.frames[0]
         
         self.rect = self.image.get_rect()
         self.rect.x = x
@@ -46,60 +61,102 @@ class Enemy(pygame.sprite.Sprite):
         self.animation_frame = 0
         self.animation_speed = 0.1
     
-    def update(self, platforms, player=None):
+    def update(self, platforms, player=None, navigation=None):
+        # Jumpers on the ground chase a nearby player along the level's
+        # navigation graph
+        chase = None
+        if (self.enemy_type == "jumper" and player and navigation and self.on_ground and
+                math.hypot(player.rect.centerx - self.rect.centerx,
+                           player.rect.centery - self.rect.centery) < ENEMY_CHASE_RANGE):
+            chase = navigation.chase_target(self.rect, player.rect)
+        
         # Apply gravity
         if not self.on_ground:
             self.velocity_y += GRAVITY
             if self.velocity_y > MAX_FALL_SPEED:
                 self.velocity_y = MAX_FALL_SPEED
         
-        # Update position
-        self.rect.x += self.velocity_x
-        self.rect.y += self.velocity_y
-        
-        # Check for collisions with platforms
+        # Update position, sweeping the motion against solid platforms
+        solid_rects = [platform.rect for platform in platforms if platform.solid]
         self.on_ground = False
-        for platform in platforms:
-            if platform.solid and self.rect.colliderect(platform.rect):
-                # Landing on top of a platform
-                if self.velocity_y > 0 and self.rect.bottom - self.velocity_y <= platform.rect.top + 10:
-                    self.rect.bottom = platform.rect.top
-                    self.velocity_y = 0
-                    self.on_ground = True
-                # Hitting a platform from below
-                elif self.velocity_y < 0 and self.rect.top - self.velocity_y >= platform.rect.bottom - 10:
-                    self.rect.top = platform.rect.bottom
-                    self.velocity_y = 0
-                # Side collision - reverse direction
-                elif self.velocity_x > 0:
-                    self.rect.right = platform.rect.left
-                    self.direction *= -1
-                    self.velocity_x = ENEMY_SPEED * self.direction
-                elif self.velocity_x < 0:
-                    self.rect.left = platform.rect.right
-                    self.direction *= -1
-                    self.velocity_x = ENEMY_SPEED * self.direction
-        
-        # Patrol behavior - reverse direction at patrol limits
-        if self.rect.x > self.start_x + self.patrol_distance:
-            self.direction = -1
-            self.velocity_x = ENEMY_SPEED * self.direction
-        elif self.rect.x < self.start_x - self.patrol_distance:
-            self.direction = 1
-            self.velocity_x = ENEMY_SPEED * self.direction
+        dx, dy = pixel_step(self.rect, self.velocity_x, self.velocity_y)
+        support = None
+        for normal_x, normal_y, obstacle in move_and_collide(self.rect, dx, dy, solid_rects):
+            # Landing on top of a platform
+            if normal_y < 0:
+                self.velocity_y = 0
+                self.on_ground = True
+                support = obstacle
+            # Hitting a platform from below
+            elif normal_y > 0:
+                self.velocity_y = 0
+            # Side collision - reverse direction
+            else:
+                self.direction = normal_x
+                self.velocity_x = ENEMY_SPEED * self.direction
+        
+        # Still standing on a platform when not moving vertically
+        if not self.on_ground and self.velocity_y >= 0:
+            support = resting_on(self.rect, solid_rects)
+            if support:
+                self.velocity_y = 0
+                self.on_ground = True
+        
+        # Turn around at the edge of the platform instead of walking off it,
+        # unless the chase leads off it
+        if support and not chase:
+            if self.velocity_x > 0 and self.rect.right > support.right:
+                self.direction = -1
+                self.velocity_x = ENEMY_SPEED * self.direction
+            elif self.velocity_x < 0 and self.rect.left < support.left:
+                self.direction = 1
+                self.velocity_x = ENEMY_SPEED * self.direction
+        
+        # Patrol behavior - reverse direction at patrol limits, on the
+        # ground so a jump is not turned around in mid-air
+        if self.on_ground and not chase:
+            if self.rect.x > self.start_x + self.patrol_distance:
+                self.direction = -1
+                self.velocity_x = ENEMY_SPEED * self.direction
+            elif self.rect.x < self.start_x - self.patrol_distance:
+                self.direction = 1
+                self.velocity_x = ENEMY_SPEED * self.direction
+            elif not self.velocity_x:
+                # Walk on after waiting to jump
+                self.velocity_x = ENEMY_SPEED * self.direction
         
         # Enemy-specific behavior
         if self.enemy_type == "jumper" and self.on_ground:
             self.jump_timer += 1
-            if self.jump_timer >= 120:  # Jump every 2 seconds
-                self.velocity_y = -JUMP_POWER * 0.7  # Jump not as high as player
+            if chase:
+                # Head for the next step of the route, then take it
+                target_x, direction, jump = chase
+                if abs(target_x - self.rect.centerx) > ENEMY_SPEED:
+                    self.direction = 1 if target_x > self.rect.centerx else -1
+                    self.velocity_x = ENEMY_SPEED * self.direction
+                elif jump:
+                    # Wait at the takeoff point until ready to jump
+                    self.direction = direction
+                    self.velocity_x = 0
+                    if self.jump_timer >= ENEMY_CHASE_JUMP_DELAY:
+                        self.velocity_x = ENEMY_SPEED * self.direction
+                        self.velocity_y = -ENEMY_JUMP_POWER
+                        self.jump_timer = 0
+                else:
+                    self.direction = direction
+                    self.velocity_x = ENEMY_SPEED * self.direction
+            elif self.jump_timer >= 120:  # Jump every 2 seconds
+                # Only hop when there is room above and it lands back on the platform
+                if not navigation or navigation.can_hop(self.rect, self.direction):
+                    self.velocity_y = -ENEMY_JUMP_POWER
                 self.jump_timer = 0
         
         elif self.enemy_type == "shooter" and player:
             self.shoot_timer += 1
             if self.shoot_timer >= 180:  # Shoot every 3 seconds
                 # Only shoot if player is in line of sight
-                if abs(player.rect.y - self.rect.y) < 100:  # Within vertical range
+                if (abs(player.rect.y - self.rect.y) < 100 and  # Within vertical range
+                        (not navigation or navigation.line_of_sight(self.rect.center, player.rect.center))):
                     # Determine direction to shoot
                     direction = 1 if player.rect.x > self.rect.x else -1
                     self.shoot(direction)
@@ -107,7 +164,7 @@ class Enemy(pygame.sprite.Sprite):
         
         # Update projectiles
         for projectile in self.projectiles:
-            projectile.update()
+            projectile.update(solid_rects)
             # Remove projectiles that go off screen
             if (projectile.rect.right < 0 or 
                 projectile.rect.left > SCREEN_WIDTH or
@@ -117,8 +174,9 @@ class Enemy(pygame.sprite.Sprite):
         
         # Update animation
         self.animation_frame += self.animation_speed
-        if self.animation_frame >= 4:  # Assuming 4 frames of animation
+        if self.animation_frame >= ENEMY_ANIMATION_FRAMES:
             self.animation_frame = 0
+        self.image = self.cycle.frame_at(self.animation_frame)
     
     def shoot(self, direction):
         projectile = Projectile(
@@ -128,29 +186,29 @@ class Enemy(pygame.sprite.Sprite):
         )
         self.projectiles.add(projectile)
     
-    def draw(self, screen, offset_x=0, offset_y=0):
-        # Draw the enemy with screen shake offset
-        screen.blit(self.image, (self.rect.x + offset_x, self.rect.y + offset_y))
+    def draw(self, queue):
+        # Draw the enemy (the queue applies the shake offset)
+        queue.blit(LAYER_ENEMIES, self.image, self.rect.x, self.rect.y)
         
-        # Draw projectiles with screen shake offset
+        # Draw projectiles
         for projectile in self.projectiles:
-            screen.blit(projectile.image, (projectile.rect.x + offset_x, projectile.rect.y + offset_y))
+            queue.blit(LAYER_PROJECTILES, projectile.image, projectile.rect.x, projectile.rect.y)
         
         # Debug visualization
         if DEBUG_MODE:
             # Draw patrol range
-            pygame.draw.line(
-                screen, 
+            queue.line(
+                LAYER_DEBUG,
                 (255, 0, 0), 
-                (self.start_x - self.patrol_distance + offset_x, self.rect.bottom + 5 + offset_y),
-                (self.start_x + self.patrol_distance + offset_x, self.rect.bottom + 5 + offset_y),
+                (self.start_x - self.patrol_distance, self.rect.bottom + 5),
+                (self.start_x + self.patrol_distance, self.rect.bottom + 5),
                 1
             )
             
             # Draw enemy type
-            font = pygame.font.SysFont(None, 20)
+            font = get_font(20)
             type_text = font.render(self.enemy_type, True, (255, 255, 255))
-            screen.blit(type_text, (self.rect.x + offset_x, self.rect.y - 20 + offset_y))
+            queue.blit(LAYER_DEBUG, type_text, self.rect.x, self.rect.y - 20)
 
 
 class Projectile(pygame.sprite.Sprite):
@@ -167,7 +225,14 @@ class Projectile(pygame.sprite.Sprite):
         # Movement
         self.speed = 7
         self.direction = direction
+        self.previous_rect = self.rect.copy()
+    
+    def update(self, platform_rects=()):
+        # Move the projectile, stopping at the first platform in its path
+        self.previous_rect = self.rect.copy()
+        if move_and_collide(self.rect, self.speed * self.direction, 0, platform_rects):
+            self.kill()
     
-    def update(self):
-        # Move the projectile
-        self.rect.x += self.speed * self.direction
+    def swept_rect(self):
+        """Area the projectile covered this frame, for hit tests"""
+        return swept_rect(self.previous_rect, self.rect)
@@ -0,0 +1,311 @@
+"""
+Programmatic environment API for Glitch Runner
+
+Drives the game without a window or event queue so bots can be trained and
+evaluated faster than real time:
+
+    env = GlitchRunnerEnv()
+    obs = env.reset(seed=1, level=0)
+    obs, reward, done, info = env.step(ACTION_RIGHT_JUMP)
+
+Observations are flat float arrays (array.array('f'), which NumPy can wrap
+without copying). VectorEnv steps N independent games in this process and
+SubprocVectorEnv steps them across worker processes.
+"""
+import os
+import multiprocessing
+from array import array
+import pygame
+from src.constants import *
+from src.glitches import GLITCH_REGISTRY
+
+# Discrete actions as (left, right, jump) key states
+ACTIONS = (
+    (False, False, False),  # 0: no-op
+    (True, False, False),   # 1: left
+    (False, True, False),   # 2: right
+    (False, False, True),   # 3: jump
+    (True, False, True),    # 4: left + jump
+    (False, True, True),    # 5: right + jump
+)
+ACTION_NOOP, ACTION_LEFT, ACTION_RIGHT, ACTION_JUMP, ACTION_LEFT_JUMP, ACTION_RIGHT_JUMP = range(len(ACTIONS))
+
+# Glitch flags appear in the observation in registry order
+GLITCH_NAMES = tuple(GLITCH_REGISTRY)
+
+# Observation layout: player (8), exit offset (2), nearest enemies (dx, dy,
+# present), nearest projectiles (dx, dy, direction, present), glitch flags
+PLAYER_FEATURES = 8
+EXIT_FEATURES = 2
+ENEMY_FEATURES = 3
+PROJECTILE_FEATURES = 4
+OBS_SIZE = (PLAYER_FEATURES + EXIT_FEATURES
+            + ENEMY_FEATURES * ENV_NEAREST_ENEMIES
+            + PROJECTILE_FEATURES * ENV_NEAREST_PROJECTILES
+            + len(GLITCH_NAMES))
+
+
+def init_headless():
+    """Initialize pygame with dummy video/audio drivers if nothing is up yet"""
+    if not pygame.display.get_init():
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.init()
+
+
+def build_observation(game):
+    """Encode the game state seen by the player as a flat float array"""
+    player = game.player
+    level = game.current_level
+    px, py = player.rect.centerx, player.rect.centery
+    obs = array('f', [
+        player.rect.x / SCREEN_WIDTH,
+        player.rect.y / SCREEN_HEIGHT,
+        player.velocity_x / PLAYER_SPEED,
+        player.velocity_y / MAX_FALL_SPEED,
+        1.0 if player.on_ground else 0.0,
+        1.0 if player.wall_sliding else 0.0,
+        player.jump_count / player.max_jumps,
+        1.0 if player.invincible else 0.0,
+        (level.exit.rect.centerx - px) / SCREEN_WIDTH,
+        (level.exit.rect.centery - py) / SCREEN_HEIGHT,
+    ])
+
+    # Nearest enemies, padded with absent slots
+    enemies = sorted(level.enemies, key=lambda e: (e.rect.centerx - px) ** 2 + (e.rect.centery - py) ** 2)
+    for i in range(ENV_NEAREST_ENEMIES):
+        if i < len(enemies):
+            enemy = enemies[i]
+            obs.extend(((enemy.rect.centerx - px) / SCREEN_WIDTH, (enemy.rect.centery - py) / SCREEN_HEIGHT, 1.0))
+        else:
+            obs.extend((0.0, 0.0, 0.0))
+
+    # Nearest projectiles, padded with absent slots
+    projectiles = [p for enemy in level.enemies for p in enemy.projectiles]
+    projectiles.sort(key=lambda p: (p.rect.centerx - px) ** 2 + (p.rect.centery - py) ** 2)
+    for i in range(ENV_NEAREST_PROJECTILES):
+        if i < len(projectiles):
+            projectile = projectiles[i]
+            obs.extend(((projectile.rect.centerx - px) / SCREEN_WIDTH, (projectile.rect.centery - py) / SCREEN_HEIGHT,
+                        float(projectile.direction), 1.0))
+        else:
+            obs.extend((0.0, 0.0, 0.0, 0.0))
+
+    # Active glitch flags
+    active = {g.name for g in game.glitch_engine.active_glitches}
+    obs.extend(1.0 if name in active else 0.0 for name in GLITCH_NAMES)
+    return obs
+
+
+class GlitchRunnerEnv:
+    """A single headless Glitch Runner game driven by discrete actions"""
+
+    def __init__(self, level=0, max_steps=ENV_MAX_STEPS, seed=None):
+        init_headless()
+
+        # Imported here so pygame is initialized headless first. The game's
+        # random streams are its own, so instances never affect each other
+        from src.game import Game
+        self.game = Game(headless=True, seed=seed, rewind=False)
+        self.level = level
+        self.max_steps = max_steps
+        self.steps = 0
+        self.jump_down = False
+
+    def reset(self, seed=None, level=None):
+        """Start a fresh episode and return the first observation
+
+        With a seed, the episode is the same as any other episode started
+        with that seed. Without one, the game's random streams carry on.
+        """
+        if seed is not None:
+            self.game.rng.seed(seed)
+        if level is not None:
+            self.level = level
+
+        game = self.game
+        game.glitch_engine.reset()
+        game.load_level(self.level)
+        game.score = 0
+        game.reset_level(reset_lives=True)
+        game.game_state = "playing"
+
+        # Clear any movement left over from the previous episode
+        player = game.player
+        player.on_ground = False
+        player.wall_sliding = False
+        player.jump_count = 0
+        player.jump_held = False
+
+        self.steps = 0
+        self.jump_down = False
+        return build_observation(game)
+
+    def step(self, action):
+        """Advance one frame; returns (observation, reward, done, info)"""
+        game = self.game
+        player = game.player
+        left, right, jump = ACTIONS[action]
+
+        # Jumps trigger on the press edge, like a KEYDOWN event would
+        if jump and not self.jump_down:
+            player.handle_jump_press()
+        elif not jump and self.jump_down:
+            player.jump_held = False
+        self.jump_down = jump
+        player.key_state = {pygame.K_LEFT: left, pygame.K_RIGHT: right, pygame.K_SPACE: jump}
+
+        game.update()
+        self.steps += 1
+
+        reward = ENV_TIME_PENALTY
+        done = False
+        if game.game_state == "level_complete":
+            reward += ENV_EXIT_REWARD
+            done = True
+        elif game.game_state == "game_over":
+            reward += ENV_DEATH_PENALTY
+            done = True
+        truncated = not done and self.steps >= self.max_steps
+
+        info = {
+            'score': game.score,
+            'lives': game.lives,
+            'level': game.current_level_index,
+            'steps': self.steps,
+            'truncated': truncated,
+        }
+        return build_observation(game), reward, done or truncated, info
+
+    def close(self):
+        self.game = None
+
+
+class VectorEnv:
+    """N independent games stepped together in this process
+
+    Instance i is seeded with seed + i, both when it is created and by
+    reset(seed), and steps exactly like a GlitchRunnerEnv with that seed.
+    Finished episodes are reset automatically; the last observation of the
+    finished episode is returned in info['terminal_observation'].
+    """
+
+    def __init__(self, num_envs, level=0, max_steps=ENV_MAX_STEPS, seed=None):
+        self.num_envs = num_envs
+        self.envs = [GlitchRunnerEnv(level, max_steps, None if seed is None else seed + i) for i in range(num_envs)]
+
+    def reset(self, seed=None, level=None):
+        """Reset every game; instance i is seeded with seed + i"""
+        obs = array('f')
+        for i, env in enumerate(self.envs):
+            obs.extend(env.reset(None if seed is None else seed + i, level))
+        return obs
+
+    def step(self, actions):
+        """Returns (observations, rewards, dones, infos) for all games
+
+        observations is a flat array of num_envs * OBS_SIZE floats.
+        """
+        obs = array('f')
+        rewards = array('f')
+        dones = array('B')
+        infos = []
+        for env, action in zip(self.envs, actions):
+            env_obs, reward, done, info = _step_and_reset(env, action)
+            obs.extend(env_obs)
+            rewards.append(reward)
+            dones.append(done)
+            infos.append(info)
+        return obs, rewards, dones, infos
+
+    def close(self):
+        for env in self.envs:
+            env.close()
+        self.envs = []
+
+
+def _step_and_reset(env, action):
+    obs, reward, done, info = env.step(action)
+    if done:
+        info['terminal_observation'] = obs
+        obs = env.reset()
+    return obs, reward, done, info
+
+
+def _worker(conn, level, max_steps, seed):
+    """Worker process loop owning one headless game"""
+    env = GlitchRunnerEnv(level, max_steps, seed)
+    try:
+        while True:
+            command, data = conn.recv()
+            if command == 'step':
+                conn.send(_step_and_reset(env, data))
+            elif command == 'reset':
+                conn.send(env.reset(*data))
+            elif command == 'close':
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        env.close()
+        conn.close()
+
+
+class SubprocVectorEnv:
+    """N independent games, each running in its own worker process
+
+    Same interface and seeding as VectorEnv. Workers are started with the
+    'spawn' method so none of them inherits an initialized SDL state.
+    """
+
+    def __init__(self, num_envs, level=0, max_steps=ENV_MAX_STEPS, seed=None):
+        self.num_envs = num_envs
+        context = multiprocessing.get_context('spawn')
+        self.conns = []
+        self.processes = []
+        for i in range(num_envs):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(target=_worker, args=(child_conn, level, max_steps, None if seed is None else seed + i),
+                                      daemon=True)
+            process.start()
+            child_conn.close()
+            self.conns.append(parent_conn)
+            self.processes.append(process)
+
+    def reset(self, seed=None, level=None):
+        """Reset every game; instance i is seeded with seed + i"""
+        for i, conn in enumerate(self.conns):
+            conn.send(('reset', (None if seed is None else seed + i, level)))
+        obs = array('f')
+        for conn in self.conns:
+            obs.extend(conn.recv())
+        return obs
+
+    def step(self, actions):
+        """Returns (observations, rewards, dones, infos) for all games"""
+        # Send every action first so the workers simulate in parallel
+        for conn, action in zip(self.conns, actions):
+            conn.send(('step', action))
+
+        obs = array('f')
+        rewards = array('f')
+        dones = array('B')
+        infos = []
+        for conn in self.conns:
+            env_obs, reward, done, info = conn.recv()
+            obs.extend(env_obs)
+            rewards.append(reward)
+            dones.append(done)
+            infos.append(info)
+        return obs, rewards, dones, infos
+
+    def close(self):
+        for conn in self.conns:
+            try:
+                conn.send(('close', None))
+            except (BrokenPipeError, EOFError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+        self.conns = []
+        self.processes = []
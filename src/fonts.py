@@ -0,0 +1,28 @@
+"""
+Game fonts
+
+Text is drawn with the font bundled in assets/fonts, loaded straight from
+the game assets. pygame.font.SysFont searches the system's installed fonts
+on its first call, which can take a noticeable part of startup. Fonts are
+shared by size, so each size is loaded once per process.
+"""
+import pygame
+from src.constants import FONT_FILE
+from src.assets import get_assets
+
+# Loaded fonts by size
+_fonts = {}
+
+def get_font(size):
+    """Return the game font at a size, loading it on first use"""
+    font = _fonts.get(size)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        try:
+            font = get_assets().load_font('fonts/' + FONT_FILE, size)
+        except (OSError, KeyError, pygame.error):
+            # pygame's built-in default font is the same face
+            font = pygame.font.Font(None, size)
+        _fonts[size] = font
+    return font
@@ -1,27 +1,88 @@
 import pygame
-import os
 import time
-from src.player import Player
+import random
+from src.player import Player, CONTROL_KEYS
 from src.level import Level
 from src.glitch_engine import GlitchEngine
 from src.level_data import LEVELS
 from src.sound_manager import SoundManager
+from src.replay import ReplayRecorder
+from src.input_buffer import InputRingBuffer, LatencyMonitor, KEY_DOWN, KEY_UP
+from src.render_scale import RenderScaler, scaled_size
+from src.rng import RandomStreams
+from src.quality import QUALITY, setup_quality
+from src.governor import EffectGovernor
+from src.render_queue import RenderQueue, LAYER_HUD, draw_commands
+from src.render_thread import RenderSnapshot, RenderThread, RenderTarget
+from src.level import draw_level_effect
+from src.variant_cache import VARIANTS
+from src.telemetry import Telemetry, FRAME, DEATH, LEVEL_COMPLETE, DEATH_CAUSES
+from src.rewind import RewindBuffer, REWIND_KEY
+from src.fonts import get_font
+from src.startup import STARTUP, StartupProfiler
+from src.game_clock import GameClock, PAUSE_KEY, SLOWER_KEY, FASTER_KEY
+from src.state_hash import state_hash
+from src.capture import FrameCapture, CAPTURE_KEY
+from src.config import CAPTURE_DIR
+from src.profiler import FrameProfiler, PROFILE_KEY
 from src.constants import *
 
 # Add a version constant to easily identify which version is running
 VERSION = "2.0 - June 16, 2025"
 
 class Game:
-    def __init__(self):
+    def __init__(self, headless=False, seed=None, record_dir=None, quality=None, recalibrate=False, pipelined=PIPELINED_RENDERING, telemetry=None, rewind=REWIND_ENABLED, dev=DEV_MODE, profile_startup=False, time_scale=TIME_SCALE, hash_state=False, capture_dir=None, capture_format=CAPTURE_FORMAT, profile_frames=PROFILE_FRAMES):
+        # Headless games (bots, replays) never open a window or play audio
+        self.headless = headless
+        
+        # Time the startup phases of the game that is launched; headless
+        # games get a profiler of their own that nothing reads
+        self.startup = StartupProfiler() if headless else STARTUP
+        self.profile_startup = profile_startup
+        
+        # This game's random streams, seeded before anything random is built
+        # so a recorded session can be re-simulated from the same starting state
+        if seed is None and record_dir:
+            seed = random.randrange(2 ** 31)
+        self.rng = RandomStreams(seed)
+        self.seed = seed
+        
+        # Hash the gameplay state every tick to compare runs; recorded
+        # sessions keep the hashes so replays can find where they desync
+        self.state_hashes = [] if hash_state or record_dir else None
+        
+        # Record the inputs of this session if asked to
+        self.record_dir = record_dir
+        self.recorder = ReplayRecorder(seed) if record_dir else None
+        
         # Set up the display
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption(f"Glitch Runner {VERSION}")
+        if headless:
+            # Sprite loading needs a video mode for convert_alpha, but the
+            # game itself renders into an offscreen surface
+            if pygame.display.get_surface() is None:
+                pygame.display.set_mode((1, 1))
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        else:
+            # SCALED lets SDL upscale the logical screen to fit large displays;
+            # it needs a renderer, so fall back to a plain window without one
+            try:
+                flags = pygame.SCALED if DISPLAY_SCALED else 0
+                self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), flags)
+            except pygame.error:
+                self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption(f"Glitch Runner {VERSION}")
+        self.startup.mark('display')
         
         # Set up the clock
         self.clock = pygame.time.Clock()
         
+        # Game time, which every gameplay timer reads. Recorded sessions run
+        # at normal speed so they replay one tick per recorded frame
+        self.game_clock = GameClock(1.0 if record_dir else time_scale)
+        
         # Initialize sound manager
-        self.sound_manager = SoundManager()
+        self.sound_manager = SoundManager(enabled=not headless)
+        self.startup.mark('audio')
         
         # Game state
         self.running = True
@@ -30,55 +91,115 @@ class Game:
         self.lives = 0  # Will be set based on level data
         self.max_lives = 0  # Maximum lives for current level
         self.score = 0
-        self.level_start_time = 0
+        self.level_start_tick = 0
         
         # Create player
-        self.player = Player()
+        self.player = Player(self.game_clock, self.sound_manager)
+        self.startup.mark('player')
+        
+        # Simulation frame counter, buffered player input and input latency
+        self.frame = 0
+        self.input_buffer = InputRingBuffer()
+        self.latency_monitor = LatencyMonitor()
+        
+        # History of the current level for rewinding, and whether the
+        # rewind key is held
+        self.rewind = RewindBuffer() if rewind else None
+        self.rewind_held = False
+        self.rewinding = False
         
         # Load levels
         self.levels = []
         for level_data in LEVELS:
-            self.levels.append(Level(level_data))
+            self.levels.append(Level(level_data, self.rng))
+        self.startup.mark('levels')
         
         # Set current level
         self.current_level = self.levels[self.current_level_index]
         
+        # In dev mode, edits to the level data are applied while playing.
+        # Recorded sessions skip it so they replay against the same levels
+        self.level_watcher = None
+        if dev and not record_dir:
+            from src.hot_reload import LevelWatcher
+            self.level_watcher = LevelWatcher()
+        
+        # Dev mode can also change the time scale while playing
+        self.dev = dev and not record_dir
+        
         # Create glitch engine
         self.glitch_engine = GlitchEngine(self)
         
-        # Initialize font for text
-        pygame.font.init()
-        self.font = pygame.font.SysFont(None, 24)
-        self.title_font = pygame.font.SysFont(None, 48)
+        # Fonts for text, loaded from the bundled font file
+        self.font = get_font(24)
+        self.title_font = get_font(48)
+        
+        # Create a render surface for gameplay and post-processing, sized by
+        # the internal render scale, for frames drawn on this thread
+        self.render_scaler = RenderScaler(dynamic=DYNAMIC_RESOLUTION and not headless)
+        self.render_target = RenderTarget(self.render_scaler.size)
+        
+        # Draw commands for the world and the HUD
+        self.render_queue = RenderQueue()
+        self.hud_queue = RenderQueue()
+        
+        # Shared backdrop for the game over / level complete screens
+        self.dim_overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        self.dim_overlay.fill((0, 0, 0, 128))
         
-        # Create asset directories if they don't exist
-        self.create_asset_directories()
+        # Draw frames on a render thread while the next one is simulated
+        self.pipelined = pipelined and not headless
+        self.render_thread = None
         
-        # Create a render surface for post-processing
-        self.render_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        # Session telemetry, off for headless games unless asked for
+        if telemetry is None:
+            telemetry = TELEMETRY_ENABLED and not headless
+        self.telemetry = Telemetry(enabled=telemetry)
         
-        # Game over timer
+        # Presented frames are copied to a background writer while capturing;
+        # CAPTURE_KEY starts and stops it
+        self.capture = None
+        self.capture_dir = capture_dir or CAPTURE_DIR
+        self.capture_format = capture_format
+        if capture_dir:
+            self.start_capture()
+        
+        # cProfile capture of the next game loop iterations, on PROFILE_KEY
+        self.profiler = FrameProfiler(frames=profile_frames)
+        
+        # Sheds effect fidelity when frames run over budget
+        self.effect_governor = EffectGovernor(enabled=EFFECT_GOVERNOR and not headless)
+        
+        # Game over and level complete deadlines, in game clock ticks
         self.game_over_timer = 0
         self.level_complete_timer = 0
         
+        # Pick the graphics quality preset; headless games never benchmark
+        if headless:
+            QUALITY.apply(quality or DEFAULT_QUALITY)
+        else:
+            setup_quality(self, quality, recalibrate)
+        
         # Start background music
         self.sound_manager.play_music('background')
-        
-    def create_asset_directories(self):
-        # Create asset directories
-        directories = [
-            os.path.join('assets', 'images', 'player'),
-            os.path.join('assets', 'sounds'),
-            os.path.join('assets', 'fonts')
-        ]
-        
-        for directory in directories:
-            os.makedirs(directory, exist_ok=True)
+        self.startup.mark('setup')
     
+    def load_level(self, level_index):
+        """Rebuild a level from its data so it starts from a pristine state"""
+        self.levels[level_index] = Level(LEVELS[level_index], self.rng)
+        self.current_level_index = level_index
+        self.current_level = self.levels[level_index]
+        if self.rewind is not None:
+            self.rewind.clear()
+        
     def reset_level(self, reset_lives=True):
         # Reset player position
         self.current_level.reset_player_position(self.player)
-        self.level_start_time = time.time()
+        self.level_start_tick = self.game_clock.tick
+        
+        # History does not reach back past a respawn or a new level
+        if self.rewind is not None:
+            self.rewind.clear()
         
         # Set lives based on current level, but only if reset_lives is True
         if reset_lives:
@@ -97,16 +218,53 @@ class Game:
             self.game_state = "game_completed"
             self.sound_manager.play_sound('game_completed')
     
-    def handle_events(self):
-        for event in pygame.event.get():
+    def handle_events(self, events=None):
+        if events is None:
+            events = pygame.event.get()
+        
+        # pygame does not expose SDL event timestamps, so samples are stamped
+        # with the tick at which the queue was drained
+        drain_time = pygame.time.get_ticks()
+        
+        for event in events:
             if event.type == pygame.QUIT:
                 self.running = False
             
+            # Player control keys go through the input buffer in every state
+            # so releases are never lost between lives
+            if event.type in (pygame.KEYDOWN, pygame.KEYUP) and event.key in CONTROL_KEYS:
+                kind = KEY_DOWN if event.type == pygame.KEYDOWN else KEY_UP
+                self.input_buffer.push(drain_time, self.frame, kind, event.key)
+            
+            # Track the rewind key
+            if event.type in (pygame.KEYDOWN, pygame.KEYUP) and event.key == REWIND_KEY:
+                self.rewind_held = event.type == pygame.KEYDOWN
+            
             # Handle key presses
             if event.type == pygame.KEYDOWN:
                 # M key to toggle mute music
                 if event.key == pygame.K_m:
                     self.sound_manager.toggle_mute()
+                
+                # F9 to start and stop capturing frames
+                if event.key == CAPTURE_KEY and not self.headless:
+                    if self.capture:
+                        self.stop_capture()
+                    else:
+                        self.start_capture()
+                
+                # F10 to profile the next frames
+                if event.key == PROFILE_KEY and not self.headless:
+                    self.profiler.request()
+                
+                # P key to pause and resume play
+                if event.key == PAUSE_KEY and (self.game_state == "playing" or self.game_clock.paused):
+                    self.game_clock.toggle_pause()
+                
+                # Bracket keys to slow down and speed up the game in dev mode
+                if self.dev and event.key in (SLOWER_KEY, FASTER_KEY):
+                    factor = 0.5 if event.key == SLOWER_KEY else 2.0
+                    self.game_clock.set_time_scale(self.game_clock.time_scale * factor)
             
             # Menu controls
             if self.game_state == "menu":
@@ -136,22 +294,37 @@ class Game:
                         self.current_level_index = 0
                         self.current_level = self.levels[self.current_level_index]
                         self.reset_level()
-            
-            # Playing controls
-            elif self.game_state == "playing":
-                # Process event through glitch engine for input lag
-                processed_event = self.glitch_engine.process_input(event)
-                if processed_event:
-                    # Handle player input
-                    self.player.handle_event(processed_event)
-        
-        # Process any lagged inputs
-        if self.game_state == "playing":
-            lagged_events = self.glitch_engine.get_lagged_input()
-            for event in lagged_events:
-                self.player.handle_event(event)
+        
+        # Apply buffered player input, held back by the input lag glitch.
+        # Input waits in the buffer while the game is paused
+        if self.game_clock.paused:
+            return
+        ready = self.input_buffer.pop_ready(self.frame - self.glitch_engine.input_lag_frames)
+        for sdl_time, frame, kind, key in ready:
+            if self.game_state == "playing":
+                self.player.handle_key(key, kind == KEY_DOWN)
+                self.latency_monitor.input_applied(sdl_time)
+            else:
+                self.player.set_key_held(key, kind == KEY_DOWN)
     
     def update(self):
+        """Simulate as many ticks as the game clock calls for this frame"""
+        for _ in range(self.game_clock.steps()):
+            self.step()
+            if self.state_hashes is not None:
+                self.state_hashes.append(state_hash(self))
+    
+    def step(self):
+        """Simulate one tick"""
+        self.game_clock.advance()
+        
+        # Run backwards through the level's history while rewind is held
+        self.rewinding = (self.game_state == "playing" and self.rewind_held
+                          and self.rewind is not None and self.rewind.step_back(self))
+        if self.rewinding:
+            self.frame += 1
+            return
+        
         if self.game_state == "playing":
             # Update glitch engine
             self.glitch_engine.update()
@@ -162,19 +335,23 @@ class Game:
             # Check for level exit collision
             if self.current_level.check_exit_collision(self.player):
                 self.game_state = "level_complete"
-                self.level_complete_timer = time.time()
+                self.level_complete_timer = self.game_clock.deadline(2)
                 self.score += 1000  # Base score for completing level
                 self.sound_manager.play_sound('level_complete')
                 
                 # Bonus for speed
-                time_bonus = max(0, 60 - int(time.time() - self.level_start_time)) * 10
+                level_seconds = self.game_clock.seconds_since(self.level_start_tick)
+                time_bonus = max(0, 60 - int(level_seconds)) * 10
                 self.score += time_bonus
+                self.telemetry.record(LEVEL_COMPLETE, self.frame, self.score,
+                                      self.current_level_index, level_seconds, time_bonus)
             
             # Check for enemy collision
             if self.current_level.check_enemy_collision(self.player):
                 self.lives -= 1
+                self.record_death('enemy')
                 self.game_state = "game_over"
-                self.game_over_timer = time.time()
+                self.game_over_timer = self.game_clock.deadline(2)
                 
                 # Play different sounds based on lives remaining
                 if self.lives <= 0:
@@ -185,8 +362,9 @@ class Game:
             # Check if player fell off the level
             if self.player.rect.top > SCREEN_HEIGHT:
                 self.lives -= 1
+                self.record_death('fall')
                 self.game_state = "game_over"
-                self.game_over_timer = time.time()
+                self.game_over_timer = self.game_clock.deadline(2)
                 
                 # Play different sounds based on lives remaining
                 if self.lives <= 0:
@@ -194,33 +372,42 @@ class Game:
                 else:
                     self.sound_manager.play_sound('game_over')
         
-        # Handle timers for game states
-        current_time = time.time()
+        # Keep the tick for rewinding
+        if self.game_state == "playing" and self.rewind is not None:
+            self.rewind.capture(self)
         
-        if self.game_state == "game_over" and current_time - self.game_over_timer > 2:
+        # Handle timers for game states
+        if self.game_state == "game_over" and self.game_clock.expired(self.game_over_timer):
             if self.lives > 0:
                 self.game_state = "playing"
                 self.reset_level(reset_lives=False)  # Don't reset lives when continuing after death
         
-        if self.game_state == "level_complete" and current_time - self.level_complete_timer > 2:
+        if self.game_state == "level_complete" and self.game_clock.expired(self.level_complete_timer):
             self.next_level()
+        
+        self.frame += 1
     
-    def render_menu(self):
+    def record_death(self, cause):
+        """Record a death with the player's position in the telemetry stream"""
+        self.telemetry.record(DEATH, self.frame, self.score, self.player.rect.centerx, self.player.rect.centery,
+                              DEATH_CAUSES.index(cause), self.current_level_index)
+    
+    def render_menu(self, ui):
         # Clear the screen
-        self.screen.fill((0, 0, 0))
+        ui.fill(LAYER_HUD, (0, 0, 0))
         
         # Draw title
         title_text = self.title_font.render("GLITCH RUNNER", True, GLITCH_COLOR)
         title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, 100))
-        self.screen.blit(title_text, title_rect)
+        ui.blit(LAYER_HUD, title_text, title_rect.x, title_rect.y)
         
         # Draw version number
         version_text = self.font.render(f"Version: {VERSION}", True, (255, 255, 255))
-        self.screen.blit(version_text, (SCREEN_WIDTH - version_text.get_width() - 10, SCREEN_HEIGHT - 30))
+        ui.blit(LAYER_HUD, version_text, SCREEN_WIDTH - version_text.get_width() - 10, SCREEN_HEIGHT - 30)
         
         # Draw music status
         music_text = self.font.render(f"Music: {self.sound_manager.get_music_status()}", True, (255, 255, 255))
-        self.screen.blit(music_text, (10, SCREEN_HEIGHT - 30))
+        ui.blit(LAYER_HUD, music_text, 10, SCREEN_HEIGHT - 30)
         
         # Draw instructions
         instructions = [
@@ -230,6 +417,7 @@ class Game:
             "Controls:",
             "Arrow Keys: Move",
             "Space: Jump/Double Jump",
+            "R (hold): Rewind",
             "M: Toggle Music On/Off",
             "",
             "Press ENTER to Start"
@@ -237,159 +425,328 @@ class Game:
         
         for i, line in enumerate(instructions):
             text = self.font.render(line, True, (255, 255, 255))
-            self.screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, 200 + i * 30))
+            ui.blit(LAYER_HUD, text, SCREEN_WIDTH // 2 - text.get_width() // 2, 200 + i * 30)
+    
+    def render_centered(self, ui, font, text, color, y):
+        """Queue a line of text centered horizontally"""
+        surface = font.render(text, True, color)
+        ui.blit(LAYER_HUD, surface, SCREEN_WIDTH // 2 - surface.get_width() // 2, y)
     
-    def render_game_over(self):
+    def render_game_over(self, ui):
         # Draw semi-transparent overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        self.screen.blit(overlay, (0, 0))
+        ui.blit(LAYER_HUD, self.dim_overlay, 0, 0)
         
         # Draw game over text
-        game_over_text = self.title_font.render("GAME OVER", True, (255, 0, 0))
-        self.screen.blit(game_over_text, (SCREEN_WIDTH // 2 - game_over_text.get_width() // 2, SCREEN_HEIGHT // 2 - 50))
+        self.render_centered(ui, self.title_font, "GAME OVER", (255, 0, 0), SCREEN_HEIGHT // 2 - 50)
         
         if self.lives > 0:
             # Draw lives remaining
-            lives_text = self.font.render(f"Lives remaining: {self.lives}/{self.max_lives}", True, (255, 255, 255))
-            self.screen.blit(lives_text, (SCREEN_WIDTH // 2 - lives_text.get_width() // 2, SCREEN_HEIGHT // 2))
+            self.render_centered(ui, self.font, f"Lives remaining: {self.lives}/{self.max_lives}", (255, 255, 255), SCREEN_HEIGHT // 2)
             
             # Draw continue text
-            continue_text = self.font.render("Continuing...", True, (255, 255, 255))
-            self.screen.blit(continue_text, (SCREEN_WIDTH // 2 - continue_text.get_width() // 2, SCREEN_HEIGHT // 2 + 30))
+            self.render_centered(ui, self.font, "Continuing...", (255, 255, 255), SCREEN_HEIGHT // 2 + 30)
         else:
             # Draw game over message
-            message_text = self.font.render("Press ENTER to return to menu", True, (255, 255, 255))
-            self.screen.blit(message_text, (SCREEN_WIDTH // 2 - message_text.get_width() // 2, SCREEN_HEIGHT // 2 + 30))
+            self.render_centered(ui, self.font, "Press ENTER to return to menu", (255, 255, 255), SCREEN_HEIGHT // 2 + 30)
     
-    def render_level_complete(self):
+    def render_level_complete(self, ui):
         # Draw semi-transparent overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        self.screen.blit(overlay, (0, 0))
+        ui.blit(LAYER_HUD, self.dim_overlay, 0, 0)
         
         # Draw level complete text
-        level_complete_text = self.title_font.render("LEVEL COMPLETE!", True, (0, 255, 0))
-        self.screen.blit(level_complete_text, (SCREEN_WIDTH // 2 - level_complete_text.get_width() // 2, SCREEN_HEIGHT // 2 - 50))
+        self.render_centered(ui, self.title_font, "LEVEL COMPLETE!", (0, 255, 0), SCREEN_HEIGHT // 2 - 50)
         
         # Draw score
-        score_text = self.font.render(f"Score: {self.score}", True, (255, 255, 255))
-        self.screen.blit(score_text, (SCREEN_WIDTH // 2 - score_text.get_width() // 2, SCREEN_HEIGHT // 2))
+        self.render_centered(ui, self.font, f"Score: {self.score}", (255, 255, 255), SCREEN_HEIGHT // 2)
         
         # Draw continue text
-        continue_text = self.font.render("Continuing to next level...", True, (255, 255, 255))
-        self.screen.blit(continue_text, (SCREEN_WIDTH // 2 - continue_text.get_width() // 2, SCREEN_HEIGHT // 2 + 30))
+        self.render_centered(ui, self.font, "Continuing to next level...", (255, 255, 255), SCREEN_HEIGHT // 2 + 30)
     
-    def render_game_completed(self):
+    def render_game_completed(self, ui):
         # Draw semi-transparent overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        self.screen.blit(overlay, (0, 0))
+        ui.blit(LAYER_HUD, self.dim_overlay, 0, 0)
         
         # Draw game completed text
-        completed_text = self.title_font.render("GAME COMPLETED!", True, (0, 255, 255))
-        self.screen.blit(completed_text, (SCREEN_WIDTH // 2 - completed_text.get_width() // 2, SCREEN_HEIGHT // 2 - 50))
+        self.render_centered(ui, self.title_font, "GAME COMPLETED!", (0, 255, 255), SCREEN_HEIGHT // 2 - 50)
         
         # Draw final score
-        score_text = self.font.render(f"Final Score: {self.score}", True, (255, 255, 255))
-        self.screen.blit(score_text, (SCREEN_WIDTH // 2 - score_text.get_width() // 2, SCREEN_HEIGHT // 2))
+        self.render_centered(ui, self.font, f"Final Score: {self.score}", (255, 255, 255), SCREEN_HEIGHT // 2)
         
         # Draw return to menu text
-        menu_text = self.font.render("Press ENTER to return to menu", True, (255, 255, 255))
-        self.screen.blit(menu_text, (SCREEN_WIDTH // 2 - menu_text.get_width() // 2, SCREEN_HEIGHT // 2 + 30))
+        self.render_centered(ui, self.font, "Press ENTER to return to menu", (255, 255, 255), SCREEN_HEIGHT // 2 + 30)
         
         # Draw version number
         version_text = self.font.render(f"Version: {VERSION}", True, (255, 255, 255))
-        self.screen.blit(version_text, (SCREEN_WIDTH - version_text.get_width() - 10, SCREEN_HEIGHT - 30))
+        ui.blit(LAYER_HUD, version_text, SCREEN_WIDTH - version_text.get_width() - 10, SCREEN_HEIGHT - 30)
     
-    def render_playing(self):
-        # Clear the render surface with the level background color
-        self.render_surface.fill((0, 0, 0))  # Black background for the procedural background
-        
-        # Only draw sprites if not flickering
-        if self.glitch_engine.flicker_state:
-            # Draw level
-            self.current_level.draw(self.render_surface)
-            
-            # Draw player
-            self.player.draw(self.render_surface)
+    def record_world(self, level, scale=1):
+        """Record the draw commands for a level and the player"""
+        queue = self.render_queue
+        queue.begin(scale)
         
-        # Apply glitch effects to the render surface
-        self.glitch_engine.apply_screen_effects(self.render_surface)
+        # Draw level
+        level.draw(queue)
         
-        # Copy the processed render surface to the screen
-        self.screen.blit(self.render_surface, (0, 0))
+        # Draw player
+        self.player.draw(queue)
         
-        # Draw HUD (not affected by glitches)
-        self.render_hud()
+        return queue.take()
+    
+    def composite_world(self, surface, snapshot):
+        """Draw a snapshot's world and post effects into a surface at its scale"""
+        # Clear the render surface; the background covers it
+        surface.fill((0, 0, 0))
+        stats = draw_commands(surface, snapshot.world, snapshot.scale, snapshot.offset)
+        
+        # Level effects apply to the drawn world, glitch effects to everything
+        draw_level_effect(surface, snapshot.level_effect, snapshot.scale)
+        self.glitch_engine.apply_screen_effects(surface, snapshot.effects, snapshot.scale)
+        return stats
     
-    def render_hud(self):
+    def render_hud(self, hud):
+        # HUD text is queued and drawn in one batch at full resolution
         # Draw level name
         level_text = self.font.render(f"Level {self.current_level_index + 1}: {self.current_level.name}", True, (255, 255, 255))
-        self.screen.blit(level_text, (10, 10))
+        hud.blit(LAYER_HUD, level_text, 10, 10)
         
         # Draw lives
         lives_text = self.font.render(f"Lives: {self.lives}/{self.max_lives}", True, (255, 255, 255))
-        self.screen.blit(lives_text, (10, 40))
+        hud.blit(LAYER_HUD, lives_text, 10, 40)
         
         # Draw score
         score_text = self.font.render(f"Score: {self.score}", True, (255, 255, 255))
-        self.screen.blit(score_text, (10, 70))
+        hud.blit(LAYER_HUD, score_text, 10, 70)
         
         # Draw music status
         music_text = self.font.render(f"Music: {self.sound_manager.get_music_status()}", True, (255, 255, 255))
-        self.screen.blit(music_text, (10, 100))
+        hud.blit(LAYER_HUD, music_text, 10, 100)
         
         # Draw version number
         version_text = self.font.render(f"Version: {VERSION}", True, (255, 255, 255))
-        self.screen.blit(version_text, (SCREEN_WIDTH - version_text.get_width() - 10, 10))
+        hud.blit(LAYER_HUD, version_text, SCREEN_WIDTH - version_text.get_width() - 10, 10)
+        
+        # Show that time is running backwards
+        if self.rewinding:
+            self.render_centered(hud, self.title_font, "<< REWIND", (0, 255, 255), SCREEN_HEIGHT - 80)
+        
+        # Show that the game is paused or not running at normal speed
+        if self.game_clock.paused:
+            self.render_centered(hud, self.title_font, "PAUSED", (255, 255, 255), SCREEN_HEIGHT // 2)
+        elif self.game_clock.time_scale != 1.0:
+            scale_text = self.font.render(f"Speed: x{self.game_clock.time_scale:g}", True, (255, 255, 255))
+            hud.blit(LAYER_HUD, scale_text, SCREEN_WIDTH - scale_text.get_width() - 10, SCREEN_HEIGHT - 30)
         
         # Draw active glitches
         if self.glitch_engine.active_glitches:
-            active_glitches = [g['effect'].__name__.replace('_', ' ').upper() for g in self.glitch_engine.active_glitches]
-            glitch_text = self.font.render(f"Active Glitches: {', '.join(active_glitches)}", True, GLITCH_COLOR)
-            self.screen.blit(glitch_text, (10, SCREEN_HEIGHT - 30))
+            glitch_text = self.font.render(f"Active Glitches: {self.glitch_engine.active_labels}", True, GLITCH_COLOR)
+            hud.blit(LAYER_HUD, glitch_text, 10, SCREEN_HEIGHT - 30)
         
         # Draw debug info
         if DEBUG_MODE:
             fps_text = self.font.render(f"FPS: {int(self.clock.get_fps())}", True, (255, 255, 255))
-            self.screen.blit(fps_text, (SCREEN_WIDTH - 100, 40))
+            hud.blit(LAYER_HUD, fps_text, SCREEN_WIDTH - 100, 40)
+            
+            # Draw input-to-present latency
+            last, average, p95, worst = self.latency_monitor.stats()
+            latency_text = self.font.render(f"Input latency: {last} ms (avg {average:.0f}, p95 {p95}, max {worst})", True, (255, 255, 255))
+            hud.blit(LAYER_HUD, latency_text, 10, 130)
+            
+            # Draw internal render scale and frame work time
+            scaler = self.render_scaler
+            width, height = scaler.size
+            scale_text = self.font.render(f"Render: {width}x{height} ({scaler.scale:.0%}), {scaler.average_ms:.1f}/{scaler.budget_ms} ms, quality {QUALITY.name}", True, (255, 255, 255))
+            hud.blit(LAYER_HUD, scale_text, 10, 150)
+            
+            # Draw effect governor adjustments
+            governor_text = self.font.render(f"Effects shed: {self.effect_governor.level}", True, (255, 255, 255))
+            hud.blit(LAYER_HUD, governor_text, 10, 170)
+            for i, entry in enumerate(self.effect_governor.log):
+                log_text = self.font.render(entry, True, (255, 255, 255))
+                hud.blit(LAYER_HUD, log_text, 10, 190 + i * 20)
+            
+            # Draw render queue counts for the world, from whichever thread draws it
+            target = self.render_thread.target if self.render_thread else self.render_target
+            submitted, culled, batches = target.draw_stats
+            queue_text = self.font.render(f"Draw calls: {submitted} queued, {culled} culled, {batches} batches", True, (255, 255, 255))
+            hud.blit(LAYER_HUD, queue_text, 10, 270)
+            
+            # Draw tint/alpha variant cache use
+            variants_text = self.font.render(f"Variants: {len(VARIANTS.variants)} cached ({VARIANTS.bytes // 1024} KB), {VARIANTS.hits} hits, {VARIANTS.misses} misses, {VARIANTS.evictions} evicted", True, (255, 255, 255))
+            hud.blit(LAYER_HUD, variants_text, 10, 290)
+            
+            # Draw rewind history use
+            if self.rewind is not None:
+                history_text = self.font.render(f"Rewind: {len(self.rewind) / FPS:.1f} s, {self.rewind.bytes // 1024} KB, capture {self.rewind.capture_ms:.2f} ms", True, (255, 255, 255))
+                hud.blit(LAYER_HUD, history_text, 10, 310)
+            
+            # Draw the render thread's time per frame
+            if self.render_thread:
+                thread_text = self.font.render(f"Render thread: {self.render_thread.render_ms:.1f} ms", True, (255, 255, 255))
+                hud.blit(LAYER_HUD, thread_text, 10, 330)
             
             # Draw controls help
             controls = [
                 "Controls:",
                 "Arrow Keys: Move",
                 "Space: Jump/Double Jump",
+                "P: Pause",
+                "F9: Capture Frames",
+                "F10: Profile Frames",
                 "Wall Slide: Touch wall while falling",
                 "F3: Toggle Debug Mode"
             ]
             
             for i, text in enumerate(controls):
                 help_text = self.font.render(text, True, (255, 255, 255))
-                self.screen.blit(help_text, (SCREEN_WIDTH - 250, 70 + i * 20))
+                hud.blit(LAYER_HUD, help_text, SCREEN_WIDTH - 250, 70 + i * 20)
     
-    def render(self):
+    def build_snapshot(self):
+        """Record everything needed to draw the current frame"""
+        ui = self.hud_queue
+        ui.begin()
+        world = level_effect = None
+        offset = (0, 0)
+        effects = ()
+        
         if self.game_state == "menu":
-            self.render_menu()
-        elif self.game_state == "playing":
-            self.render_playing()
-        elif self.game_state == "game_over":
-            self.render_playing()  # Draw the game in the background
-            self.render_game_over()
-        elif self.game_state == "level_complete":
-            self.render_playing()  # Draw the game in the background
-            self.render_level_complete()
-        elif self.game_state == "game_completed":
-            self.render_playing()  # Draw the game in the background
-            self.render_game_completed()
+            self.render_menu(ui)
+        else:
+            # The game is drawn in the background of every other state
+            level = self.current_level
+            offset = (level.shake_offset_x, level.shake_offset_y)
+            
+            # Only draw sprites if not flickering
+            world = self.record_world(level, self.render_scaler.scale) if self.glitch_engine.flicker_state else ()
+            level_effect = level.effect_params(self.rng.visual)
+            effects = self.glitch_engine.snapshot_effects()
+            
+            # The glitch notification and HUD are drawn at full resolution
+            self.glitch_engine.draw_notification(ui)
+            self.render_hud(ui)
+            
+            if self.game_state == "game_over":
+                self.render_game_over(ui)
+            elif self.game_state == "level_complete":
+                self.render_level_complete(ui)
+            elif self.game_state == "game_completed":
+                self.render_game_completed(ui)
+        
+        # Profiling progress and the last profile's summary go over everything
+        self.profiler.draw(ui)
+        
+        return RenderSnapshot(self.frame, world, offset, self.render_scaler.scale, level_effect,
+                              effects, ui.take(), self.latency_monitor.take_pending())
+    
+    def render_snapshot(self, snapshot, target):
+        """Draw a snapshot to the screen through a render target and present it"""
+        if snapshot.world is not None:
+            # Match the render surface to the snapshot's internal scale
+            surface = target.surface_for(scaled_size(snapshot.scale))
+            target.draw_stats = self.composite_world(surface, snapshot)
+            
+            # Copy the processed render surface to the screen, upscaling it once
+            if snapshot.scale == 1:
+                self.screen.blit(surface, (0, 0))
+            else:
+                pygame.transform.scale(surface, self.screen.get_size(), self.screen)
+        
+        # Draw the notification, HUD and menus
+        draw_commands(self.screen, snapshot.overlay)
+        
+        # Hand the finished frame to the capture writer
+        capture = self.capture
+        if capture:
+            capture.capture(self.screen, snapshot.frame)
         
         # Update the display
-        pygame.display.flip()
+        if not self.headless:
+            pygame.display.flip()
+            self.latency_monitor.frame_presented(snapshot.input_time)
+    
+    def render(self):
+        self.render_snapshot(self.build_snapshot(), self.render_target)
+    
+    def start_capture(self):
+        self.capture = FrameCapture(self.capture_dir, self.capture_format, self.screen.get_size())
+        self.capture.start()
+    
+    def stop_capture(self):
+        """Stop capturing and write out the frames still queued"""
+        capture, self.capture = self.capture, None
+        if capture:
+            capture.stop()
     
     def run(self):
+        # Start writing telemetry for this session
+        self.telemetry.start({
+            'version': VERSION,
+            'seed': self.seed,
+            'quality': QUALITY.name,
+            'glitches': [glitch.name for glitch in self.glitch_engine.glitch_effects],
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        })
+        
+        # Draw on a separate thread in pipelined mode
+        if self.pipelined:
+            self.render_thread = RenderThread(self.render_snapshot, self.render_scaler.size)
+            self.render_thread.start()
+        
         # Game loop
+        first_frame = True
         while self.running:
-            self.handle_events()
+            self.profiler.begin_frame()
+            frame_start = time.perf_counter()
+            events = pygame.event.get()
+            if self.recorder:
+                self.recorder.record_frame(events)
+            self.handle_events(events)
+            if self.level_watcher:
+                self.level_watcher.poll(self)
             self.update()
-            self.render()
+            snapshot = self.build_snapshot()
+            
+            # Frame time is the slower of the two sides when they overlap
+            if self.render_thread:
+                work_ms = (time.perf_counter() - frame_start) * 1000
+                self.render_thread.submit(snapshot)
+                work_ms = max(work_ms, self.render_thread.render_ms)
+            else:
+                self.render_snapshot(snapshot, self.render_target)
+                work_ms = (time.perf_counter() - frame_start) * 1000
+            
+            # Startup ends with the first menu frame
+            if first_frame:
+                first_frame = False
+                self.startup.mark('first_frame')
+                if self.profile_startup:
+                    print(self.startup.report())
+                    print(self.startup.report_json())
+                    self.running = False
+            
+            # Adapt to the frame's work time: shed effects before lowering the
+            # render scale, and raise the scale before restoring effects
+            can_lower = self.effect_governor.exhausted
+            self.effect_governor.frame_finished(work_ms, self.frame, can_restore=self.render_scaler.index == 0)
+            self.render_scaler.frame_finished(work_ms, can_lower=can_lower)
+            self.telemetry.record(FRAME, self.frame, self.score, work_ms)
+            self.profiler.end_frame()
             self.clock.tick(FPS)
+        
+        # Let the last frame finish before shutting down
+        if self.render_thread:
+            self.render_thread.stop()
+        
+        # Write out a profile cut short by quitting
+        self.profiler.finish()
+        
+        # Write out the rest of the telemetry and captured frames
+        self.telemetry.close(self.frame, self.score)
+        self.stop_capture()
+        
+        # Save the recorded session for verification
+        if self.recorder:
+            path = self.recorder.save(self.record_dir, self)
+            print(f"Session recorded to: {path}")
+        
+        if self.latency_monitor.total_frames:
+            print(self.latency_monitor.summary())
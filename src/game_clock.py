@@ -0,0 +1,75 @@
+"""
+Virtual game clock
+
+Gameplay time is counted in simulation ticks, one per Game.step, and a tick
+is always 1 / FPS seconds of game time however long it took to simulate.
+Timers are deadlines in ticks, so a headless game simulated as fast as
+possible, a paused game and a slowed-down game all see the same gameplay.
+
+The Game owns one GameClock and asks it each frame how many ticks to run:
+none while paused, and time_scale ticks a frame on average otherwise, with
+fractions carried over to later frames. Pausing and scaling are driven by
+key events, so recorded sessions replay them exactly.
+"""
+import pygame
+from src.constants import *
+
+PAUSE_KEY = pygame.K_p
+
+# Dev mode keys that halve and double the time scale
+SLOWER_KEY = pygame.K_LEFTBRACKET
+FASTER_KEY = pygame.K_RIGHTBRACKET
+
+class GameClock:
+    """Simulation time of one game"""
+
+    def __init__(self, time_scale=1.0):
+        self.tick = 0
+        self.paused = False
+        self.time_scale = 1.0
+        self.set_time_scale(time_scale)
+
+        # Fraction of a tick owed to the next frame
+        self.pending = 0.0
+
+    @property
+    def time(self):
+        """Game time in seconds"""
+        return self.tick / FPS
+
+    def ticks(self, seconds):
+        """Convert a duration in seconds to ticks"""
+        return int(seconds * FPS)
+
+    def steps(self):
+        """Number of ticks to simulate this frame"""
+        if self.paused:
+            return 0
+        self.pending += self.time_scale
+        steps = int(self.pending)
+        self.pending -= steps
+        return steps
+
+    def advance(self):
+        """Count one simulated tick"""
+        self.tick += 1
+
+    def deadline(self, seconds):
+        """Tick that is a duration from now"""
+        return self.tick + self.ticks(seconds)
+
+    def expired(self, deadline):
+        """True once the clock is past a deadline"""
+        return self.tick > deadline
+
+    def seconds_since(self, tick):
+        """Game time in seconds since a tick"""
+        return (self.tick - tick) / FPS
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+        self.pending = 0.0
+
+    def set_time_scale(self, time_scale):
+        """Set how many ticks are simulated per frame, within TIME_SCALE_MIN and TIME_SCALE_MAX"""
+        self.time_scale = min(max(time_scale, TIME_SCALE_MIN), TIME_SCALE_MAX)
@@ -1,34 +1,43 @@
 import pygame
-import random
-import time
+import heapq
 from src.constants import *
+from src.glitches import GLITCH_REGISTRY
+from src.render_queue import LAYER_HUD
+from src.fonts import get_font
+from src.telemetry import GLITCH
 
 class GlitchEngine:
     def __init__(self, game):
         self.game = game
-        self.active_glitches = []
+        
+        # The game's random streams
+        self.rng = game.rng
         self.glitch_timer = 0
         self.glitch_interval = GLITCH_INTERVAL
         self.glitch_duration = GLITCH_DURATION
-        self.last_glitch_time = time.time()
         self.notification_text = ""
-        self.notification_time = 0
+        self.notification_surface = None
+        self.notification_font = None
+        
+        # Glitch timing is read from the game clock, in its ticks
+        self.clock = game.game_clock
+        self.last_glitch_tick = 0
+        self.notification_tick = 0
         
-        # Available glitch effects
-        self.glitch_effects = [
-            self.reversed_gravity,
-            self.flickering_sprites,
-            self.input_lag,
-            self.color_distortion,
-            self.screen_shake,
-            self.platform_disappear,
-            self.speed_change,
-            self.pixelation
-        ]
+        # One instance of every registered glitch effect
+        self.glitch_effects = [cls(self) for cls in GLITCH_REGISTRY.values()]
+        
+        # Active glitches in activation order, the subsets with per-frame and
+        # render work, and a heap of (end tick, sequence, glitch) for expiry
+        self.active_glitches = []
+        self.active_labels = ""
+        self.updating_glitches = []
+        self.rendering_glitches = []
+        self.expiry_heap = []
+        self.expiry_sequence = 0
         
         # Glitch state variables
         self.original_gravity = GRAVITY
-        self.input_buffer = []
         self.input_lag_frames = 0
         self.flicker_state = True
         self.flicker_timer = 0
@@ -40,253 +49,113 @@ class GlitchEngine:
         self.speed_multiplier = 1.0
         self.disappearing_platforms = []
         
-        # Surface for post-processing effects
+        # Surface for post-processing effects and the scale it is drawn at
         self.screen_surface = None
+        self.render_scale = 1
     
     def update(self):
-        current_time = time.time()
-        
         # Check if it's time for a new glitch
-        if current_time - self.last_glitch_time > self.glitch_interval:
+        if self.clock.seconds_since(self.last_glitch_tick) > self.glitch_interval:
             self.trigger_random_glitch()
-            self.last_glitch_time = current_time
+            self.last_glitch_tick = self.clock.tick
             
             # Play glitch sound if available
             if hasattr(self.game, 'sound_manager'):
                 self.game.sound_manager.play_sound('glitch')
         
-        # Update active glitches
-        for glitch in self.active_glitches[:]:
-            if current_time - glitch['start_time'] > self.glitch_duration:
+        # Expire glitches whose end tick has passed
+        heap = self.expiry_heap
+        while heap and self.clock.expired(heap[0][0]):
+            end_tick, _, glitch = heapq.heappop(heap)
+            # Skip stale entries left by a glitch that was re-triggered
+            if glitch.active and glitch.end_tick == end_tick:
                 self.end_glitch(glitch)
-                self.active_glitches.remove(glitch)
-            else:
-                # Update glitch effects
-                if glitch['effect'].__name__ == 'flickering_sprites':
-                    self.update_flickering()
-                elif glitch['effect'].__name__ == 'screen_shake':
-                    self.update_screen_shake()
-                elif glitch['effect'].__name__ == 'platform_disappear':
-                    self.update_disappearing_platforms()
+        
+        # Run per-frame work only for glitches that have any
+        for glitch in self.updating_glitches:
+            glitch.update()
     
     def trigger_random_glitch(self):
-        # Choose a random glitch effect
-        effect = random.choice(self.glitch_effects)
-        
-        # Start the glitch
-        glitch = {
-            'effect': effect,
-            'start_time': time.time()
-        }
+        # Choose a random glitch effect and start it
+        glitch = self.rng.gameplay.choice(self.glitch_effects)
+        self.start_glitch(glitch)
         
+        # Record the activation in the session telemetry if available
+        if hasattr(self.game, 'telemetry'):
+            self.game.telemetry.record(GLITCH, self.game.frame, self.game.score, self.glitch_effects.index(glitch))
+    
+    def start_glitch(self, glitch):
+        """Activate a glitch and schedule its expiry"""
         # Apply the glitch effect
-        effect(True)
+        glitch.activate()
+        
+        if not glitch.active:
+            glitch.active = True
+            self.active_glitches.append(glitch)
+            self._refresh_hook_lists()
         
-        # Add to active glitches
-        self.active_glitches.append(glitch)
+        # Schedule expiry
+        glitch.end_tick = self.clock.deadline(self.glitch_duration)
+        self.expiry_sequence += 1
+        heapq.heappush(self.expiry_heap, (glitch.end_tick, self.expiry_sequence, glitch))
         
         # Set notification
-        self.notification_text = f"GLITCH: {effect.__name__.replace('_', ' ').upper()}"
-        self.notification_time = time.time()
+        self.notification_text = f"GLITCH: {glitch.label}"
+        self.notification_surface = None
+        self.notification_tick = self.clock.tick
     
     def end_glitch(self, glitch):
         # Revert the glitch effect
-        glitch['effect'](False)
-    
-    def reversed_gravity(self, activate):
-        if activate:
-            # Reverse gravity
-            self.game.player.velocity_y = -self.game.player.velocity_y  # Immediate direction change
-            self.game.player.gravity = -self.original_gravity
-            # Set a ceiling boundary for reversed gravity
-            self.game.player.ceiling_enabled = True
-        else:
-            # Restore normal gravity
-            self.game.player.velocity_y = -self.game.player.velocity_y  # Immediate direction change
-            self.game.player.gravity = self.original_gravity
-            self.game.player.ceiling_enabled = False
-    
-    def flickering_sprites(self, activate):
-        if activate:
-            self.flicker_timer = 0
-            self.flicker_state = True
-        else:
-            # Ensure sprites are visible when effect ends
-            self.flicker_state = True
-    
-    def update_flickering(self):
-        # Update flicker state every few frames
-        self.flicker_timer += 1
-        if self.flicker_timer >= 5:  # Adjust for flicker speed
-            self.flicker_state = not self.flicker_state
-            self.flicker_timer = 0
-    
-    def input_lag(self, activate):
-        if activate:
-            # Set random input lag between 5-15 frames
-            self.input_lag_frames = random.randint(5, 15)
-            self.input_buffer = []
-        else:
-            # Clear input lag
-            self.input_lag_frames = 0
-            self.input_buffer = []
-    
-    def process_input(self, event):
-        # If input lag is active, buffer the input
-        if self.input_lag_frames > 0:
-            self.input_buffer.append((pygame.time.get_ticks(), event))
-            return None
-        return event
-    
-    def get_lagged_input(self):
-        current_time = pygame.time.get_ticks()
-        result = []
-        
-        # Process buffered inputs that have waited long enough
-        for timestamp, event in self.input_buffer[:]:
-            if current_time - timestamp >= self.input_lag_frames * (1000 / FPS):
-                result.append(event)
-                self.input_buffer.remove((timestamp, event))
-        
-        return result
-    
-    def color_distortion(self, activate):
-        if activate:
-            # Random color shift
-            self.color_shift = (
-                random.randint(-100, 100),
-                random.randint(-100, 100),
-                random.randint(-100, 100)
-            )
-        else:
-            # Reset color
-            self.color_shift = (0, 0, 0)
-    
-    def screen_shake(self, activate):
-        if activate:
-            self.shake_amount = random.randint(5, 15)
-        else:
-            self.shake_amount = 0
-            self.screen_offset = (0, 0)
-    
-    def update_screen_shake(self):
-        if self.shake_amount > 0:
-            self.screen_offset = (
-                random.randint(-self.shake_amount, self.shake_amount),
-                random.randint(-self.shake_amount, self.shake_amount)
-            )
-    
-    def pixelation(self, activate):
-        if activate:
-            self.pixel_size = random.choice([2, 3, 4, 6, 8])
-        else:
-            self.pixel_size = 1
-    
-    def speed_change(self, activate):
-        if activate:
-            # Random speed multiplier between 0.5 and 2.0
-            self.speed_multiplier = random.uniform(0.5, 2.0)
-            self.game.player.speed = PLAYER_SPEED * self.speed_multiplier
-        else:
-            # Reset speed
-            self.game.player.speed = PLAYER_SPEED
-            self.speed_multiplier = 1.0
-    
-    def platform_disappear(self, activate):
-        if activate:
-            # Select random platforms to disappear
-            if hasattr(self.game, 'current_level'):
-                all_platforms = list(self.game.current_level.platforms.sprites())
-                # Don't make the ground platform disappear
-                potential_platforms = [p for p in all_platforms if p.rect.y < SCREEN_HEIGHT - 100]
-                
-                if potential_platforms:
-                    # Choose 1-3 platforms to disappear
-                    num_to_disappear = min(len(potential_platforms), random.randint(1, 3))
-                    self.disappearing_platforms = random.sample(potential_platforms, num_to_disappear)
-                    
-                    # Set initial alpha
-                    for platform in self.disappearing_platforms:
-                        platform.original_image = platform.image.copy()
-                        platform.alpha = 255
-                        platform.disappearing = True
-        else:
-            # Restore all platforms
-            for platform in self.disappearing_platforms:
-                if hasattr(platform, 'original_image'):
-                    platform.image = platform.original_image
-                    platform.disappearing = False
-                    platform.solid = True
-                    platform.alpha = 255
-            self.disappearing_platforms = []
+        glitch.deactivate()
+        glitch.active = False
+        self.active_glitches.remove(glitch)
+        self._refresh_hook_lists()
+    
+    def _refresh_hook_lists(self):
+        self.active_labels = ", ".join(g.label for g in self.active_glitches)
+        self.updating_glitches = [g for g in self.active_glitches if g.has_update]
+        self.rendering_glitches = sorted(
+            (g for g in self.active_glitches if g.has_render),
+            key=lambda g: g.render_order
+        )
+    
+    def reset(self):
+        """Revert every active glitch and restart the glitch timer"""
+        for glitch in self.active_glitches[:]:
+            self.end_glitch(glitch)
+        self.expiry_heap = []
+        self.last_glitch_tick = self.clock.tick
+        self.notification_text = ""
+        self.notification_surface = None
+        self.notification_tick = 0
     
-    def update_disappearing_platforms(self):
-        # Gradually make platforms transparent
-        for platform in self.disappearing_platforms:
-            if hasattr(platform, 'disappearing') and platform.disappearing:
-                platform.alpha = max(0, platform.alpha - 5)
-                
-                # Create a transparent version of the original image
-                platform.image = platform.original_image.copy()
-                platform.image.set_alpha(platform.alpha)
-                
-                # When fully transparent, disable collisions
-                if platform.alpha <= 0:
-                    platform.solid = False
-                else:
-                    platform.solid = True
+    def snapshot_effects(self):
+        """Return this frame's post effects as (glitch, params) pairs in render order"""
+        return tuple((glitch, glitch.render_params()) for glitch in self.rendering_glitches)
     
-    def apply_screen_effects(self, screen):
-        # Create a copy of the screen if needed
-        if self.screen_surface is None or self.screen_surface.get_size() != screen.get_size():
-            self.screen_surface = pygame.Surface(screen.get_size())
-        
-        # Copy the current screen
-        self.screen_surface.blit(screen, (0, 0))
-        
-        # Apply color distortion
-        if self.color_shift != (0, 0, 0):
-            # Simple color shift by drawing a semi-transparent overlay
-            overlay = pygame.Surface(screen.get_size())
-            r = max(0, min(255, 128 + self.color_shift[0]))
-            g = max(0, min(255, 128 + self.color_shift[1]))
-            b = max(0, min(255, 128 + self.color_shift[2]))
-            overlay.fill((r, g, b))
-            overlay.set_alpha(50)  # Semi-transparent
-            screen.blit(overlay, (0, 0))
-        
-        # Apply screen shake
-        if self.shake_amount > 0:
-            temp_surface = pygame.Surface(screen.get_size())
-            temp_surface.fill((0, 0, 0))  # Fill with black
-            temp_surface.blit(self.screen_surface, self.screen_offset)
-            screen.blit(temp_surface, (0, 0))
+    def apply_screen_effects(self, screen, effects, scale=1):
+        """Post-process a frame with effects from snapshot_effects()"""
+        # Effects are sized in screen pixels and scaled to the render surface
+        self.render_scale = scale
         
-        # Apply pixelation
-        if self.pixel_size > 1:
-            width, height = screen.get_size()
-            
-            # Scale down
-            small_surface = pygame.transform.scale(
-                screen, 
-                (width // self.pixel_size, height // self.pixel_size)
-            )
-            
-            # Scale back up (pixelated)
-            pixelated = pygame.transform.scale(
-                small_surface,
-                (width, height)
-            )
-            
-            # Replace screen content
-            screen.blit(pixelated, (0, 0))
+        # Keep an untouched copy of the frame for effects that need one
+        if any(glitch.needs_source for glitch, params in effects):
+            if self.screen_surface is None or self.screen_surface.get_size() != screen.get_size():
+                self.screen_surface = pygame.Surface(screen.get_size())
+            self.screen_surface.blit(screen, (0, 0))
         
-        # Draw glitch notification
-        current_time = time.time()
-        if current_time - self.notification_time < GLITCH_NOTIFICATION_TIME and self.notification_text:
-            font = pygame.font.SysFont(None, 48)
-            text_surface = font.render(self.notification_text, True, GLITCH_COLOR)
-            text_rect = text_surface.get_rect(center=(SCREEN_WIDTH // 2, 50))
-            screen.blit(text_surface, text_rect)
+        # Apply active glitch effects in render order
+        for glitch, params in effects:
+            glitch.render(screen, params)
         
         return screen
+    
+    def draw_notification(self, queue):
+        # Queue the glitch notification
+        if self.notification_text and self.clock.seconds_since(self.notification_tick) < GLITCH_NOTIFICATION_TIME:
+            if self.notification_surface is None:
+                if self.notification_font is None:
+                    self.notification_font = get_font(48)
+                self.notification_surface = self.notification_font.render(self.notification_text, True, GLITCH_COLOR)
+            text_rect = self.notification_surface.get_rect(center=(SCREEN_WIDTH // 2, 50))
+            queue.blit(LAYER_HUD, self.notification_surface, text_rect.x, text_rect.y)
@@ -0,0 +1,302 @@
+"""
+Glitch effects for the GlitchEngine
+
+Each glitch is a class registered with @register_glitch. The engine creates
+one instance of every registered glitch and calls its hooks:
+
+- activate(): the glitch starts
+- deactivate(): the glitch ends and must undo its changes
+- update(): once per frame while active (only if has_update is True)
+- render_params(): once per frame while active (only if has_render is
+  True), on the simulation side; returns an immutable value describing
+  what render() should draw for this frame
+- render(screen, params): post-processes the frame with the values from
+  render_params(), in ascending render_order. It may run on the render
+  thread (see src/render_thread.py), so it must not read game state, only
+  params and caches of its own. Glitches with needs_source set get an
+  untouched copy of the frame in engine.screen_surface. The frame may be
+  drawn below screen size; engine.render_scale is its scale factor
+
+New glitches only need to be defined and registered here; the engine picks
+them up automatically.
+"""
+import pygame
+from src.constants import *
+from src.quality import QUALITY
+from src.variant_cache import VARIANTS
+
+# Registered glitch classes, in registration order
+GLITCH_REGISTRY = {}
+
+def register_glitch(cls):
+    """Class decorator adding a glitch to the registry"""
+    GLITCH_REGISTRY[cls.name] = cls
+    return cls
+
+class Glitch:
+    """Base class for glitch effects"""
+    name = ''
+    has_update = False
+    has_render = False
+    render_order = 0
+    needs_source = False
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.game = engine.game
+        # Display label is computed once instead of on every HUD frame
+        self.label = self.name.replace('_', ' ').upper()
+        self.active = False
+        self.end_tick = 0
+
+    def activate(self):
+        pass
+
+    def deactivate(self):
+        pass
+
+    def update(self):
+        pass
+
+    def render_params(self):
+        return None
+
+    def render(self, screen, params):
+        pass
+
+@register_glitch
+class ReversedGravity(Glitch):
+    name = 'reversed_gravity'
+
+    def activate(self):
+        player = self.game.player
+        player.velocity_y = -player.velocity_y  # Immediate direction change
+        player.gravity = -self.engine.original_gravity
+        # Set a ceiling boundary for reversed gravity
+        player.ceiling_enabled = True
+
+    def deactivate(self):
+        player = self.game.player
+        player.velocity_y = -player.velocity_y  # Immediate direction change
+        player.gravity = self.engine.original_gravity
+        player.ceiling_enabled = False
+
+@register_glitch
+class FlickeringSprites(Glitch):
+    name = 'flickering_sprites'
+    has_update = True
+
+    def activate(self):
+        self.engine.flicker_timer = 0
+        self.engine.flicker_state = True
+
+    def deactivate(self):
+        # Ensure sprites are visible when effect ends
+        self.engine.flicker_state = True
+
+    def update(self):
+        # Update flicker state every few frames
+        engine = self.engine
+        engine.flicker_timer += 1
+        if engine.flicker_timer >= 5:  # Adjust for flicker speed
+            engine.flicker_state = not engine.flicker_state
+            engine.flicker_timer = 0
+
+@register_glitch
+class InputLag(Glitch):
+    name = 'input_lag'
+
+    def activate(self):
+        # Set random input lag between 5-15 frames
+        self.engine.input_lag_frames = self.engine.rng.gameplay.randint(5, 15)
+
+    def deactivate(self):
+        # Clear input lag; held-back input is released on the next frame
+        self.engine.input_lag_frames = 0
+
+@register_glitch
+class ColorDistortion(Glitch):
+    name = 'color_distortion'
+    has_render = True
+    render_order = 0
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.overlay = None
+        self.overlay_tint = None
+
+    def activate(self):
+        # Random color shift
+        self.engine.color_shift = (
+            self.engine.rng.visual.randint(-100, 100),
+            self.engine.rng.visual.randint(-100, 100),
+            self.engine.rng.visual.randint(-100, 100)
+        )
+
+    def deactivate(self):
+        # Reset color
+        self.engine.color_shift = (0, 0, 0)
+
+    def render_params(self):
+        shift = self.engine.color_shift
+        tint = (
+            max(0, min(255, 128 + shift[0])),
+            max(0, min(255, 128 + shift[1])),
+            max(0, min(255, 128 + shift[2]))
+        )
+        return tint, QUALITY.overlay_blending
+
+    def render(self, screen, params):
+        # Simple color shift by drawing a semi-transparent overlay; the tint
+        # is fixed for the glitch's lifetime so the overlay is built once
+        tint, overlay_blending = params
+        
+        # Without overlay blending, tint every few scanlines instead
+        if not overlay_blending:
+            width, height = screen.get_size()
+            step = max(2, round(SCANLINE_SPACING * self.engine.render_scale))
+            for y in range(0, height, step):
+                screen.fill(tint, (0, y, width, 1))
+            return
+        
+        if self.overlay is None or self.overlay_tint != tint or self.overlay.get_size() != screen.get_size():
+            self.overlay = pygame.Surface(screen.get_size())
+            self.overlay_tint = tint
+            self.overlay.fill(tint)
+            self.overlay.set_alpha(50)  # Semi-transparent
+        screen.blit(self.overlay, (0, 0))
+
+@register_glitch
+class ScreenShake(Glitch):
+    name = 'screen_shake'
+    has_update = True
+    has_render = True
+    render_order = 1
+    needs_source = True
+
+    def activate(self):
+        self.engine.shake_amount = self.engine.rng.visual.randint(5, 15)
+
+    def deactivate(self):
+        self.engine.shake_amount = 0
+        self.engine.screen_offset = (0, 0)
+
+    def update(self):
+        amount = self.engine.shake_amount
+        if amount > 0:
+            self.engine.screen_offset = (
+                self.engine.rng.visual.randint(-amount, amount),
+                self.engine.rng.visual.randint(-amount, amount)
+            )
+
+    def render_params(self):
+        return self.engine.screen_offset
+
+    def render(self, screen, params):
+        # Shift the pre-effect copy of the frame, filling the gap with black
+        scale = self.engine.render_scale
+        offset_x, offset_y = params
+        screen.fill((0, 0, 0))
+        screen.blit(self.engine.screen_surface, (int(offset_x * scale), int(offset_y * scale)))
+
+@register_glitch
+class PlatformDisappear(Glitch):
+    name = 'platform_disappear'
+    has_update = True
+
+    def activate(self):
+        engine = self.engine
+        # Select random platforms to disappear
+        if hasattr(self.game, 'current_level'):
+            all_platforms = list(self.game.current_level.platforms.sprites())
+            # Don't make the ground platform disappear
+            potential_platforms = [p for p in all_platforms if p.rect.y < SCREEN_HEIGHT - 100]
+
+            if potential_platforms:
+                # Choose 1-3 platforms to disappear
+                num_to_disappear = min(len(potential_platforms), engine.rng.gameplay.randint(1, 3))
+                engine.disappearing_platforms = engine.rng.gameplay.sample(potential_platforms, num_to_disappear)
+
+                # Set initial alpha; fades are drawn from the platform's
+                # original image
+                for platform in engine.disappearing_platforms:
+                    platform.alpha = 255
+                    platform.disappearing = True
+
+    def deactivate(self):
+        # Restore all platforms
+        for platform in self.engine.disappearing_platforms:
+            if hasattr(platform, 'original_image'):
+                platform.image = platform.original_image
+                platform.disappearing = False
+                platform.solid = True
+                platform.alpha = 255
+        self.engine.disappearing_platforms = []
+
+    def update(self):
+        # Gradually make platforms transparent
+        for platform in self.engine.disappearing_platforms:
+            if hasattr(platform, 'disappearing') and platform.disappearing:
+                platform.alpha = max(0, platform.alpha - 5)
+
+                # Look up a transparent version of the original image
+                platform.image = VARIANTS.faded(platform.original_image, platform.alpha)
+
+                # When fully transparent, disable collisions
+                if platform.alpha <= 0:
+                    platform.solid = False
+                else:
+                    platform.solid = True
+
+@register_glitch
+class SpeedChange(Glitch):
+    name = 'speed_change'
+
+    def activate(self):
+        # Random speed multiplier between 0.5 and 2.0
+        self.engine.speed_multiplier = self.engine.rng.gameplay.uniform(0.5, 2.0)
+        self.game.player.speed = PLAYER_SPEED * self.engine.speed_multiplier
+
+    def deactivate(self):
+        # Reset speed
+        self.game.player.speed = PLAYER_SPEED
+        self.engine.speed_multiplier = 1.0
+
+@register_glitch
+class Pixelation(Glitch):
+    name = 'pixelation'
+    has_render = True
+    render_order = 2
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.small_surface = None
+        self.small_key = None
+        self.frame = 0
+
+    def activate(self):
+        self.engine.pixel_size = self.engine.rng.visual.choice(QUALITY.pixel_sizes)
+
+    def deactivate(self):
+        self.engine.pixel_size = 1
+
+    def render_params(self):
+        # The end tick tells activations apart, so one never reuses a frame
+        # downscaled during another
+        return self.engine.pixel_size, QUALITY.pixelation_every_frame, self.end_tick
+
+    def render(self, screen, params):
+        pixel_size, every_frame, activation = params
+        width, height = screen.get_size()
+        pixel_size = max(1, round(pixel_size * self.engine.render_scale))
+        small_size = (width // pixel_size, height // pixel_size)
+
+        # Scale down, then back up into the screen (pixelated). Without
+        # per-frame pixelation the downscaled frame is refreshed every other
+        # frame and reused in between
+        self.frame += 1
+        key = (small_size, activation)
+        if every_frame or self.frame % 2 or self.small_key != key:
+            self.small_surface = pygame.transform.scale(screen, small_size)
+            self.small_key = key
+        pygame.transform.scale(self.small_surface, (width, height), screen)
@@ -0,0 +1,77 @@
+"""
+Runtime effect governor
+
+Watches recent frame times and, when frames run over budget, sheds visual
+effect fidelity one step at a time in the order given by SHED_STEPS (see
+src/quality.py). Steps are restored, last shed first, once there is clear
+headroom again. Only what gets drawn changes: cosmetic effects use their
+own random stream, so gameplay is identical at every level.
+"""
+from collections import deque
+from src.constants import *
+from src.quality import QUALITY, SHED_STEPS
+
+class EffectGovernor:
+    """Sheds and restores effect fidelity to keep frames inside a time budget
+
+    frame_finished() is called with the work time of every frame. After a
+    shed, restoring waits restore_wait frames; a step that has to be shed
+    again soon after being restored doubles that wait, so an effect that
+    does not fit stops flapping on and off.
+    """
+
+    def __init__(self, budget_ms=FRAME_BUDGET_MS, enabled=EFFECT_GOVERNOR):
+        self.budget_ms = budget_ms
+        self.enabled = enabled
+        self.average_ms = 0.0
+        self.cooldown = GOVERNOR_COOLDOWN
+        self.restore_wait = GOVERNOR_COOLDOWN
+        self.restore_hold = 0
+        self.frames_since_restore = None
+        self.log = deque(maxlen=GOVERNOR_LOG_SIZE)
+
+    @property
+    def level(self):
+        return QUALITY.shed_level
+
+    @property
+    def exhausted(self):
+        """True once every step has been shed"""
+        return QUALITY.shed_level >= len(SHED_STEPS)
+
+    def frame_finished(self, work_ms, frame, can_restore=True):
+        """Record a frame's work time; returns True if the shed level changed"""
+        # Exponential moving average over roughly the cooldown window
+        self.average_ms += (work_ms - self.average_ms) * (2.0 / (GOVERNOR_COOLDOWN + 1))
+        if self.frames_since_restore is not None:
+            self.frames_since_restore += 1
+        if self.restore_hold > 0:
+            self.restore_hold -= 1
+        if not self.enabled:
+            return False
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return False
+
+        level = QUALITY.shed_level
+        if self.average_ms > self.budget_ms and level < len(SHED_STEPS):
+            # Shedding again right after a restore means that step did not fit
+            if self.frames_since_restore is not None and self.frames_since_restore < 2 * self.restore_wait:
+                self.restore_wait = min(self.restore_wait * 2, GOVERNOR_MAX_RESTORE_WAIT)
+            self.frames_since_restore = None
+            self.restore_hold = self.restore_wait
+            self.set_level(level + 1, frame, f"shed {SHED_STEPS[level]}")
+            return True
+
+        if (level > 0 and can_restore and not self.restore_hold
+                and self.average_ms < self.budget_ms * GOVERNOR_RESTORE_RATIO):
+            self.frames_since_restore = 0
+            self.set_level(level - 1, frame, f"restored {SHED_STEPS[level - 1]}")
+            return True
+        return False
+
+    def set_level(self, level, frame, action):
+        """Switch shed level and record the adjustment"""
+        QUALITY.set_shed_level(level)
+        self.cooldown = GOVERNOR_COOLDOWN
+        self.log.append(f"frame {frame}: {action} ({self.average_ms:.1f} ms)")
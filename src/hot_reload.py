@@ -0,0 +1,83 @@
+"""
+Level data hot-reload (dev mode)
+
+In dev mode (--dev) the game watches src/level_data.py. When the file is
+saved it is executed again and every level whose data changed is patched
+in place with Level.apply_data:
+- unchanged platforms and enemies are kept, with their state and images
+- added ones are created and removed ones dropped
+- the exit is moved if it changed
+- nothing else is rebuilt and no sprites, sounds or fonts are loaded
+
+The player stays where they are. A file that fails to execute is reported
+and the levels keep their current data.
+"""
+import os
+import time
+import runpy
+from src.constants import *
+import src.level_data
+
+class LevelWatcher:
+    """Polls the level data file and patches loaded levels when it changes"""
+
+    def __init__(self, path=None, interval=LEVEL_RELOAD_INTERVAL):
+        self.path = path or os.path.abspath(src.level_data.__file__)
+        self.interval = interval
+        self.mtime = self.read_mtime()
+        self.next_check = time.perf_counter() + interval
+
+    def read_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def poll(self, game):
+        """Reload if the file changed since the last check; returns True if it did"""
+        now = time.perf_counter()
+        if now < self.next_check:
+            return False
+        self.next_check = now + self.interval
+
+        mtime = self.read_mtime()
+        if mtime is None or mtime == self.mtime:
+            return False
+        self.mtime = mtime
+        return self.reload(game)
+
+    def reload(self, game):
+        """Execute the level data file again and patch the levels that changed"""
+        start = time.perf_counter()
+        try:
+            levels = runpy.run_path(self.path)['LEVELS']
+        except Exception as e:
+            print(f"Level reload failed, keeping current levels: {type(e).__name__}: {e}")
+            return False
+
+        # Patch the shared list in place so every module holding it sees the edit
+        current = src.level_data.LEVELS
+        if len(levels) != len(current):
+            print(f"Level reload skipped: level count changed from {len(current)} to {len(levels)}")
+            return False
+
+        changed = []
+        for index, data in enumerate(levels):
+            if data == current[index]:
+                continue
+            current[index] = data
+            changes = game.levels[index].apply_data(data)
+            changed.append(f"level {index + 1} ({', '.join(changes) or 'settings'})")
+
+            # History of the edited level no longer matches its layout
+            if index == game.current_level_index and game.rewind is not None:
+                game.rewind.clear()
+
+        # Platforms dropped from the level can no longer fade out
+        engine = game.glitch_engine
+        engine.disappearing_platforms = [p for p in engine.disappearing_platforms if p.alive()]
+
+        if changed:
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"Reloaded {'; '.join(changed)} in {elapsed:.1f} ms")
+        return bool(changed)
@@ -0,0 +1,136 @@
+"""
+Player input buffering and input latency measurement
+
+All player key events pass through one fixed-capacity ring buffer. Each
+sample is stamped with the SDL tick it was drained from the event queue and
+the simulation frame it arrived on, so the input-lag glitch can hold samples
+back by whole frames and the latency monitor can tell how long each input
+took to reach the screen.
+"""
+import threading
+import pygame
+from src.constants import INPUT_BUFFER_CAPACITY, LATENCY_WINDOW
+
+# Sample kinds
+KEY_DOWN = 1
+KEY_UP = 0
+
+class InputRingBuffer:
+    """Fixed-capacity FIFO of (sdl_time, frame, kind, key) input samples
+
+    Storage is preallocated; pushing onto a full buffer overwrites the oldest
+    sample and counts it in dropped.
+    """
+
+    def __init__(self, capacity=INPUT_BUFFER_CAPACITY):
+        self.capacity = capacity
+        self.times = [0] * capacity
+        self.frames = [0] * capacity
+        self.kinds = [0] * capacity
+        self.keys = [0] * capacity
+        self.head = 0  # Index of the oldest sample
+        self.count = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self.count
+
+    def push(self, sdl_time, frame, kind, key):
+        """Append a sample, overwriting the oldest one when full"""
+        if self.count == self.capacity:
+            self.head = (self.head + 1) % self.capacity
+            self.count -= 1
+            self.dropped += 1
+        index = (self.head + self.count) % self.capacity
+        self.times[index] = sdl_time
+        self.frames[index] = frame
+        self.kinds[index] = kind
+        self.keys[index] = key
+        self.count += 1
+
+    def pop_ready(self, max_frame):
+        """Remove and return samples stamped on or before max_frame, oldest first
+
+        Samples are pushed in frame order, so the ready ones are always a
+        prefix of the buffer and this costs O(samples returned).
+        """
+        ready = []
+        while self.count and self.frames[self.head] <= max_frame:
+            index = self.head
+            ready.append((self.times[index], self.frames[index], self.kinds[index], self.keys[index]))
+            self.head = (index + 1) % self.capacity
+            self.count -= 1
+        return ready
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+class LatencyMonitor:
+    """Measures the time from an input arriving to the frame showing it
+
+    input_applied() is called with the SDL stamp of each input applied to the
+    simulation. When a frame is built, take_pending() hands over the oldest
+    input applied since the previous frame; frame_presented() is called with
+    it right after that frame's display flip, possibly on the render thread,
+    and records the latency. Samples older than the window are forgotten.
+
+    input_applied() and take_pending() run on the game thread only. The
+    samples are written by whichever thread presents and read by the game
+    thread's HUD, so those accesses hold a lock.
+    """
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self.samples = [0] * window
+        self.index = 0
+        self.count = 0
+        self.pending = None
+        self.last = 0
+        self.total_frames = 0
+        self.worst = 0
+        self.lock = threading.Lock()
+
+    def input_applied(self, sdl_time):
+        if self.pending is None or sdl_time < self.pending:
+            self.pending = sdl_time
+
+    def take_pending(self):
+        """Return the oldest input applied since the last call, or None"""
+        pending = self.pending
+        self.pending = None
+        return pending
+
+    def frame_presented(self, input_time, sdl_time=None):
+        if input_time is None:
+            return
+        if sdl_time is None:
+            sdl_time = pygame.time.get_ticks()
+        latency = sdl_time - input_time
+
+        with self.lock:
+            self.samples[self.index] = latency
+            self.index = (self.index + 1) % self.window
+            self.count = min(self.count + 1, self.window)
+            self.last = latency
+            self.total_frames += 1
+            self.worst = max(self.worst, latency)
+
+    def stats(self):
+        """Return (last, average, 95th percentile, max) over the window in ms"""
+        with self.lock:
+            count = self.count
+            if not count:
+                return (0, 0, 0, 0)
+            window = sorted(self.samples[:count])
+            last = self.last
+        p95 = window[min(count - 1, int(count * 0.95))]
+        return (last, sum(window) / count, p95, window[-1])
+
+    def summary(self):
+        last, average, p95, worst = self.stats()
+        with self.lock:
+            count, session_worst = self.count, self.worst
+        return (f"Input-to-present latency over {count} frames: "
+                f"avg {average:.1f} ms, p95 {p95} ms, max {worst} ms "
+                f"(worst this session {session_worst} ms)")
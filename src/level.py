@@ -1,23 +1,32 @@
 import pygame
 import math
-import os
 import random
 from src.platform import Platform
 from src.enemy import Enemy
 from src.background import Background
 from src.constants import *
+from src.render_queue import LAYER_PLATFORMS, LAYER_EXIT
+from src.quality import QUALITY
+from src.sprite_cycle import get_cycle
+from src.navigation import Navigation
+
+def draw_exit_frame(surface, phase):
+    """Draw the exit portal at a phase of its pulse"""
+    # Simple pulsing animation; the pulse repeats every pi of animation time
+    pulse = abs(math.sin(phase * math.pi)) * 10
+    
+    # Adjust size slightly based on pulse
+    surface.fill(EXIT_COLOR)
+    pygame.draw.ellipse(surface, (255, 255, 255), (5, 5, 40, 70))
+    pygame.draw.ellipse(surface, EXIT_COLOR, (10 + pulse/4, 10 + pulse/4, 30 - pulse/2, 60 - pulse/2))
 
 class LevelExit(pygame.sprite.Sprite):
     def __init__(self, x, y):
         super().__init__()
         
-        # Create exit portal
-        self.image = pygame.Surface((50, 80))
-        self.image.fill(EXIT_COLOR)
-        
-        # Add some visual flair to the exit
-        pygame.draw.ellipse(self.image, (255, 255, 255), (5, 5, 40, 70))
-        pygame.draw.ellipse(self.image, EXIT_COLOR, (10, 10, 30, 60))
+        # Create exit portal; its pulse is rendered once and shared by all exits
+        self.cycle = get_cycle('level_exit', (50, 80), EXIT_PULSE_FRAMES, math.pi, draw_exit_frame)
+        self.image = self.cycle.frames[0]
         
         self.rect = self.image.get_rect()
         self.rect.x = x
@@ -27,17 +36,22 @@ class LevelExit(pygame.sprite.Sprite):
         self.animation_timer = 0
     
     def update(self):
-        # Simple pulsing animation
+        # Pick the frame of the pulse for the animation time
         self.animation_timer += 0.1
-        pulse = abs(math.sin(self.animation_timer)) * 10
-        
-        # Adjust size slightly based on pulse
-        self.image.fill(EXIT_COLOR)
-        pygame.draw.ellipse(self.image, (255, 255, 255), (5, 5, 40, 70))
-        pygame.draw.ellipse(self.image, EXIT_COLOR, (10 + pulse/4, 10 + pulse/4, 30 - pulse/2, 60 - pulse/2))
+        self.image = self.cycle.frame_at(self.animation_timer)
+
+def level_number(name):
+    """Level number (1-5) from a level's name; the background is chosen by it"""
+    for number in (2, 3, 4, 5):
+        if f"Level {number}" in name:
+            return number
+    return 1
 
 class Level:
-    def __init__(self, level_data):
+    def __init__(self, level_data, rng):
+        # The game's random streams
+        self.rng = rng
+        
         self.name = level_data["name"]
         self.background_color = level_data["background_color"]
         self.player_start_pos = level_data["player_start"]
@@ -50,18 +64,10 @@ class Level:
         self.exit = LevelExit(level_data["exit_pos"][0], level_data["exit_pos"][1])
         
         # Determine level number
-        level_num = 1
-        if "Level 2" in level_data["name"]:
-            level_num = 2
-        elif "Level 3" in level_data["name"]:
-            level_num = 3
-        elif "Level 4" in level_data["name"]:
-            level_num = 4
-        elif "Level 5" in level_data["name"]:
-            level_num = 5
-            
+        level_num = level_number(level_data["name"])
+        
         # Create background
-        self.background = Background(level_num)
+        self.background = Background(level_num, rng)
         
         # Screen shake settings
         self.shake_enabled = level_data.get("shake_enabled", False)
@@ -78,19 +84,69 @@ class Level:
         # Load level elements
         self.load_platforms(level_data["platforms"])
         self.load_enemies(level_data["enemies"])
+        
+        # Enemy navigation, built once from the platform layout
+        self.navigation = Navigation(self.platforms)
     
     def load_platforms(self, platform_data):
         for p_data in platform_data:
             x, y, width, height = p_data
             platform = Platform(x, y, width, height)
+            platform.data = p_data  # Kept to match against edited level data
             self.platforms.add(platform)
     
     def load_enemies(self, enemy_data):
         for e_data in enemy_data:
             x, y, patrol_distance, enemy_type = e_data
             enemy = Enemy(x, y, patrol_distance, enemy_type)
+            enemy.data = e_data  # Kept to match against edited level data
             self.enemies.add(enemy)
     
+    def apply_data(self, level_data):
+        """Bring a loaded level in line with edited level data, in place
+        
+        Platforms and enemies whose data is unchanged are kept as they are,
+        mid-patrol and with their cached images; only added and removed
+        ones are created or dropped. Returns a list of change descriptions.
+        """
+        changes = []
+        
+        # Platforms and enemies are matched by their data tuples
+        for group, key, load in ((self.platforms, "platforms", self.load_platforms),
+                                 (self.enemies, "enemies", self.load_enemies)):
+            wanted = list(level_data[key])
+            removed = 0
+            for sprite in list(group):
+                if sprite.data in wanted:
+                    wanted.remove(sprite.data)
+                else:
+                    sprite.kill()
+                    removed += 1
+            load(wanted)
+            if wanted or removed:
+                changes.append(f"{key} +{len(wanted)} -{removed}")
+                if key == "platforms":
+                    self.navigation = Navigation(self.platforms)
+        
+        # Move the exit; its animation frames are shared and unchanged
+        exit_pos = tuple(level_data["exit_pos"])
+        if exit_pos != tuple(self.exit.rect.topleft):
+            self.exit.rect.topleft = exit_pos
+            changes.append("exit moved")
+        
+        # Level settings
+        if level_number(level_data["name"]) != self.background.level_num:
+            self.background = Background(level_number(level_data["name"]), self.rng)
+            changes.append("background")
+        self.name = level_data["name"]
+        self.background_color = level_data["background_color"]
+        self.player_start_pos = level_data["player_start"]
+        self.shake_enabled = level_data.get("shake_enabled", False)
+        self.advanced_glitches = level_data.get("advanced_glitches", False)
+        if not self.shake_enabled:
+            self.shake_offset_x = self.shake_offset_y = 0
+        return changes
+    
     def reset_player_position(self, player):
         player.rect.x = self.player_start_pos[0]
         player.rect.y = self.player_start_pos[1]
@@ -114,7 +170,7 @@ class Level:
             
             # Check for projectile collisions
             for projectile in enemy.projectiles:
-                if player.rect.colliderect(projectile.rect):
+                if player.rect.colliderect(projectile.swept_rect()):
                     projectile.kill()  # Remove the projectile
                     return True
         
@@ -124,8 +180,9 @@ class Level:
         """Update screen shake effect"""
         if self.shake_enabled:
             # Constant screen shake for levels 4-5
-            self.shake_offset_x = random.randint(-self.shake_intensity, self.shake_intensity)
-            self.shake_offset_y = random.randint(-self.shake_intensity, self.shake_intensity)
+            intensity = round(self.shake_intensity * QUALITY.shake_scale)
+            self.shake_offset_x = self.rng.visual.randint(-intensity, intensity)
+            self.shake_offset_y = self.rng.visual.randint(-intensity, intensity)
     
     def update_advanced_glitches(self):
         """Update advanced glitch effects for level 5"""
@@ -136,7 +193,7 @@ class Level:
         
         # Check if we need to start a new glitch effect
         if self.glitch_effect is None and self.glitch_timer >= 180:  # Every 3 seconds
-            if random.random() < 0.3:  # 30% chance
+            if self.rng.visual.random() < 0.3:  # 30% chance
                 self.start_glitch_effect()
                 self.glitch_timer = 0
         
@@ -149,39 +206,9 @@ class Level:
     def start_glitch_effect(self):
         """Start a random advanced glitch effect"""
         # Removed "invert" since it requires numpy/surfarray
-        effect_type = random.choice(["color_shift", "static"])
+        effect_type = self.rng.visual.choice(["color_shift", "static"])
         self.glitch_effect = effect_type
-        self.glitch_duration = random.randint(15, 45)  # 0.25 to 0.75 seconds
-    
-    def apply_glitch_effect(self, screen):
-        """Apply the current glitch effect to the screen"""
-        if not self.glitch_effect:
-            return
-            
-        # Create a copy of the screen
-        screen_copy = screen.copy()
-        
-        if self.glitch_effect == "color_shift":
-            # Simple color shift without using surfarray
-            shift_amount = random.randint(3, 8)
-            screen.blit(screen_copy, (shift_amount, 0))
-            
-        elif self.glitch_effect == "static":
-            # Add static noise to a portion of the screen
-            height = random.randint(5, 20)
-            y_pos = random.randint(0, SCREEN_HEIGHT - height)
-            
-            # Create static noise
-            static = pygame.Surface((SCREEN_WIDTH, height))
-            for x in range(0, SCREEN_WIDTH, 2):
-                for y in range(0, height, 2):
-                    if random.random() < 0.5:
-                        color = (random.randint(200, 255), random.randint(200, 255), random.randint(200, 255))
-                        static.set_at((x, y), color)
-            
-            # Apply static with transparency
-            static.set_alpha(100)
-            screen.blit(static, (0, y_pos))
+        self.glitch_duration = self.rng.visual.randint(15, 45)  # 0.25 to 0.75 seconds
     
     def update(self, player):
         # Update background
@@ -199,7 +226,7 @@ class Level:
         
         # Update all enemies
         for enemy in self.enemies:
-            enemy.update(self.platforms, player)
+            enemy.update(self.platforms, player, self.navigation)
         
         # Update exit
         self.exit.update()
@@ -210,25 +237,62 @@ class Level:
         # Update player with collisions
         player.update(solid_platforms)
     
-    def draw(self, screen):
+    def draw(self, queue):
         # Draw background
-        self.background.draw(screen)
+        self.background.draw(queue)
         
-        # Calculate shake offset
-        offset_x = self.shake_offset_x
-        offset_y = self.shake_offset_y
-        
-        # Draw platforms with shake offset
+        # Draw platforms (the queue applies the shake offset)
         for platform in self.platforms:
-            screen.blit(platform.image, (platform.rect.x + offset_x, platform.rect.y + offset_y))
+            queue.blit(LAYER_PLATFORMS, platform.image, platform.rect.x, platform.rect.y)
         
-        # Draw exit with shake offset
-        screen.blit(self.exit.image, (self.exit.rect.x + offset_x, self.exit.rect.y + offset_y))
+        # Draw exit
+        queue.blit(LAYER_EXIT, self.exit.image, self.exit.rect.x, self.exit.rect.y)
         
-        # Draw enemies with shake offset
+        # Draw enemies
         for enemy in self.enemies:
-            enemy.draw(screen, offset_x, offset_y)
+            enemy.draw(queue)
+    
+    def effect_params(self, rng):
+        """Describe the advanced glitch effect (level 5) to draw over this frame, if any
+
+        The effect's noise is seeded here, from rng, so drawing it later (on
+        the render thread in pipelined mode) makes no draws of its own.
+        """
+        if self.advanced_glitches and self.glitch_effect:
+            return (self.glitch_effect, QUALITY.noise_step, rng.getrandbits(32))
+        return None
+
+def draw_level_effect(screen, params, scale=1):
+    """Apply a level glitch effect, as described by Level.effect_params, to the drawn world"""
+    if not params:
+        return
+    effect, step, seed = params
+    rng = random.Random(seed)
+    
+    # Create a copy of the screen
+    screen_copy = screen.copy()
+    
+    if effect == "color_shift":
+        # Simple color shift without using surfarray
+        shift_amount = rng.randint(3, 8)
+        screen.blit(screen_copy, (int(shift_amount * scale), 0))
+        
+    elif effect == "static":
+        # Add static noise to a portion of the screen
+        height = rng.randint(5, 20)
+        y_pos = rng.randint(0, SCREEN_HEIGHT - height)
+        
+        # Create static noise; the pattern is laid out in screen
+        # coordinates so the same noise is drawn at any render scale.
+        # Sparser noise (lower quality) uses larger dots
+        dot = max(1, int(step // 2 * scale))
+        static = pygame.Surface((screen.get_width(), max(1, int(height * scale))))
+        for x in range(0, SCREEN_WIDTH, step):
+            for y in range(0, height, step):
+                if rng.random() < 0.5:
+                    color = (rng.randint(200, 255), rng.randint(200, 255), rng.randint(200, 255))
+                    static.fill(color, (int(x * scale), int(y * scale), dot, dot))
         
-        # Apply advanced glitch effects (level 5)
-        if self.advanced_glitches:
-            self.apply_glitch_effect(screen)
+        # Apply static with transparency
+        static.set_alpha(100)
+        screen.blit(static, (0, int(y_pos * scale)))
@@ -0,0 +1,279 @@
+"""
+Enemy navigation
+
+Each Level builds a Navigation from its platform geometry once, when it is
+loaded. It has two parts.
+
+Navigation graph. Every platform top is a node. Edges are the moves an
+enemy can make from one top to another:
+- walk edges: walking off an edge onto a neighbouring or lower platform
+- jump edges: an enemy jump (ENEMY_JUMP_POWER) from the platform's edge
+Edges are tested against the exact frame-by-frame arc an enemy follows, so
+an edge is only added if the enemy would land on the target platform
+without running into its side. The first edge of the shortest route
+between every pair of platforms is stored in a table.
+
+Line-of-sight grid. The screen is divided into NAV_CELL_SIZE cells, and a
+cell is blocked if any platform overlaps it. A query walks the cells
+between two points. Results are cached by their pair of cells.
+
+Finding the platform under an entity looks only at the platforms crossing
+its grid column. Routing is one table lookup. Neither depends on how many
+platforms the level has.
+"""
+import math
+import pygame
+from src.constants import *
+from src.collision import move_and_collide, pixel_step, resting_on
+
+EDGE_WALK = 0
+EDGE_JUMP = 1
+
+def enemy_arc(velocity_y):
+    """Height of an airborne enemy's feet above its start, for each frame until it falls off screen
+
+    Follows Enemy.update: no gravity on the frame it leaves the ground, then
+    GRAVITY every frame up to MAX_FALL_SPEED.
+    """
+    rect = pygame.Rect(0, 0, ENEMY_WIDTH, ENEMY_HEIGHT)
+    heights = []
+    while rect.y < SCREEN_HEIGHT:
+        rect.y += pixel_step(rect, 0, velocity_y)[1]
+        heights.append(-rect.y)
+        velocity_y = min(velocity_y + GRAVITY, MAX_FALL_SPEED)
+    return heights
+
+# Arcs of a jump and of walking off an edge (gravity starts a frame later)
+JUMP_ARC = enemy_arc(-ENEMY_JUMP_POWER)
+FALL_ARC = [0] + enemy_arc(GRAVITY)
+JUMP_HEIGHT = max(JUMP_ARC)
+HOP_DISTANCE = (next(frame for frame in range(1, len(JUMP_ARC)) if JUMP_ARC[frame] <= 0) + 1) * ENEMY_SPEED
+
+def landing_frame(arc, gap, rise, width):
+    """Frame an enemy following arc lands on a platform, or None
+
+    The enemy moves ENEMY_SPEED a frame towards the platform, starting gap
+    pixels before its near edge. rise is how far the platform top is above
+    the start, and width is the platform's width. The enemy's feet must be
+    level with or above the top by the time it is over the platform.
+    """
+    # First frame the enemy overlaps the platform horizontally
+    start = max(0, math.ceil((gap + 1) / ENEMY_SPEED) - 1)
+    if start >= len(arc) or arc[start] < rise:
+        return None
+    for frame in range(start + 1, len(arc)):
+        if arc[frame] <= rise:
+            # It must still be over the platform when it comes down
+            travelled = (frame + 1) * ENEMY_SPEED
+            if travelled - gap >= width + ENEMY_WIDTH:
+                return None
+            return frame
+    return None
+
+class Navigation:
+    """Platform graph and line-of-sight grid of one level"""
+
+    def __init__(self, platforms):
+        self.tops = [platform.rect.copy() for platform in platforms]
+        self.cell = NAV_CELL_SIZE
+
+        # Platforms whose tops cross each grid column, highest first
+        self.columns = {}
+        for index, rect in enumerate(self.tops):
+            for column in range(rect.left // self.cell, (rect.right - 1) // self.cell + 1):
+                self.columns.setdefault(column, []).append(index)
+        for indices in self.columns.values():
+            indices.sort(key=lambda index: self.tops[index].top)
+
+        # Cells blocked by platforms, and cached line-of-sight results
+        self.blocked = set()
+        for rect in self.tops:
+            for column in range(rect.left // self.cell, (rect.right - 1) // self.cell + 1):
+                for row in range(rect.top // self.cell, (rect.bottom - 1) // self.cell + 1):
+                    self.blocked.add((column, row))
+        self.sight_cache = {}
+
+        self.edges = [self.find_edges(index) for index in range(len(self.tops))]
+        self.next_edge = self.build_routes()
+
+    def find_edges(self, index):
+        """Edges from one platform top as (target, kind, takeoff x, direction)"""
+        start = self.tops[index]
+        edges = []
+        for target, rect in enumerate(self.tops):
+            if target == index:
+                continue
+            rise = start.top - rect.top
+            for direction in (1, -1):
+                # Distance from the start platform's edge to the target's near edge
+                if direction == 1:
+                    edge_x = start.right
+                    gap = rect.left - start.right
+                    beyond = rect.right > start.right
+                else:
+                    edge_x = start.left
+                    gap = start.left - rect.right
+                    beyond = rect.left < start.left
+                if not beyond:
+                    continue
+
+                # Walking off the edge; the enemy is past it when it starts
+                # falling. Jumps are taken with the enemy's leading side at
+                # the edge, up to a step short of it
+                if rise <= 0 and landing_frame(FALL_ARC, gap - ENEMY_WIDTH, rise, rect.width) is not None:
+                    edge = (target, EDGE_WALK, edge_x + direction * (ENEMY_WIDTH // 2 + ENEMY_SPEED), direction)
+                elif gap >= 0 and landing_frame(JUMP_ARC, gap + ENEMY_SPEED, rise, rect.width) is not None:
+                    edge = (target, EDGE_JUMP, edge_x - direction * (ENEMY_WIDTH // 2), direction)
+                else:
+                    continue
+
+                # The arc ignores the other platforms; make sure none of them
+                # is in the way
+                if self.lands_on(start, rect, edge):
+                    edges.append(edge)
+        return edges
+
+    def lands_on(self, start, target, edge):
+        """True if an enemy taking an edge from the start platform ends up on the target
+
+        Steps the enemy's movement frame by frame against the nearby
+        platforms, as Enemy.update does, from either end of where it may
+        take off.
+        """
+        _, kind, x, direction = edge
+        region = start.union(target).inflate(ENEMY_WIDTH * 2, ENEMY_HEIGHT * 2)
+        region.union_ip(region.move(0, -JUMP_HEIGHT))
+        obstacles = [rect for rect in self.tops if rect.colliderect(region)]
+
+        for offset in ((0,) if kind == EDGE_WALK else (-ENEMY_SPEED, ENEMY_SPEED)):
+            rect = pygame.Rect(0, 0, ENEMY_WIDTH, ENEMY_HEIGHT)
+            if kind == EDGE_WALK:
+                # Start at the edge, still fully on the platform
+                rect.bottom = start.top
+                rect.centerx = x - direction * (ENEMY_WIDTH + ENEMY_SPEED)
+                velocity_y = 0
+            else:
+                rect.midbottom = (x + offset, start.top)
+                velocity_y = -ENEMY_JUMP_POWER
+            on_ground = True
+            landed = None
+            # Falls take at most the arc's length, after walking off the edge
+            for frame in range(len(FALL_ARC) + ENEMY_WIDTH // ENEMY_SPEED + 1):
+                if not on_ground:
+                    velocity_y = min(velocity_y + GRAVITY, MAX_FALL_SPEED)
+                on_ground = False
+                dx, dy = pixel_step(rect, ENEMY_SPEED * direction, velocity_y)
+                for normal_x, normal_y, obstacle in move_and_collide(rect, dx, dy, obstacles):
+                    if normal_x or normal_y > 0:
+                        return False
+                    landed = obstacle
+                if landed is None and velocity_y >= 0:
+                    landed = resting_on(rect, obstacles)
+                if landed is not None and landed is not start:
+                    break
+                if landed is start:
+                    # Still walking towards the edge
+                    on_ground = True
+                    velocity_y = 0
+                    landed = None
+            if landed is not target:
+                return False
+        return True
+
+    def build_routes(self):
+        """First edge of a shortest route between every pair of platforms, by (start, target)"""
+        routes = {}
+        for start in range(len(self.tops)):
+            # Breadth-first search, remembering the first edge taken
+            frontier = []
+            for edge in self.edges[start]:
+                if (start, edge[0]) not in routes:
+                    routes[(start, edge[0])] = edge
+                    frontier.append(edge[0])
+            while frontier:
+                next_frontier = []
+                for node in frontier:
+                    first = routes[(start, node)]
+                    for edge in self.edges[node]:
+                        key = (start, edge[0])
+                        if edge[0] != start and key not in routes:
+                            routes[key] = first
+                            next_frontier.append(edge[0])
+                frontier = next_frontier
+        return routes
+
+    def platform_below(self, rect):
+        """Index of the platform top under a rect's centre (touching or below its feet), or None"""
+        x = rect.centerx
+        for index in self.columns.get(x // self.cell, ()):
+            top = self.tops[index]
+            if top.top >= rect.bottom and top.left <= x < top.right:
+                return index
+        return None
+
+    def chase_target(self, rect, target):
+        """Where an enemy at rect should go to reach target: (x, direction, jump) or None
+
+        Head for x; once there, face direction and jump if jump is set.
+        Returns None when there is no route.
+        """
+        start = self.platform_below(rect)
+        goal = self.platform_below(target)
+        if start is None or goal is None:
+            return None
+        if start == goal:
+            return target.centerx, 1 if target.centerx >= rect.centerx else -1, False
+        edge = self.next_edge.get((start, goal))
+        if edge is None:
+            return None
+        _, kind, x, direction = edge
+        return x, direction, kind == EDGE_JUMP
+
+    def line_of_sight(self, a, b):
+        """True if no platform lies between the points a and b"""
+        cell = self.cell
+        start = (int(a[0]) // cell, int(a[1]) // cell)
+        end = (int(b[0]) // cell, int(b[1]) // cell)
+        key = (start, end)
+        clear = self.sight_cache.get(key)
+        if clear is None:
+            if len(self.sight_cache) >= NAV_SIGHT_CACHE_SIZE:
+                self.sight_cache.clear()
+            clear = self.trace(start, end)
+            self.sight_cache[key] = clear
+            self.sight_cache[(end, start)] = clear
+        return clear
+
+    def trace(self, start, end):
+        """Walk the cells on the line between two cells; True if none is blocked"""
+        (column, row), (end_column, end_row) = start, end
+        dx = abs(end_column - column)
+        dy = -abs(end_row - row)
+        step_x = 1 if end_column > column else -1
+        step_y = 1 if end_row > row else -1
+        error = dx + dy
+        while (column, row) != (end_column, end_row):
+            if (column, row) in self.blocked and (column, row) != start:
+                return False
+            double = 2 * error
+            if double >= dy:
+                error += dy
+                column += step_x
+            if double <= dx:
+                error += dx
+                row += step_y
+        return True
+
+    def can_hop(self, rect, direction):
+        """True if an enemy can jump from where it stands and land on the same platform"""
+        landing = rect.move(direction * HOP_DISTANCE, 0)
+        return self.headroom(rect) and self.platform_below(landing) == self.platform_below(rect)
+
+    def headroom(self, rect, height=JUMP_HEIGHT):
+        """True if nothing blocks the space height pixels above a rect"""
+        cell = self.cell
+        for row in range((rect.top - height) // cell, rect.top // cell):
+            for column in range(rect.left // cell, (rect.right - 1) // cell + 1):
+                if (column, row) in self.blocked:
+                    return False
+        return True
@@ -1,13 +1,21 @@
 import pygame
-import os
-import time
 from src.constants import *
 from src.sprite_loader import SpriteLoader
+from src.collision import move_and_collide, pixel_step, resting_on
+from src.render_queue import LAYER_PLAYER, LAYER_DEBUG
+from src.variant_cache import VARIANTS
+from src.fonts import get_font
+
+# Keys that control the player
+CONTROL_KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_SPACE)
 
 class Player(pygame.sprite.Sprite):
-    def __init__(self):
+    def __init__(self, clock, sound_manager=None):
         super().__init__()
         
+        # Game clock for timed effects
+        self.clock = clock
+        
         # Animation frames
         self.sprites = {
             'idle_right': [],
@@ -52,7 +60,7 @@ class Player(pygame.sprite.Sprite):
         
         # Invincibility
         self.invincible = False
-        self.invincible_timer = 0
+        self.invincible_timer = 0  # Tick the invincibility started
         self.invincible_duration = 2  # 2 seconds of invincibility when spawning
         self.wall_slide_speed = 1
         self.wall_jump_power = 10
@@ -63,92 +71,40 @@ class Player(pygame.sprite.Sprite):
         self.speed = PLAYER_SPEED
         self.jump_power = JUMP_POWER
         
+        # Held state of the control keys, driven by buffered key events
+        self.held_keys = {key: False for key in CONTROL_KEYS}
+        
+        # Key state override; when set, it replaces the held keys so the
+        # player can be driven programmatically (bots)
+        self.key_state = None
+        
         # Sound effects
-        self.load_sounds()
+        self.sound_manager = sound_manager
     
-    def load_sounds(self):
-        # Initialize sound effects
-        self.jump_sound = None
-        self.land_sound = None
-        self.wall_slide_sound = None
-        self.double_jump_sound = None
-        
-        # Try to load sounds if they exist
-        try:
-            pygame.mixer.init()
-            
-            # Import resource_path function
-            try:
-                # First try to import from the module
-                from resource_path import resource_path
-            except ImportError:
-                # Define it locally if import fails
-                def resource_path(relative_path):
-                    try:
-                        base_path = sys._MEIPASS
-                    except Exception:
-                        base_path = os.path.abspath(".")
-                    return os.path.join(base_path, relative_path)
-            
-            # Import volume settings
-            try:
-                from src.constants import DEFAULT_SFX_VOLUME
-                volume_level = DEFAULT_SFX_VOLUME
-            except ImportError:
-                volume_level = 0.2  # Default to 20% volume if constants can't be imported
-            
-            # Try multiple possible paths for the jump sound
-            possible_paths = [
-                resource_path(os.path.join('assets', 'sounds', 'jump-audio.mp3')),
-                resource_path(os.path.join('assets', 'sounds', 'jump-audio.wav')),
-                resource_path(os.path.join('assets', 'sounds', 'jump.mp3')),
-                resource_path(os.path.join('assets', 'sounds', 'jump.wav')),
-                os.path.join('assets', 'sounds', 'jump-audio.mp3'),
-                os.path.join('assets', 'sounds', 'jump-audio.wav')
-            ]
-            
-            # Try each path until we find a valid sound file
-            for path in possible_paths:
-                try:
-                    if os.path.exists(path):
-                        self.jump_sound = pygame.mixer.Sound(path)
-                        self.jump_sound.set_volume(volume_level)  # Set volume to the lower level
-                        self.double_jump_sound = self.jump_sound  # Use same sound for double jump
-                        print(f"Successfully loaded jump sound from: {path} with volume {volume_level}")
-                        break
-                except Exception as e:
-                    print(f"Failed to load sound from {path}: {e}")
-            
-            if self.jump_sound is None:
-                print("Could not find any jump sound files")
-                
-        except Exception as e:
-            print(f"Sound files could not be loaded: {e}. Continuing without sound.")
+    def play_sound(self, sound_name):
+        # Sounds are shared with the game and played through its voice pool
+        if self.sound_manager:
+            self.sound_manager.play_sound(sound_name)
     
-    def handle_event(self, event):
-        # Handle key press events
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_LEFT:
-                self.velocity_x = -self.speed
-                self.facing_right = False
-            if event.key == pygame.K_RIGHT:
-                self.velocity_x = self.speed
-                self.facing_right = True
-            if event.key == pygame.K_SPACE:
-                self.handle_jump_press()
+    def set_key_held(self, key, pressed):
+        """Track the held state of a control key without acting on it"""
+        if key in self.held_keys:
+            self.held_keys[key] = pressed
+    
+    def handle_key(self, key, pressed):
+        """Apply one buffered key press or release"""
+        self.set_key_held(key, pressed)
         
-        # Handle key release events
-        if event.type == pygame.KEYUP:
-            if event.key == pygame.K_LEFT and self.velocity_x < 0:
-                self.velocity_x = 0
-            if event.key == pygame.K_RIGHT and self.velocity_x > 0:
-                self.velocity_x = 0
-            if event.key == pygame.K_SPACE:
+        # Jumps trigger on the press edge; releasing ends variable jump height
+        if key == pygame.K_SPACE:
+            if pressed:
+                self.handle_jump_press()
+            else:
                 self.jump_held = False
     
     def handle_input(self):
-        """Handle continuous keyboard input"""
-        keys = pygame.key.get_pressed()
+        """Handle continuous input from the held control keys"""
+        keys = self.key_state if self.key_state is not None else self.held_keys
         
         # Horizontal movement
         if keys[pygame.K_LEFT]:
@@ -172,23 +128,20 @@ class Player(pygame.sprite.Sprite):
             self.jump_held = True
             self.jump_time = 0
             self.jump_count = 1
-            if self.jump_sound:
-                self.jump_sound.play()
+            self.play_sound('jump')
         # Wall jump
         elif self.wall_sliding:
             self.wall_jump()
             self.jump_held = True
             self.jump_time = 0
-            if self.jump_sound:
-                self.jump_sound.play()
+            self.play_sound('jump')
         # Double jump in air
         elif self.jump_count < self.max_jumps:
             self.jump()
             self.jump_held = True
             self.jump_time = 0
             self.jump_count += 1
-            if self.double_jump_sound:
-                self.double_jump_sound.play()
+            self.play_sound('jump')
     
     def jump(self):
         self.velocity_y = -self.jump_power
@@ -231,8 +184,7 @@ class Player(pygame.sprite.Sprite):
                     if wall_check_rect.bottom > platform.rect.top and wall_check_rect.top < platform.rect.bottom:
                         self.wall_sliding = True
                         self.facing_right = True  # Facing away from wall
-                        if self.wall_slide_sound and not pygame.mixer.get_busy():
-                            self.wall_slide_sound.play()
+                        self.play_sound('wall_slide')
                         return
                 
                 # Check right side
@@ -240,8 +192,7 @@ class Player(pygame.sprite.Sprite):
                     if wall_check_rect.bottom > platform.rect.top and wall_check_rect.top < platform.rect.bottom:
                         self.wall_sliding = True
                         self.facing_right = False  # Facing away from wall
-                        if self.wall_slide_sound and not pygame.mixer.get_busy():
-                            self.wall_slide_sound.play()
+                        self.play_sound('wall_slide')
                         return
             
             # If we get here, not touching any walls
@@ -275,36 +226,38 @@ class Player(pygame.sprite.Sprite):
         # Update image
         self.image = self.sprites[self.current_state][int(self.current_sprite)]
     
-    def check_collisions(self, platforms):
-        # Check for platform collisions
+    def move_and_collide(self, platforms):
+        """Move along this frame's velocity, stopping at platform surfaces"""
         was_on_ground = self.on_ground
         self.on_ground = False
         
-        for platform in platforms:
-            if self.rect.colliderect(platform.rect):
-                # Landing on top of a platform
-                if self.velocity_y > 0 and self.rect.bottom - self.velocity_y <= platform.rect.top + 10:
-                    self.rect.bottom = platform.rect.top
-                    self.velocity_y = 0
-                    self.on_ground = True
-                    self.jump_count = 0  # Reset jump count when landing
-                    
-                    # Play landing sound if we just landed
-                    if not was_on_ground and self.land_sound:
-                        self.land_sound.play()
+        # Sweep the motion so no speed can carry the player through a platform
+        platform_rects = [platform.rect for platform in platforms]
+        dx, dy = pixel_step(self.rect, self.velocity_x, self.velocity_y)
+        for normal_x, normal_y, _ in move_and_collide(self.rect, dx, dy, platform_rects):
+            # Landing on top of a platform
+            if normal_y < 0:
+                self.velocity_y = 0
+                self.on_ground = True
+                self.jump_count = 0  # Reset jump count when landing
                 
-                # Hitting a platform from below
-                elif self.velocity_y < 0 and self.rect.top - self.velocity_y >= platform.rect.bottom - 10:
-                    self.rect.top = platform.rect.bottom
-                    self.velocity_y = 0
-                
-                # Side collision
-                elif self.velocity_x > 0 and self.rect.right - self.velocity_x <= platform.rect.left + 10:
-                    self.rect.right = platform.rect.left
-                    self.velocity_x = 0
-                elif self.velocity_x < 0 and self.rect.left - self.velocity_x >= platform.rect.right - 10:
-                    self.rect.left = platform.rect.right
-                    self.velocity_x = 0
+                # Play landing sound if we just landed
+                if not was_on_ground:
+                    self.play_sound('land')
+            
+            # Hitting a platform from below
+            elif normal_y > 0:
+                self.velocity_y = 0
+            
+            # Side collision
+            else:
+                self.velocity_x = 0
+        
+        # Still standing on a platform when not moving vertically
+        if not self.on_ground and self.gravity > 0 and self.velocity_y >= 0 and resting_on(self.rect, platform_rects):
+            self.velocity_y = 0
+            self.on_ground = True
+            self.jump_count = 0
     
     def update(self, platforms=None):
         # Handle continuous input
@@ -312,8 +265,7 @@ class Player(pygame.sprite.Sprite):
         
         # Update invincibility timer
         if self.invincible:
-            current_time = time.time()
-            if current_time - self.invincible_timer > self.invincible_duration:
+            if self.clock.seconds_since(self.invincible_timer) > self.invincible_duration:
                 self.invincible = False
         
         # Apply gravity
@@ -323,13 +275,8 @@ class Player(pygame.sprite.Sprite):
         if platforms:
             self.check_wall_slide(platforms)
         
-        # Update position
-        self.rect.x += self.velocity_x
-        self.rect.y += self.velocity_y
-        
-        # Check collisions with platforms
-        if platforms:
-            self.check_collisions(platforms)
+        # Update position, resolving collisions with platforms along the way
+        self.move_and_collide(platforms or [])
         
         # Keep player on screen (temporary boundary check)
         if self.rect.left < 0:
@@ -359,31 +306,29 @@ class Player(pygame.sprite.Sprite):
     
     def set_invincible(self):
         self.invincible = True
-        self.invincible_timer = time.time()
+        self.invincible_timer = self.clock.tick
     
-    def draw(self, screen):
+    def draw(self, queue):
         # If invincible, make the player flash
-        if self.invincible and int(time.time() * 10) % 2 == 0:
-            # Create a white flash effect
-            flash_image = self.image.copy()
-            flash_image.fill((255, 255, 255, 128), None, pygame.BLEND_RGBA_MULT)
-            screen.blit(flash_image, self.rect)
+        if self.invincible and int(self.clock.time * 10) % 2 == 0:
+            # White flash effect, built once per animation frame
+            queue.blit(LAYER_PLAYER, VARIANTS.flashed(self.image), self.rect.x, self.rect.y)
         else:
-            screen.blit(self.image, self.rect)
+            queue.blit(LAYER_PLAYER, self.image, self.rect.x, self.rect.y)
         
         # Debug visualization
         if DEBUG_MODE:
             # Draw bounding box
-            pygame.draw.rect(screen, (255, 0, 0), self.rect, 1)
+            queue.rect(LAYER_DEBUG, (255, 0, 0), self.rect, 1)
             
             # Draw state text
-            font = pygame.font.SysFont(None, 24)
+            font = get_font(24)
             state_text = font.render(f"State: {self.current_state}", True, (255, 255, 255))
             jumps_text = font.render(f"Jumps: {self.jump_count}/{self.max_jumps}", True, (255, 255, 255))
             ground_text = font.render(f"On Ground: {self.on_ground}", True, (255, 255, 255))
             wall_text = font.render(f"Wall Slide: {self.wall_sliding}", True, (255, 255, 255))
             
-            screen.blit(state_text, (self.rect.x, self.rect.y - 60))
-            screen.blit(jumps_text, (self.rect.x, self.rect.y - 40))
-            screen.blit(ground_text, (self.rect.x, self.rect.y - 20))
-            screen.blit(wall_text, (self.rect.x, self.rect.y - 80))
+            queue.blit(LAYER_DEBUG, state_text, self.rect.x, self.rect.y - 60)
+            queue.blit(LAYER_DEBUG, jumps_text, self.rect.x, self.rect.y - 40)
+            queue.blit(LAYER_DEBUG, ground_text, self.rect.x, self.rect.y - 20)
+            queue.blit(LAYER_DEBUG, wall_text, self.rect.x, self.rect.y - 80)
@@ -0,0 +1,129 @@
+"""
+On-demand frame profiling
+
+Pressing PROFILE_KEY profiles the next PROFILE_FRAMES iterations of the game
+loop with cProfile, without restarting the game under python -m cProfile.
+The profiler is only enabled for those iterations, so the rest of the
+session runs at full speed. When the capture ends:
+- the stats are written to PROFILE_DIR as profile_<time>.prof, which
+  pstats or snakeviz can open, with the top functions in a .txt beside it
+- the functions that took the most time per frame are drawn on screen for
+  PROFILE_SUMMARY_FRAMES frames
+
+cProfile only sees the thread it runs on. In pipelined mode the render
+thread's drawing is not in the stats; run without --pipelined to profile it.
+"""
+import os
+import time
+import pstats
+import cProfile
+import pygame
+from src.constants import *
+from src.config import PROFILE_DIR
+from src.render_queue import LAYER_HUD
+from src.fonts import get_font
+
+# Key that starts a capture
+PROFILE_KEY = pygame.K_F10
+
+class FrameProfiler:
+    """Profiles a run of game loop iterations on request"""
+
+    def __init__(self, directory=PROFILE_DIR, frames=PROFILE_FRAMES):
+        self.directory = directory
+        self.frames = frames
+        self.profile = None
+        self.remaining = 0
+
+        # Time the profiled iterations took, excluding the wait for the next frame
+        self.frame_start = 0.0
+        self.work_ms = 0.0
+        self.worst_ms = 0.0
+
+        # Summary of the last capture and how many more frames it is shown for
+        self.summary = []
+        self.summary_surfaces = None
+        self.summary_frames = 0
+
+    @property
+    def active(self):
+        return self.remaining > 0
+
+    def request(self):
+        """Profile the next iterations, starting with the next one"""
+        if not self.active:
+            self.remaining = self.frames
+
+    def begin_frame(self):
+        if not self.remaining:
+            return
+        if self.profile is None:
+            self.profile = cProfile.Profile()
+            self.work_ms = self.worst_ms = 0.0
+        self.frame_start = time.perf_counter()
+        self.profile.enable()
+
+    def end_frame(self):
+        """End a loop iteration; called before waiting for the next frame, which is not profiled"""
+        if self.profile is not None:
+            self.profile.disable()
+            frame_ms = (time.perf_counter() - self.frame_start) * 1000
+            self.work_ms += frame_ms
+            self.worst_ms = max(self.worst_ms, frame_ms)
+            self.remaining -= 1
+            if not self.remaining:
+                self.finish()
+        elif self.summary_frames:
+            self.summary_frames -= 1
+
+    def finish(self):
+        """Stop profiling and write out the stats, even if the capture was cut short"""
+        if self.profile is None:
+            return
+        self.profile.disable()
+        frames = self.frames - self.remaining
+        profile, self.profile = self.profile, None
+        self.remaining = 0
+
+        stamp = time.strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(self.directory, f"profile_{stamp}.prof")
+        stats = pstats.Stats(profile)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            stats.dump_stats(path)
+            with open(os.path.join(self.directory, f"profile_{stamp}.txt"), 'w') as f:
+                pstats.Stats(profile, stream=f).sort_stats('tottime').print_stats(PROFILE_REPORT_LINES)
+        except OSError as e:
+            # Profiling must never take the game down
+            print(f"Could not write profile: {e}")
+            path = None
+
+        # Functions with the most time of their own, per frame
+        top = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:PROFILE_SUMMARY_LINES]
+        self.summary = [f"Profiled {frames} frames: {self.work_ms / max(frames, 1):.1f} ms average, "
+                        f"{self.worst_ms:.1f} ms worst"]
+        for (filename, line, name), (calls, primitive, own, cumulative, callers) in top:
+            # Built-in functions have no file
+            where = f" ({os.path.basename(filename)}:{line})" if filename != '~' else ""
+            self.summary.append(f"{own * 1000 / max(frames, 1):6.2f} ms  {name}{where}")
+        if path:
+            self.summary.append(f"Saved to {os.path.basename(path)} in {self.directory}")
+        print("\n".join(self.summary))
+        self.summary_surfaces = None
+        self.summary_frames = PROFILE_SUMMARY_FRAMES
+
+    def draw(self, queue):
+        """Queue the summary of the last capture while it is shown"""
+        if self.active:
+            text = get_font(20).render(f"Profiling... {self.remaining} frames left", True, (255, 255, 0))
+            queue.blit(LAYER_HUD, text, 10, SCREEN_HEIGHT - 60)
+            return
+        if not self.summary_frames:
+            return
+        if self.summary_surfaces is None:
+            font = get_font(20)
+            self.summary_surfaces = [font.render(line, True, (255, 255, 0)) for line in self.summary]
+        y = SCREEN_HEIGHT - 60 - 20 * len(self.summary_surfaces)
+        for surface in self.summary_surfaces:
+            queue.blit(LAYER_HUD, surface, 10, y)
+            y += 20
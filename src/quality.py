@@ -0,0 +1,124 @@
+"""
+Graphics quality presets
+
+The visual cost knobs (background grid size, background glitch elements,
+static noise density, screen shake intensity and pixelation block sizes)
+come from a named preset in QUALITY_PRESETS. Rendering code reads them from
+QUALITY, the settings in use.
+
+The preset is stored in the user config. On first run it is picked by
+rendering a short stress scene with each preset, highest first, and keeping
+the first one that fits the frame budget.
+
+On top of the preset, the effect governor (src/governor.py) can shed
+effect fidelity at runtime, in SHED_STEPS order.
+"""
+import time
+import pygame
+from src.constants import *
+from src.config import load_config, update_config
+
+# What each governor shed level gives up, cheapest to lose first
+SHED_STEPS = ('noise density', 'background elements', 'pixelation method', 'overlay blending')
+
+class QualitySettings:
+    """Visual cost settings of one quality preset"""
+
+    def __init__(self, name=DEFAULT_QUALITY):
+        self.apply(name)
+
+    def apply(self, name):
+        """Switch to the named preset"""
+        preset = QUALITY_PRESETS[name]
+        self.name = name
+        self.grid_size = preset['grid_size']
+        self.background_elements = preset['background_elements']
+        self.noise_step = preset['noise_step']
+        self.shake_scale = preset['shake_scale']
+        self.pixel_sizes = preset['pixel_sizes']
+        self.set_shed_level(0)
+
+    def set_shed_level(self, level):
+        """Give up the first level SHED_STEPS on top of the preset"""
+        self.shed_level = level
+        # Static noise at half the density
+        self.noise_step = QUALITY_PRESETS[self.name]['noise_step'] * (2 if level >= 1 else 1)
+        # Background grid and glitch lines/blocks
+        self.background_detail = level < 2
+        # Pixelation resamples every frame, or every other frame
+        self.pixelation_every_frame = level < 3
+        # Color distortion blends a full-screen overlay, or tints scanlines
+        self.overlay_blending = level < 4
+
+# Settings read by all rendering code
+QUALITY = QualitySettings()
+
+def get_quality_name(config=None):
+    """Return the preset saved in the user config, or None if unset or unknown"""
+    if config is None:
+        config = load_config()
+    name = config.get('graphics', {}).get('quality')
+    return name if name in QUALITY_PRESETS else None
+
+def benchmark_preset(game, name, frames=QUALITY_BENCHMARK_FRAMES):
+    """Render the stress scene with a preset and return per-frame times in ms
+
+    The scene is the last level with its constant shake and static noise,
+    plus color distortion, screen shake and pixelation glitches. Only
+    cosmetic state is touched, so the game can start normally afterwards.
+    """
+    from src.level import Level
+    from src.level_data import LEVELS
+    from src.render_thread import RenderSnapshot
+
+    QUALITY.apply(name)
+    level = Level(LEVELS[-1], game.rng)
+    engine = game.glitch_engine
+    for glitch in engine.glitch_effects:
+        if glitch.name in ('color_distortion', 'screen_shake', 'pixelation'):
+            engine.start_glitch(glitch)
+
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        level.background.update()
+        level.update_screen_shake()
+        level.glitch_effect = "static"
+        for glitch in engine.updating_glitches:
+            glitch.update()
+
+        snapshot = RenderSnapshot(0, game.record_world(level), (level.shake_offset_x, level.shake_offset_y),
+                                  1, level.effect_params(game.rng.visual), engine.snapshot_effects(), (), None)
+        game.composite_world(surface, snapshot)
+        times.append((time.perf_counter() - start) * 1000)
+
+    engine.reset()
+    return times
+
+def calibrate_quality(game, budget_ms=FRAME_BUDGET_MS):
+    """Return the highest preset whose stress scene fits the frame budget"""
+    print("Calibrating graphics quality...")
+    for name in QUALITY_ORDER:
+        times = sorted(benchmark_preset(game, name))
+        # Ignore the slowest tenth of frames (warm-up, scheduler hiccups)
+        p90 = times[int(len(times) * 0.9)]
+        print(f"  {name}: p90 frame {p90:.1f} ms (budget {budget_ms} ms)")
+        if p90 <= budget_ms:
+            return name
+    return QUALITY_ORDER[-1]
+
+def setup_quality(game, name=None, recalibrate=False):
+    """Apply a preset: the given one, the configured one, or a calibrated one
+
+    A calibrated preset is saved to the user config so later launches skip
+    the benchmark.
+    """
+    if name is None and not recalibrate:
+        name = get_quality_name()
+    if name is None:
+        name = calibrate_quality(game)
+        update_config('graphics', {'quality': name})
+        print(f"Graphics quality set to {name}")
+    QUALITY.apply(name)
+    return name
@@ -0,0 +1,161 @@
+"""
+Render command queue
+
+World and HUD drawing code does not blit directly. It records commands with
+a layer key into a RenderQueue. At the end of the frame the queue sorts them
+once by layer (submission order within a layer) and draws them. Runs of
+blits go through a single batched Surface.blits call (fblits where pygame
+provides it).
+
+The queue is the one place where world positions meet the render surface.
+At draw time it applies:
+- the camera/shake offset, unless a command is marked fixed
+- the internal render scale; images are scaled once per render size and
+  the scaled copy is reused for as long as the image is alive
+- culling of anything outside the surface
+
+Recording and drawing can be separated: take() returns the frame's commands
+as a sorted tuple that draw_commands() can draw later, on any thread. The
+commands hold only plain values and images that are never drawn into once
+queued, so a taken frame does not change when the game moves on.
+"""
+import weakref
+import pygame
+from operator import itemgetter
+
+# Draw layers, back to front
+LAYER_BACKGROUND = 0
+LAYER_PLATFORMS = 10
+LAYER_EXIT = 20
+LAYER_ENEMIES = 30
+LAYER_PROJECTILES = 40
+LAYER_PLAYER = 50
+LAYER_DEBUG = 90
+LAYER_HUD = 100
+
+# Command kinds
+BLIT = 0
+RECT = 1
+LINE = 2
+LINES = 3
+FILL = 4
+SCALED_BLIT = 5  # Image already at the render scale
+
+# pygame-ce adds fblits, a faster blits without per-blit return values
+HAS_FBLITS = hasattr(pygame.Surface, 'fblits')
+
+# Scaled copy of each image drawn below full scale, as (size, copy). Entries
+# go away with their image, and queued images are never drawn into, so a
+# copy stays valid until the render scale changes
+_scaled_images = weakref.WeakKeyDictionary()
+
+def scaled_image(image, size):
+    """Return image scaled to size, reusing the copy made for an earlier frame"""
+    cached = _scaled_images.get(image)
+    if cached is None or cached[0] != size:
+        cached = (size, pygame.transform.scale(image, size))
+        _scaled_images[image] = cached
+    return cached[1]
+
+def draw_commands(surface, commands, scale=1, offset=(0, 0)):
+    """Draw sorted commands onto surface; returns (submitted, culled, batches)"""
+    offset_x, offset_y = offset
+    surface_width, surface_height = surface.get_size()
+    batch = []
+    culled = 0
+    batches = 0
+
+    for layer, kind, fixed, a, b, c in commands:
+        if kind == BLIT or kind == SCALED_BLIT:
+            image, x, y = a, b, c
+            if not fixed:
+                x += offset_x
+                y += offset_y
+            width, height = image.get_size()
+            if scale != 1:
+                x, y = int(x * scale), int(y * scale)
+                if kind == BLIT:
+                    width, height = max(1, int(width * scale)), max(1, int(height * scale))
+            if x >= surface_width or y >= surface_height or x + width <= 0 or y + height <= 0:
+                culled += 1
+                continue
+            if scale != 1 and kind == BLIT:
+                image = scaled_image(image, (width, height))
+            batch.append((image, (x, y)))
+            continue
+
+        # Primitives end the current batch to keep layer order
+        if batch:
+            _submit_batch(surface, batch)
+            batches += 1
+            batch = []
+        shift_x, shift_y = (0, 0) if fixed else (offset_x, offset_y)
+        if kind == RECT:
+            rect = b.move(shift_x, shift_y)
+            if scale != 1:
+                rect = pygame.Rect(int(rect.x * scale), int(rect.y * scale),
+                                   max(1, int(rect.width * scale)), max(1, int(rect.height * scale)))
+            pygame.draw.rect(surface, a, rect, c)
+        elif kind == LINE:
+            (x1, y1), (x2, y2) = b
+            pygame.draw.line(surface, a,
+                             ((x1 + shift_x) * scale, (y1 + shift_y) * scale),
+                             ((x2 + shift_x) * scale, (y2 + shift_y) * scale), c)
+        elif kind == LINES:
+            points = [((x + shift_x) * scale, (y + shift_y) * scale) for x, y in b]
+            pygame.draw.lines(surface, a, False, points, c)
+        else:
+            surface.fill(a)
+
+    if batch:
+        _submit_batch(surface, batch)
+        batches += 1
+    return len(commands), culled, batches
+
+def _submit_batch(surface, batch):
+    if HAS_FBLITS:
+        surface.fblits(batch)
+    else:
+        surface.blits(batch, False)
+
+class RenderQueue:
+    """Per-frame list of draw commands, sorted by layer and drawn in batches"""
+
+    def __init__(self):
+        self.commands = []
+        self.scale = 1
+
+    def begin(self, scale=1):
+        """Start recording a frame to be drawn at an internal render scale"""
+        self.commands = []
+        self.scale = scale
+
+    def blit(self, layer, image, x, y, fixed=False, prescaled=False):
+        """Queue an image at a logical position; fixed ignores the camera offset
+
+        prescaled images are already sized for the render scale.
+        """
+        self.commands.append((layer, SCALED_BLIT if prescaled else BLIT, fixed, image, x, y))
+
+    def rect(self, layer, color, rect, width=0, fixed=False):
+        """Queue a rectangle outline (or fill when width is 0)"""
+        self.commands.append((layer, RECT, fixed, color, pygame.Rect(rect), width))
+
+    def line(self, layer, color, start, end, width=1, fixed=False):
+        """Queue a line between two logical positions"""
+        self.commands.append((layer, LINE, fixed, color, (start, end), width))
+
+    def lines(self, layer, color, points, width=1, fixed=False):
+        """Queue an open polyline through logical positions"""
+        self.commands.append((layer, LINES, fixed, color, tuple(points), width))
+
+    def fill(self, layer, color):
+        """Queue a fill of the whole surface"""
+        self.commands.append((layer, FILL, True, color, None, 0))
+
+    def take(self):
+        """Return the recorded commands in layer order and start a new list"""
+        commands = self.commands
+        commands.sort(key=itemgetter(0))  # Stable, so submission order holds within a layer
+        self.commands = []
+        return tuple(commands)
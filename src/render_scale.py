@@ -0,0 +1,77 @@
+"""
+Dynamic internal render resolution
+
+Gameplay and glitch effects are drawn into a surface at a fraction of the
+logical screen size and upscaled once (nearest neighbour, by an integer
+factor) to the screen, so full-screen work like fills, overlays and post
+effects costs less on slow machines. RenderScaler watches how long each
+frame's work takes and steps the internal scale down when the frame-time
+budget is exceeded, and back up when there is clearly room for the larger
+size.
+
+World drawing code keeps using logical screen coordinates; the render queue
+(src/render_queue.py) maps them to the render surface.
+"""
+from src.constants import *
+
+def scaled_size(scale):
+    """Internal render size for a scale factor"""
+    return max(1, int(SCREEN_WIDTH * scale)), max(1, int(SCREEN_HEIGHT * scale))
+
+class RenderScaler:
+    """Chooses the internal render scale that keeps frames inside a time budget
+
+    frame_finished() is called with the work time of every frame (update and
+    render, not the time spent waiting for the next tick). The average over
+    the last frames is compared with the budget; after a change the scaler
+    waits a cooldown before deciding again so the new cost can settle.
+    """
+
+    def __init__(self, budget_ms=FRAME_BUDGET_MS, scales=RENDER_SCALES, dynamic=DYNAMIC_RESOLUTION):
+        self.budget_ms = budget_ms
+        self.scales = scales
+        self.dynamic = dynamic
+        self.index = 0
+        self.scale = scales[0]
+        self.size = scaled_size(self.scale)
+        self.average_ms = 0.0
+        self.cooldown = RENDER_SCALE_COOLDOWN
+        self.changes = 0
+
+    def frame_finished(self, work_ms, can_lower=True):
+        """Record a frame's work time; returns True if the scale changed
+
+        can_lower is False while cheaper measures (shedding effects) are
+        still available.
+        """
+        # Exponential moving average over roughly the cooldown window
+        self.average_ms += (work_ms - self.average_ms) * (2.0 / (RENDER_SCALE_COOLDOWN + 1))
+        if not self.dynamic:
+            return False
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return False
+
+        # Over budget: drop to the next smaller scale
+        if self.average_ms > self.budget_ms and can_lower and self.index < len(self.scales) - 1:
+            return self.set_index(self.index + 1)
+
+        # Step back up only if the larger size, whose cost grows with its
+        # pixel count, would still fit comfortably
+        if self.index > 0:
+            ratio = (self.scales[self.index - 1] / self.scale) ** 2
+            if self.average_ms * ratio < self.budget_ms * RENDER_SCALE_HEADROOM:
+                return self.set_index(self.index - 1)
+        return False
+
+    def set_index(self, index):
+        """Switch to scales[index]; returns True if the scale changed"""
+        index = max(0, min(len(self.scales) - 1, index))
+        self.cooldown = RENDER_SCALE_COOLDOWN
+        if index == self.index:
+            return False
+        self.index = index
+        self.scale = self.scales[index]
+        self.size = scaled_size(self.scale)
+        self.changes += 1
+        return True
@@ -0,0 +1,106 @@
+"""
+Pipelined rendering
+
+Every frame the simulation records a RenderSnapshot: everything needed to
+draw the frame, as plain values, command tuples and images that are never
+drawn into again. Rendering reads only the snapshot, never the live game
+objects.
+
+Normally the snapshot is drawn right away on the main thread. In pipelined
+mode a RenderThread draws it instead: it composites the world, applies the
+glitch post effects, draws the HUD and flips the display for frame N while
+the main thread simulates frame N+1. The two threads share a one-slot
+queue, so the simulation runs at most one frame ahead of the display.
+Most of the render work happens inside pygame calls that release the GIL,
+so the two sides overlap.
+
+Each side keeps to its own state. Random draws for the frame's effects are
+made while the snapshot is recorded, never while it is drawn, and the
+surfaces rendering draws into live in a RenderTarget owned by whichever
+thread renders.
+
+Some platforms (macOS) only allow display calls on the main thread, which
+is why pipelined mode is opt-in (PIPELINED_RENDERING, --pipelined).
+"""
+import queue
+import threading
+import time
+from collections import namedtuple
+import pygame
+
+# One frame to draw:
+# - frame: simulation frame number
+# - world: sorted world commands, or None when no world is shown (menu)
+# - offset: camera/shake offset applied to the world commands
+# - scale: internal render scale the world is drawn at
+# - level_effect: level glitch effect params, including the seed for its noise, or None
+# - effects: (glitch, params) post effects in render order
+# - overlay: sorted commands drawn at full resolution (notification, HUD, menus)
+# - input_time: stamp of the oldest input this frame shows, or None
+RenderSnapshot = namedtuple('RenderSnapshot', (
+    'frame', 'world', 'offset', 'scale', 'level_effect', 'effects', 'overlay', 'input_time'))
+
+class RenderTarget:
+    """The render surface one renderer draws the world into, and its draw counts"""
+
+    def __init__(self, size):
+        self.surface = pygame.Surface(size)
+
+        # Render queue counts (submitted, culled, batches) for the last world drawn
+        self.draw_stats = (0, 0, 0)
+
+    def surface_for(self, size):
+        """Return the render surface, resized to an internal render size"""
+        if self.surface.get_size() != size:
+            self.surface = pygame.Surface(size)
+        return self.surface
+
+class RenderThread(threading.Thread):
+    """Draws submitted snapshots, one at a time, on a separate thread
+
+    render is called with each snapshot and the thread's own RenderTarget.
+    """
+
+    def __init__(self, render, size):
+        super().__init__(name="render", daemon=True)
+        self.render = render
+        self.target = RenderTarget(size)
+        self.snapshots = queue.Queue(maxsize=1)
+        self.render_ms = 0.0
+        self.frames = 0
+        self.error = None
+
+    def submit(self, snapshot):
+        """Hand a snapshot over, waiting while the previous one is still queued"""
+        while True:
+            # Surface a failure on the render side instead of waiting forever
+            if self.error is not None:
+                raise RuntimeError("Render thread stopped") from self.error
+            try:
+                self.snapshots.put(snapshot, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def run(self):
+        while True:
+            snapshot = self.snapshots.get()
+            if snapshot is None:
+                break
+            start = time.perf_counter()
+            try:
+                self.render(snapshot, self.target)
+            except Exception as e:
+                self.error = e
+                break
+            self.render_ms = (time.perf_counter() - start) * 1000
+            self.frames += 1
+
+    def stop(self):
+        """Draw what is queued, then end the thread"""
+        if self.is_alive():
+            try:
+                self.submit(None)
+            except RuntimeError:
+                pass
+            self.join()
@@ -0,0 +1,98 @@
+"""
+Input session recording and headless re-simulation
+
+A replay file holds everything needed to re-run a session frame for frame:
+the RNG seed, every key event the game loop received (tagged with its frame),
+the number of frames played, and the final score, lives and level the cabinet
+claimed. It also holds a hash of the gameplay state after every simulation
+tick (see src/state_hash.py), so a replay that does not reproduce the
+session can report the first tick where it went wrong.
+"""
+import json
+import os
+import time
+import pygame
+from src.state_hash import encode_hashes, decode_hashes, first_divergence
+
+REPLAY_VERSION = 5
+
+
+class ReplayRecorder:
+    """Records the inputs of a live session for later verification"""
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.frame = 0
+        self.events = []  # [frame, type, key]; key is None for QUIT
+
+    def record_frame(self, events):
+        """Record the events of one game loop iteration"""
+        for event in events:
+            if event.type == pygame.QUIT:
+                self.events.append([self.frame, 'q', None])
+            elif event.type == pygame.KEYDOWN:
+                self.events.append([self.frame, 'd', event.key])
+            elif event.type == pygame.KEYUP:
+                self.events.append([self.frame, 'u', event.key])
+        self.frame += 1
+
+    def save(self, directory, game):
+        """Write the session with the game's final result as the claim"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"session_{time.strftime('%Y%m%d_%H%M%S')}_{self.seed}.json")
+        replay = {
+            'version': REPLAY_VERSION,
+            'seed': self.seed,
+            'frames': self.frame,
+            'events': self.events,
+            'hashes': encode_hashes(game.state_hashes),
+            'claimed': {
+                'score': game.score,
+                'lives': game.lives,
+                'level': game.current_level_index,
+            },
+        }
+        with open(path, 'w') as f:
+            json.dump(replay, f, separators=(',', ':'))
+        return path
+
+
+def load_replay(path):
+    """Load a replay file, checking its format version"""
+    with open(path) as f:
+        replay = json.load(f)
+    if replay.get('version') != REPLAY_VERSION:
+        raise ValueError(f"Unsupported replay version {replay.get('version')} in {path}")
+    return replay
+
+
+def simulate_replay(replay):
+    """Re-run a recorded session headlessly and return the final result
+
+    pygame must already be initialized (see src.env.init_headless).
+    """
+    from src.game import Game
+    game = Game(headless=True, seed=replay['seed'], hash_state=True)
+
+    # Group events by the frame they were received on
+    events_by_frame = {}
+    for frame, kind, key in replay['events']:
+        if kind == 'q':
+            event = pygame.event.Event(pygame.QUIT)
+        else:
+            event = pygame.event.Event(pygame.KEYDOWN if kind == 'd' else pygame.KEYUP, key=key)
+        events_by_frame.setdefault(frame, []).append(event)
+
+    frame = 0
+    while frame < replay['frames'] and game.running:
+        game.handle_events(events_by_frame.get(frame, []))
+        game.update()
+        frame += 1
+
+    return {
+        'score': game.score,
+        'lives': game.lives,
+        'level': game.current_level_index,
+        'frames': frame,
+        'diverged_at': first_divergence(game.state_hashes, decode_hashes(replay['hashes'])),
+    }
@@ -0,0 +1,267 @@
+"""
+Rewind
+
+While the rewind key is held the game runs backwards through the last
+REWIND_SECONDS of play, one captured tick per frame.
+
+Every simulation tick the gameplay state of the current level is captured
+into a flat array of numbers:
+- the game clock's tick, score and lives
+- the player
+- every enemy
+- the platform fades
+- the glitch engine, including which glitches are active and when they end
+The layout depends on the level's enemies and platforms. During play they
+never come or go; only a dev mode hot reload (src/hot_reload.py) adds or
+drops them, and it clears the history of the level it edits, so every
+captured tick has the layout of the current level. Projectiles come and go,
+so they are kept in a small array of their own.
+
+Every REWIND_KEYFRAME_INTERVAL ticks the full array is kept as a keyframe.
+Ticks in between only keep the indices and values that differ from their
+keyframe, so any tick decodes in one step. Entries live in a fixed ring,
+so memory stays bounded: ten seconds of level 5 fit in well under a
+megabyte.
+
+Cosmetic state (background, shake, animation timers) is not rewound. Rewind
+only depends on the recorded history, so replays re-simulate it exactly.
+"""
+import time
+import heapq
+import pygame
+from array import array
+from src.constants import *
+from src.enemy import Projectile
+from src.variant_cache import VARIANTS
+
+# Key held to rewind
+REWIND_KEY = pygame.K_r
+
+# Player animation states, so the current one can be stored as a number
+PLAYER_STATES = ('idle_right', 'idle_left', 'run_right', 'run_left', 'jump_right', 'jump_left',
+                 'fall_right', 'fall_left', 'wall_slide_right', 'wall_slide_left')
+
+# Names of the fields at fixed positions at the start of the state array,
+# in the order capture_state writes them
+GAME_FIELD_NAMES = ('game.tick', 'game.score', 'game.lives')
+PLAYER_FIELD_NAMES = ('player.x', 'player.y', 'player.velocity_x', 'player.velocity_y',
+                      'player.on_ground', 'player.facing_right', 'player.jump_count', 'player.jump_held',
+                      'player.jump_time', 'player.wall_sliding', 'player.invincible', 'player.invincible_timer',
+                      'player.gravity', 'player.ceiling_enabled', 'player.speed', 'player.state', 'player.sprite')
+ENGINE_FIELD_NAMES = ('engine.last_glitch_tick', 'engine.input_lag_frames', 'engine.flicker_state',
+                      'engine.flicker_timer', 'engine.color_shift_r', 'engine.color_shift_g', 'engine.color_shift_b',
+                      'engine.shake_amount', 'engine.pixel_size', 'engine.speed_multiplier')
+
+# Index of each of those fields in the state array
+FIELD_OFFSETS = {name: index for index, name in enumerate(GAME_FIELD_NAMES + PLAYER_FIELD_NAMES + ENGINE_FIELD_NAMES)}
+
+GAME_FIELDS = len(GAME_FIELD_NAMES)
+PLAYER_FIELDS = len(PLAYER_FIELD_NAMES)
+ENGINE_FIELDS = len(ENGINE_FIELD_NAMES)
+GLITCH_FIELDS = 2   # Active flag and end tick, per glitch
+ENEMY_FIELDS = 9
+PLATFORM_FIELDS = 3
+PROJECTILE_FIELDS = 4  # Enemy index, x, y, direction
+
+def capture_state(game):
+    """Return the level's gameplay state as (state array, projectile array)
+
+    The fixed fields come first, at the positions in FIELD_OFFSETS, then the
+    glitches, enemies and platforms.
+    """
+    player = game.player
+    engine = game.glitch_engine
+    level = game.current_level
+    state = [
+        game.game_clock.tick, game.score, game.lives,
+        player.rect.x, player.rect.y, player.velocity_x, player.velocity_y,
+        player.on_ground, player.facing_right, player.jump_count, player.jump_held,
+        player.jump_time, player.wall_sliding, player.invincible, player.invincible_timer, player.gravity,
+        player.ceiling_enabled, player.speed, PLAYER_STATES.index(player.current_state), player.current_sprite,
+        engine.last_glitch_tick, engine.input_lag_frames, engine.flicker_state,
+        engine.flicker_timer, engine.color_shift[0], engine.color_shift[1], engine.color_shift[2],
+        engine.shake_amount, engine.pixel_size, engine.speed_multiplier,
+    ]
+    for glitch in engine.glitch_effects:
+        state += (glitch.active, glitch.end_tick)
+
+    projectiles = []
+    for index, enemy in enumerate(level.enemies):
+        state += (enemy.rect.x, enemy.rect.y, enemy.velocity_x, enemy.velocity_y, enemy.direction,
+                  enemy.on_ground, enemy.jump_timer, enemy.shoot_timer, enemy.animation_frame)
+        for projectile in enemy.projectiles:
+            projectiles += (index, projectile.rect.x, projectile.rect.y, projectile.direction)
+
+    for platform in level.platforms:
+        state += (platform.alpha, platform.solid, platform.disappearing)
+
+    return array('d', state), array('h', projectiles)
+
+def apply_state(game, state, projectiles):
+    """Put the level back into a captured state"""
+    # Game; the clock goes back too, so timers measured against it (such as
+    # invincibility and the level time bonus) resume where they were
+    game.game_clock.tick = int(state[0])
+    game.score = int(state[1])
+    game.lives = int(state[2])
+
+    # Player
+    player = game.player
+    offset = GAME_FIELDS
+    player.rect.x = int(state[offset])
+    player.rect.y = int(state[offset + 1])
+    player.velocity_x = state[offset + 2]
+    player.velocity_y = state[offset + 3]
+    player.on_ground = bool(state[offset + 4])
+    player.facing_right = bool(state[offset + 5])
+    player.jump_count = int(state[offset + 6])
+    player.jump_held = bool(state[offset + 7])
+    player.jump_time = int(state[offset + 8])
+    player.wall_sliding = bool(state[offset + 9])
+    player.invincible = bool(state[offset + 10])
+    player.invincible_timer = int(state[offset + 11])
+    player.gravity = state[offset + 12]
+    player.ceiling_enabled = bool(state[offset + 13])
+    player.speed = state[offset + 14]
+    player.current_state = PLAYER_STATES[int(state[offset + 15])]
+    player.current_sprite = state[offset + 16]
+    player.image = player.sprites[player.current_state][int(player.current_sprite)]
+
+    # Glitch engine; the glitches' effects on the player and platforms are
+    # restored with them, so activate/deactivate are not called
+    engine = game.glitch_engine
+    offset += PLAYER_FIELDS
+    engine.last_glitch_tick = int(state[offset])
+    engine.input_lag_frames = int(state[offset + 1])
+    engine.flicker_state = bool(state[offset + 2])
+    engine.flicker_timer = int(state[offset + 3])
+    engine.color_shift = (int(state[offset + 4]), int(state[offset + 5]), int(state[offset + 6]))
+    engine.shake_amount = int(state[offset + 7])
+    engine.pixel_size = int(state[offset + 8])
+    engine.speed_multiplier = state[offset + 9]
+    if not engine.shake_amount:
+        engine.screen_offset = (0, 0)
+    offset += ENGINE_FIELDS
+
+    active = []
+    for glitch in engine.glitch_effects:
+        glitch.active = bool(state[offset])
+        glitch.end_tick = int(state[offset + 1])
+        if glitch.active:
+            active.append(glitch)
+        offset += GLITCH_FIELDS
+    engine.active_glitches = active
+    engine.expiry_heap = []
+    for glitch in active:
+        engine.expiry_sequence += 1
+        engine.expiry_heap.append((glitch.end_tick, engine.expiry_sequence, glitch))
+    heapq.heapify(engine.expiry_heap)
+    engine._refresh_hook_lists()
+
+    # Enemies and their projectiles
+    level = game.current_level
+    enemies = list(level.enemies)
+    for enemy in enemies:
+        enemy.rect.x = int(state[offset])
+        enemy.rect.y = int(state[offset + 1])
+        enemy.velocity_x = state[offset + 2]
+        enemy.velocity_y = state[offset + 3]
+        enemy.direction = int(state[offset + 4])
+        enemy.on_ground = bool(state[offset + 5])
+        enemy.jump_timer = int(state[offset + 6])
+        enemy.shoot_timer = int(state[offset + 7])
+        enemy.animation_frame = state[offset + 8]
+        enemy.image = enemy.cycle.frame_at(enemy.animation_frame)
+        enemy.projectiles.empty()
+        offset += ENEMY_FIELDS
+    for i in range(0, len(projectiles), PROJECTILE_FIELDS):
+        index, x, y, direction = projectiles[i:i + PROJECTILE_FIELDS]
+        enemies[index].projectiles.add(Projectile(x, y, direction))
+
+    # Platform fades
+    engine.disappearing_platforms = []
+    for platform in level.platforms:
+        platform.alpha = int(state[offset])
+        platform.solid = bool(state[offset + 1])
+        platform.disappearing = bool(state[offset + 2])
+        if platform.disappearing:
+            engine.disappearing_platforms.append(platform)
+            platform.image = VARIANTS.faded(platform.original_image, platform.alpha)
+        else:
+            platform.image = platform.original_image
+        offset += PLATFORM_FIELDS
+
+class RewindBuffer:
+    """Fixed ring of captured ticks, delta-encoded against periodic keyframes
+
+    Each entry is (keyframe, indices, values, projectiles, age): the
+    keyframe array it is encoded against, the indices and values that
+    differ from it, the projectiles, and how many ticks after the keyframe
+    it was captured.
+    """
+
+    def __init__(self, capacity=REWIND_SECONDS * FPS, keyframe_interval=REWIND_KEYFRAME_INTERVAL):
+        self.capacity = capacity
+        self.keyframe_interval = keyframe_interval
+        self.entries = [None] * capacity
+        self.head = 0  # Index of the newest entry
+        self.count = 0
+
+        # Average capture time in ms, for the debug overlay
+        self.capture_ms = 0.0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.entries = [None] * self.capacity
+        self.count = 0
+
+    def capture(self, game):
+        """Capture the game's current tick"""
+        start = time.perf_counter()
+        state, projectiles = capture_state(game)
+
+        newest = self.entries[self.head] if self.count else None
+        if newest is None or newest[4] + 1 >= self.keyframe_interval or len(newest[0]) != len(state):
+            entry = (state, array('H'), array('d'), projectiles, 0)
+        else:
+            keyframe = newest[0]
+            changed = [i for i, (a, b) in enumerate(zip(state, keyframe)) if a != b]
+            entry = (keyframe, array('H', changed), array('d', [state[i] for i in changed]), projectiles, newest[4] + 1)
+
+        self.head = (self.head + 1) % self.capacity
+        self.entries[self.head] = entry
+        self.count = min(self.count + 1, self.capacity)
+        self.capture_ms += ((time.perf_counter() - start) * 1000 - self.capture_ms) * 0.05
+
+    def step_back(self, game):
+        """Drop the newest tick and restore the one before it; returns False when history runs out"""
+        if self.count < 2:
+            return False
+        self.entries[self.head] = None
+        self.head = (self.head - 1) % self.capacity
+        self.count -= 1
+
+        keyframe, indices, values, projectiles, age = self.entries[self.head]
+        state = array('d', keyframe)
+        for index, value in zip(indices, values):
+            state[index] = value
+        apply_state(game, state, projectiles)
+        return True
+
+    @property
+    def bytes(self):
+        """Approximate memory held by the captured history"""
+        total = 0
+        keyframes = set()
+        for entry in self.entries:
+            if entry is None:
+                continue
+            keyframe, indices, values, projectiles, age = entry
+            if id(keyframe) not in keyframes:
+                keyframes.add(id(keyframe))
+                total += len(keyframe) * keyframe.itemsize
+            total += len(indices) * indices.itemsize + len(values) * values.itemsize
+            total += len(projectiles) * projectiles.itemsize
+        return total
@@ -0,0 +1,34 @@
+"""
+Random number streams
+
+Every Game owns a RandomStreams, and each subsystem draws from a stream of
+its own, so the numbers one of them draws never shift the sequence another
+one sees:
+- gameplay: gameplay decisions (which glitch fires, input lag, speed
+  multiplier, disappearing platforms)
+- visual: purely cosmetic effects (background, static, shake, ...)
+How much cosmetic work gets done (quality presets, render scale) never
+changes the gameplay sequence. The streams belong to one game, so games
+sharing a process (vector envs, replay verification) never draw from each
+other's streams. Nothing in the game draws from the global random module.
+"""
+import random
+
+# Stream names; each is an attribute of RandomStreams
+STREAM_NAMES = ('gameplay', 'visual')
+
+class RandomStreams:
+    """The random streams of one game"""
+
+    def __init__(self, seed=None):
+        self.gameplay = random.Random()
+        self.visual = random.Random()
+        self.seed(seed)
+
+    def seed(self, seed):
+        """Seed every stream from one seed, each with a seed of its own derived from it
+
+        None seeds them from the operating system's randomness.
+        """
+        for name in STREAM_NAMES:
+            getattr(self, name).seed(None if seed is None else f"{name}:{seed}")
@@ -1,27 +1,30 @@
 import pygame
-import os
-import sys
-from src.constants import DEFAULT_MUSIC_VOLUME, DEFAULT_SFX_VOLUME
+from src.constants import DEFAULT_MUSIC_VOLUME, DEFAULT_SFX_VOLUME, SOUND_CHANNEL_GROUPS
+from src import synth
+from src.assets import get_assets
 
-# Try to import the resource_path function
-try:
-    from resource_path import resource_path
-except ImportError:
-    # If not available, define it here
-    def resource_path(relative_path):
-        """Get absolute path to resource, works for dev and for PyInstaller"""
-        try:
-            # PyInstaller creates a temp folder and stores path in _MEIPASS
-            base_path = sys._MEIPASS
-        except Exception:
-            base_path = os.path.abspath(".")
-        
-        return os.path.join(base_path, relative_path)
+# Per-sound playback settings: (category, priority, minimum ms between plays).
+# A sound may steal a voice in its category from a sound of equal or lower
+# priority when every channel of the category is busy.
+SOUND_SETTINGS = {
+    'jump': ('player', 1, 50),
+    'land': ('player', 0, 80),
+    'wall_slide': ('player', 0, 300),
+    'glitch': ('glitch', 1, 200),
+    'level_complete': ('event', 2, 500),
+    'game_completed': ('event', 3, 500),
+    'game_over': ('death', 3, 500),
+    'final_death': ('death', 4, 500),
+}
+DEFAULT_SOUND_SETTING = ('event', 0, 0)
+
+# Decoded sounds by file path, shared by every SoundManager in the process
+_SOUND_CACHE = {}
 
 class SoundManager:
-    def __init__(self):
-        # Initialize pygame mixer
-        pygame.mixer.init()
+    def __init__(self, enabled=True):
+        # A disabled manager (headless games) never touches the mixer
+        self.enabled = enabled
         
         # Set volume levels from constants
         self.music_volume = DEFAULT_MUSIC_VOLUME
@@ -31,57 +34,86 @@ class SoundManager:
         # Dictionary to store sound effects
         self.sounds = {}
         
+        # Voice pool: channels per category, what each channel is playing as
+        # (priority, start tick), and when each sound last played
+        self.channel_groups = {}
+        self.voices = {}
+        self.last_played = {}
+        
+        if not self.enabled:
+            return
+        
+        # Initialize pygame mixer
+        pygame.mixer.init()
+        self.setup_channels()
+        
         # Load sounds
         self.load_sounds()
     
+    def setup_channels(self):
+        """Reserve a fixed group of mixer channels for each sound category"""
+        total = sum(SOUND_CHANNEL_GROUPS.values())
+        pygame.mixer.set_num_channels(total)
+        # Reserved channels are never picked by Sound.play(), so only the
+        # voice pool decides what plays where
+        pygame.mixer.set_reserved(total)
+        
+        index = 0
+        for category, count in SOUND_CHANNEL_GROUPS.items():
+            self.channel_groups[category] = [pygame.mixer.Channel(i) for i in range(index, index + count)]
+            self.voices[category] = [(0, 0)] * count
+            index += count
+    
     def load_sounds(self):
         """Load all game sounds"""
-        sound_path = resource_path(os.path.join('assets', 'sounds'))
-        print(f"Looking for sound files in: {sound_path}")
-        
         # Check if sound files exist and load them
         try:
             # Sound effects
             self._try_load_sound('jump', [
-                os.path.join(sound_path, 'jump.wav'),
-                os.path.join(sound_path, 'jump-audio.mp3'),
-                os.path.join(sound_path, 'jump.mp3')
+                'sounds/jump.wav',
+                'sounds/jump-audio.mp3',
+                'sounds/jump.mp3'
             ])
             
             self._try_load_sound('land', [
-                os.path.join(sound_path, 'land.wav')
+                'sounds/land.wav'
             ])
             
             self._try_load_sound('glitch', [
-                os.path.join(sound_path, 'glitch.wav')
+                'sounds/glitch.wav'
             ])
             
             self._try_load_sound('level_complete', [
-                os.path.join(sound_path, 'level_complete.wav')
+                'sounds/level_complete.wav'
             ])
             
             # Game over sound (single death)
             self._try_load_sound('game_over', [
-                os.path.join(sound_path, 'pixel-explosion-319166.mp3'),
-                os.path.join(sound_path, 'game-over.mp3'),
-                os.path.join(sound_path, 'death.mp3'),
-                os.path.join(sound_path, 'death.wav')
+                'sounds/pixel-explosion-319166.mp3',
+                'sounds/game-over.mp3',
+                'sounds/death.mp3',
+                'sounds/death.wav'
             ])
             
             # Final death sound (when out of lives)
             self._try_load_sound('final_death', [
-                os.path.join(sound_path, 'pixel-death-66829.mp3'),
-                os.path.join(sound_path, 'final-death.mp3'),
-                os.path.join(sound_path, 'final-death.wav')
+                'sounds/pixel-death-66829.mp3',
+                'sounds/final-death.mp3',
+                'sounds/final-death.wav'
             ])
             
             # Game completion sound
             self._try_load_sound('game_completed', [
-                os.path.join(sound_path, 'goodresult-82807.mp3'),
-                os.path.join(sound_path, 'complete.mp3'),
-                os.path.join(sound_path, 'complete.wav')
+                'sounds/goodresult-82807.mp3',
+                'sounds/complete.mp3',
+                'sounds/complete.wav'
             ])
             
+            # Synthesize effects that have no asset
+            for sound_name, params in synth.SFX_PRESETS.items():
+                if sound_name not in self.sounds:
+                    self._try_load_synth_sound(sound_name, params)
+            
             # Set volumes for all sounds
             for sound in self.sounds.values():
                 sound.set_volume(self.sfx_volume)
@@ -90,28 +122,45 @@ class SoundManager:
             print(f"Error loading sounds: {e}")
             print("Continuing without sound effects.")
     
-    def _try_load_sound(self, sound_name, file_paths):
-        """Try to load a sound from multiple possible file paths"""
-        for path in file_paths:
-            try:
-                if os.path.exists(path):
-                    self.sounds[sound_name] = pygame.mixer.Sound(path)
-                    print(f"Successfully loaded {sound_name} sound from: {path}")
-                    return True
-            except Exception as e:
-                print(f"Failed to load {sound_name} sound from {path}: {e}")
-        
-        print(f"Could not find any {sound_name} sound files")
-        return False
+    def _try_load_sound(self, sound_name, names):
+        """Try to load a sound from the first of several asset names that exists"""
+        name = get_assets().find(names)
+        if name is None:
+            # Not an error: effects without an asset are synthesized instead
+            return False
+        try:
+            self._load_cached(sound_name, name, get_assets().load_sound)
+            return True
+        except Exception as e:
+            print(f"Failed to load {sound_name} sound from {name}: {e}")
+            return False
+    
+    def _try_load_synth_sound(self, sound_name, params):
+        """Load a synthesized sound, rendering it into the disk cache if needed"""
+        try:
+            self._load_cached(sound_name, synth.get_cached_path(params), pygame.mixer.Sound)
+        except Exception as e:
+            print(f"Failed to synthesize {sound_name} sound: {e}")
+    
+    def _load_cached(self, sound_name, key, load):
+        # Sounds are decoded to PCM once per process and shared
+        sound = _SOUND_CACHE.get(key)
+        if sound is None:
+            sound = load(key)
+            _SOUND_CACHE[key] = sound
+        self.sounds[sound_name] = sound
     
     def play_music(self, music_name):
         """Play background music"""
-        music_path = resource_path(os.path.join('assets', 'sounds', f'{music_name}.mp3'))
+        if not self.enabled:
+            return
+        
+        music = f'sounds/{music_name}.mp3'
         
         # Check if music file exists
-        if os.path.exists(music_path):
+        if get_assets().exists(music):
             try:
-                pygame.mixer.music.load(music_path)
+                get_assets().load_music(music)
                 pygame.mixer.music.set_volume(0 if self.muted else self.music_volume)
                 pygame.mixer.music.play(-1)  # -1 means loop indefinitely
             except Exception as e:
@@ -121,100 +170,67 @@ class SoundManager:
             self.create_placeholder_music()
     
     def create_placeholder_music(self):
-        """Create a simple placeholder music using pygame's synth"""
+        """Play a synthesized music loop, rendered once and cached on disk"""
         try:
-            # This is a simple placeholder that creates a basic synth sound
-            # In a real game, you'd use actual music files
-            pygame.mixer.music.load(self.generate_placeholder_music())
+            pygame.mixer.music.load(synth.get_cached_path(synth.MUSIC_PRESETS['background']))
             pygame.mixer.music.set_volume(0 if self.muted else self.music_volume * 0.5)
             pygame.mixer.music.play(-1)
-        except:
-            print("Could not create placeholder music.")
-    
-    def generate_placeholder_music(self):
-        """Generate a simple music file using pygame's synth capabilities"""
-        # This is a very basic placeholder - in a real game you'd use actual music files
-        # This creates a simple sine wave pattern
-        try:
-            import numpy as np
-            from io import BytesIO
-            
-            sample_rate = 44100
-            duration = 5.0  # 5 seconds
-            
-            # Generate a simple melody
-            t = np.linspace(0, duration, int(sample_rate * duration), False)
-            
-            # Create a simple melody pattern
-            notes = [261.63, 293.66, 329.63, 349.23, 392.00, 440.00, 493.88, 523.25]  # C4 to C5
-            melody = np.zeros_like(t)
-            
-            note_duration = 0.5  # half a second per note
-            for i, note in enumerate(notes):
-                start = int(i * note_duration * sample_rate)
-                end = int((i + 1) * note_duration * sample_rate)
-                if end > len(t):
-                    break
-                melody[start:end] = np.sin(2 * np.pi * note * t[start:end])
-            
-            # Convert to 16-bit PCM
-            melody = (melody * 32767).astype(np.int16)
-            
-            # Save to a BytesIO object
-            buffer = BytesIO()
-            import wave
-            with wave.open(buffer, 'wb') as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(2)
-                wf.setframerate(sample_rate)
-                wf.writeframes(melody.tobytes())
-            
-            buffer.seek(0)
-            return buffer
-        except ImportError:
-            # If numpy is not available, create a simple beep sound
-            print("NumPy not available, creating simple beep sound")
-            from array import array
-            from math import sin, pi
-            
-            sample_rate = 44100
-            duration = 1.0  # 1 second
-            volume = 0.5
-            
-            # Generate a simple sine wave
-            n_samples = int(sample_rate * duration)
-            sound_buffer = array("h", [0] * n_samples)
-            
-            for i in range(n_samples):
-                sample = int(volume * 32767.0 * sin(2 * pi * 440 * i / sample_rate))
-                sound_buffer[i] = sample
-            
-            # Save to a BytesIO object
-            from io import BytesIO
-            buffer = BytesIO()
-            import wave
-            with wave.open(buffer, 'wb') as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(2)
-                wf.setframerate(sample_rate)
-                wf.writeframes(sound_buffer.tobytes())
-            
-            buffer.seek(0)
-            return buffer
+        except Exception as e:
+            print(f"Could not create placeholder music: {e}")
     
     def stop_music(self):
         """Stop the currently playing music"""
-        pygame.mixer.music.stop()
+        if self.enabled:
+            pygame.mixer.music.stop()
     
     def play_sound(self, sound_name):
-        """Play a sound effect"""
-        if sound_name in self.sounds:
-            print(f"Playing sound: {sound_name}")
-            self.sounds[sound_name].play()
+        """Play a sound effect on its category's voices
+
+        Returns the channel used, or None if the sound was rate limited or
+        every voice was busy with a higher priority sound.
+        """
+        sound = self.sounds.get(sound_name)
+        if sound is None:
+            return None
+        
+        category, priority, min_interval = SOUND_SETTINGS.get(sound_name, DEFAULT_SOUND_SETTING)
+        
+        # Rate limit repeats of the same sound
+        now = pygame.time.get_ticks()
+        last = self.last_played.get(sound_name)
+        if last is not None and now - last < min_interval:
+            return None
+        
+        index = self._pick_voice(category, priority)
+        if index is None:
+            return None
+        
+        channel = self.channel_groups[category][index]
+        channel.play(sound)
+        self.voices[category][index] = (priority, now)
+        self.last_played[sound_name] = now
+        return channel
+    
+    def _pick_voice(self, category, priority):
+        """Pick a free voice, or steal the lowest priority, oldest one"""
+        channels = self.channel_groups.get(category)
+        if not channels:
+            return None
+        
+        voices = self.voices[category]
+        victim = None
+        for index, channel in enumerate(channels):
+            if not channel.get_busy():
+                return index
+            if voices[index][0] <= priority and (victim is None or voices[index] < voices[victim]):
+                victim = index
+        return victim
     
     def toggle_mute(self):
         """Toggle mute/unmute for background music only"""
         self.muted = not self.muted
+        if not self.enabled:
+            return
         pygame.mixer.music.set_volume(0 if self.muted else self.music_volume)
         print("Music muted" if self.muted else "Music unmuted")
     
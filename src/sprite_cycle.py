@@ -0,0 +1,47 @@
+"""
+Precomputed animation cycles for procedurally drawn sprites
+
+Sprites drawn with pygame.draw instead of loaded from images (the level
+exit portal, enemy decorations) used to redraw themselves every frame,
+although their animation repeats exactly every loop. An AnimationCycle
+renders one loop into a table of frames once. The sprite then only picks
+the frame for its animation time, so steady-state frames allocate nothing.
+
+Cycles are shared by key: every sprite of a kind uses the same frames,
+built the first time a level containing one is loaded. Frames are never
+drawn into after they are built, so they can be handed to the render
+thread as they are.
+"""
+import pygame
+
+class AnimationCycle:
+    """One loop of an animation, rendered into frame_count frames"""
+
+    def __init__(self, size, frame_count, period, draw_frame):
+        """draw_frame(surface, phase) draws the frame at phase in [0, 1)
+
+        period is the length of one loop in the sprite's animation time
+        units.
+        """
+        self.period = period
+        self.frames = []
+        for i in range(frame_count):
+            surface = pygame.Surface(size)
+            draw_frame(surface, i / frame_count)
+            self.frames.append(surface)
+
+    def frame_at(self, time):
+        """Return the frame showing animation time"""
+        index = int(time / self.period * len(self.frames)) % len(self.frames)
+        return self.frames[index]
+
+# Cycles built so far, by key
+_cycles = {}
+
+def get_cycle(key, size, frame_count, period, draw_frame):
+    """Return the shared cycle for key, rendering it the first time it is asked for"""
+    cycle = _cycles.get(key)
+    if cycle is None:
+        cycle = AnimationCycle(size, frame_count, period, draw_frame)
+        _cycles[key] = cycle
+    return cycle
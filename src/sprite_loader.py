@@ -1,21 +1,8 @@
 import pygame
-import os
-import sys
+from src.assets import get_assets
 
-# Try to import the resource_path function
-try:
-    from resource_path import resource_path
-except ImportError:
-    # If not available, define it here
-    def resource_path(relative_path):
-        """Get absolute path to resource, works for dev and for PyInstaller"""
-        try:
-            # PyInstaller creates a temp folder and stores path in _MEIPASS
-            base_path = sys._MEIPASS
-        except Exception:
-            base_path = os.path.abspath(".")
-        
-        return os.path.join(base_path, relative_path)
+# Player sprite sheets, inside the game assets
+PLAYER_SPRITE_DIR = 'images/player/'
 
 class SpriteLoader:
     """Utility class for loading and managing sprites"""
@@ -36,25 +23,14 @@ class SpriteLoader:
             'wall_slide_left': []
         }
         
-        # Try to load sprites from assets directory
+        # Try to load sprites from the game assets
         try:
-            # Check if player sprites directory exists
-            player_dir = resource_path(os.path.join('assets', 'images', 'player'))
-            print(f"Looking for player sprites in: {player_dir}")
-            
-            if os.path.exists(player_dir):
-                print(f"Player directory exists: {player_dir}")
-                # List all files in the directory to debug
-                try:
-                    files = os.listdir(player_dir)
-                    print(f"Files in player directory: {files}")
-                except Exception as e:
-                    print(f"Error listing directory: {e}")
-                
-                # Load sprites from files
-                SpriteLoader._load_sprites_from_directory(sprites, player_dir)
+            assets = get_assets()
+            if assets.exists(PLAYER_SPRITE_DIR + 'Pink_Monster_Idle_4.png'):
+                # Load sprites from the sprite sheets
+                SpriteLoader._load_sprites_from_assets(sprites, assets)
             else:
-                print(f"Player directory does not exist: {player_dir}")
+                print("Player sprites not found, using placeholders")
                 # Create placeholder sprites
                 SpriteLoader._create_placeholder_sprites(sprites)
                 
@@ -63,15 +39,11 @@ class SpriteLoader:
             # Create placeholder sprites as fallback
             SpriteLoader._create_placeholder_sprites(sprites)
         
-        # Verify that sprites were loaded
-        for key, frames in sprites.items():
-            print(f"Sprite {key}: {len(frames)} frames")
-            
         return sprites
     
     @staticmethod
-    def _load_sprites_from_directory(sprites, directory):
-        """Load sprites from files in the given directory"""
+    def _load_sprites_from_assets(sprites, assets):
+        """Load sprites from the player sprite sheets in the game assets"""
 
         # For each animation type, look for sprite sheets or individual frames
         sprite_files = {
@@ -84,14 +56,12 @@ class SpriteLoader:
 
         # Try to load each sprite type
         for anim_type, filename in sprite_files.items():
-            full_path = os.path.join(directory, filename)
-            print(f"Checking for sprite file: {full_path}")
+            name = PLAYER_SPRITE_DIR + filename
             
-            if os.path.exists(full_path):
-                print(f"Loading sprite file: {full_path}")
+            if assets.exists(name):
                 try:
                     # Load the sprite sheet
-                    sprite_sheet = pygame.image.load(full_path).convert_alpha()
+                    sprite_sheet = assets.load_image(name).convert_alpha()
 
                     # Get frame count from filename (e.g., "Pink_Monster_Run_6.png" has 6 frames)
                     frame_count = int(filename.split('_')[-1].split('.')[0])
@@ -111,12 +81,10 @@ class SpriteLoader:
                     sprites[f'{anim_type}_right'] = frames
                     # Create flipped versions for left-facing animations
                     sprites[f'{anim_type}_left'] = [pygame.transform.flip(frame, True, False) for frame in frames]
-                    
-                    print(f"Successfully loaded {len(frames)} frames for {anim_type}")
                 except Exception as e:
                     print(f"Error loading sprite {filename}: {e}")
             else:
-                print(f"Sprite file not found: {full_path}")
+                print(f"Sprite file not found: {name}")
     @staticmethod
     def _create_placeholder_sprites(sprites):
         """Create placeholder sprites when assets are not available"""
@@ -0,0 +1,55 @@
+"""
+Startup profiling
+
+STARTUP records how long each phase of a launch takes, up to the first menu
+frame on screen. The phases are marked where they happen:
+- imports: pygame and the game modules
+- pygame_init: pygame.init(), which starts the video and mixer subsystems
+- display: opening the window
+- audio: setting up the mixer channels and loading or synthesizing sounds
+- player: player sprites
+- levels: building every level
+- setup: fonts, render surfaces, glitch engine and quality preset
+- first_frame: simulating and drawing the first menu frame
+
+Run `python main.py --profile-startup` to print the breakdown and exit after
+the first frame. bench_startup.py launches the game that way in a fresh
+process, adds interpreter start-up, and checks the total against
+STARTUP_BUDGET_MS.
+"""
+import json
+import time
+
+# Printed before the JSON breakdown so a parent process can find it
+REPORT_PREFIX = 'STARTUP '
+
+class StartupProfiler:
+    """Times consecutive startup phases"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.phases = []
+
+    def mark(self, phase):
+        """End the current phase, naming it"""
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self.last) * 1000))
+        self.last = now
+
+    @property
+    def total_ms(self):
+        return (self.last - self.start) * 1000
+
+    def report(self):
+        """Return the breakdown as printable lines"""
+        lines = [f"{phase:<12} {ms:8.1f} ms" for phase, ms in self.phases]
+        lines.append(f"{'total':<12} {self.total_ms:8.1f} ms")
+        return '\n'.join(lines)
+
+    def report_json(self):
+        """Return the breakdown as one line for bench_startup.py"""
+        return REPORT_PREFIX + json.dumps({'phases': self.phases, 'total_ms': self.total_ms})
+
+# Started when first imported, which main.py does before importing pygame
+STARTUP = StartupProfiler()
@@ -0,0 +1,52 @@
+"""
+Per-tick simulation state hashes
+
+state_hash reduces the gameplay state of a game to a 32-bit CRC. It covers
+the state rewind captures (player, enemies, projectiles, platforms, glitch
+engine, without its cosmetic fields) plus the game state, level, score and
+lives. A Game created with hash_state=True appends one hash per simulation
+tick to game.state_hashes, so two runs of the same seed and inputs can be
+compared tick by tick and first_divergence reports where they part.
+Cosmetic state is left out, so drawing and performance changes can be
+shown not to change gameplay.
+"""
+import zlib
+from array import array
+from src.rewind import capture_state, FIELD_OFFSETS
+
+# Glitch engine fields drawn from the visual stream. Rewind restores them,
+# but they are not gameplay
+COSMETIC_FIELDS = ('engine.color_shift_r', 'engine.color_shift_g', 'engine.color_shift_b',
+                   'engine.shake_amount', 'engine.pixel_size')
+COSMETIC_OFFSETS = [FIELD_OFFSETS[name] for name in COSMETIC_FIELDS]
+
+# Game states, so the current one can be hashed as a number
+GAME_STATES = ('menu', 'playing', 'game_over', 'level_complete', 'game_completed')
+
+def state_hash(game):
+    """Return a CRC-32 of the game's gameplay state"""
+    state, projectiles = capture_state(game)
+    for index in COSMETIC_OFFSETS:
+        state[index] = 0
+    summary = array('q', (GAME_STATES.index(game.game_state), game.current_level_index, game.score, game.lives))
+    crc = zlib.crc32(state)
+    crc = zlib.crc32(projectiles, crc)
+    return zlib.crc32(summary, crc)
+
+def first_divergence(hashes, other):
+    """Return the first tick at which two runs' hashes differ, or None if they match"""
+    for tick, (a, b) in enumerate(zip(hashes, other)):
+        if a != b:
+            return tick
+    if len(hashes) != len(other):
+        return min(len(hashes), len(other))
+    return None
+
+def encode_hashes(hashes):
+    """Pack a list of hashes into a hex string for JSON files"""
+    return array('I', hashes).tobytes().hex()
+
+def decode_hashes(text):
+    hashes = array('I')
+    hashes.frombytes(bytes.fromhex(text))
+    return hashes.tolist()
@@ -0,0 +1,241 @@
+"""
+Procedural sound effects and music
+
+Sounds are described by small parameter dictionaries:
+
+    {
+        'volume': 0.6,              # Peak level after normalization
+        'crush': 0,                 # Bits removed for a lo-fi sound (0 = off)
+        'voices': [{
+            'wave': 'square',       # sine, square, triangle, saw or noise
+            'beat': 0.1,            # Seconds per beat
+            'notes': [[440, 220, 1], ...],  # [start Hz, end Hz, beats]; 0 Hz rests
+            'attack': 0.005,        # Per-note fade in (seconds)
+            'release': 0.05,        # Per-note fade out (seconds)
+            'gain': 1.0,            # Level of this voice in the mix
+            'noise': 0.0,           # Amount of white noise mixed into the voice
+        }],
+    }
+
+Rendering is vectorized with NumPy (a dependency in requirements.txt), which
+is only imported on a cache miss. An install without it falls back to a
+pure-Python loop. The two backends draw their noise differently, so the
+backend is part of the cache key. Rendered audio is written as a 16-bit mono
+WAV to the user cache directory under a hash of its parameters and backend,
+so each sound is synthesized once per machine and later launches just load
+the file.
+"""
+import hashlib
+import importlib.util
+import json
+import math
+import os
+import random
+from array import array
+from src.constants import AUDIO_FREQUENCY
+from src.config import CACHE_DIR
+
+# Bump when rendering changes so stale cache files are not reused
+SYNTH_VERSION = 2
+
+SYNTH_CACHE_DIR = os.path.join(CACHE_DIR, 'audio')
+
+# Sound effects for keys that have no audio asset
+SFX_PRESETS = {
+    'glitch': {
+        'volume': 0.6,
+        'crush': 10,
+        'voices': [
+            {'wave': 'square', 'beat': 0.03, 'notes': [[1200, 300, 2], [0, 0, 1], [900, 1800, 2], [200, 80, 4]],
+             'attack': 0.002, 'release': 0.01, 'gain': 1.0, 'noise': 0.3},
+        ],
+    },
+    'land': {
+        'volume': 0.5,
+        'crush': 0,
+        'voices': [
+            {'wave': 'noise', 'beat': 0.06, 'notes': [[0, 0, 1]],
+             'attack': 0.001, 'release': 0.05, 'gain': 0.6, 'noise': 0.0},
+            {'wave': 'sine', 'beat': 0.06, 'notes': [[160, 50, 1]],
+             'attack': 0.001, 'release': 0.05, 'gain': 1.0, 'noise': 0.0},
+        ],
+    },
+    'level_complete': {
+        'volume': 0.6,
+        'crush': 0,
+        'voices': [
+            {'wave': 'square', 'beat': 0.09,
+             'notes': [[523.25, 523.25, 1], [659.25, 659.25, 1], [783.99, 783.99, 1], [1046.5, 1046.5, 3]],
+             'attack': 0.004, 'release': 0.04, 'gain': 0.7, 'noise': 0.0},
+            {'wave': 'triangle', 'beat': 0.09, 'notes': [[261.63, 261.63, 6]],
+             'attack': 0.01, 'release': 0.2, 'gain': 0.5, 'noise': 0.0},
+        ],
+    },
+}
+
+# Music loops used when no music file is available
+MUSIC_PRESETS = {
+    'background': {
+        'volume': 0.5,
+        'crush': 0,
+        'voices': [
+            # C major scale melody, like the old placeholder
+            {'wave': 'sine', 'beat': 0.5,
+             'notes': [[f, f, 1] for f in (261.63, 293.66, 329.63, 349.23, 392.00, 440.00, 493.88, 523.25)],
+             'attack': 0.01, 'release': 0.08, 'gain': 0.8, 'noise': 0.0},
+            {'wave': 'triangle', 'beat': 1.0,
+             'notes': [[130.81, 130.81, 1], [174.61, 174.61, 1], [196.00, 196.00, 1], [130.81, 130.81, 1]],
+             'attack': 0.02, 'release': 0.2, 'gain': 0.5, 'noise': 0.0},
+        ],
+    },
+}
+
+def synth_backend():
+    """Name of the backend this install renders with, found without importing numpy"""
+    return 'numpy' if importlib.util.find_spec('numpy') is not None else 'python'
+
+def params_hash(params, sample_rate=AUDIO_FREQUENCY, backend='numpy'):
+    """Stable hash of a sound description as rendered by a backend, used as its cache key"""
+    key = json.dumps({'params': params, 'rate': sample_rate, 'backend': backend, 'version': SYNTH_VERSION},
+                     sort_keys=True)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+def render(params, sample_rate=AUDIO_FREQUENCY, backend=None):
+    """Render a sound description to a list-like of 16-bit samples"""
+    if (backend or synth_backend()) == 'python':
+        return _render_python(params, sample_rate)
+    import numpy
+    return _render_numpy(numpy, params, sample_rate)
+
+def _note_samples(note, beat, sample_rate):
+    return int(note[2] * beat * sample_rate)
+
+def _render_numpy(np, params, sample_rate):
+    rng = np.random.default_rng(int(params_hash(params, sample_rate, 'numpy'), 16))
+    voices = []
+    for voice in params['voices']:
+        parts = []
+        for note in voice['notes']:
+            n = _note_samples(note, voice['beat'], sample_rate)
+            if n <= 0:
+                continue
+            if note[0] <= 0 and voice['wave'] != 'noise':
+                parts.append(np.zeros(n))
+                continue
+
+            # Linear pitch sweep, integrated to a phase in cycles
+            freq = np.linspace(note[0], note[1], n, endpoint=False)
+            phase = np.cumsum(freq) / sample_rate
+            wave_name = voice['wave']
+            if wave_name == 'sine':
+                samples = np.sin(2 * np.pi * phase)
+            elif wave_name == 'square':
+                samples = np.where((phase % 1.0) < 0.5, 1.0, -1.0)
+            elif wave_name == 'triangle':
+                samples = 4 * np.abs((phase % 1.0) - 0.5) - 1
+            elif wave_name == 'saw':
+                samples = 2 * (phase % 1.0) - 1
+            else:
+                samples = rng.uniform(-1, 1, n)
+            if voice['noise']:
+                samples = samples * (1 - voice['noise']) + rng.uniform(-1, 1, n) * voice['noise']
+
+            # Per-note attack and release
+            envelope = np.ones(n)
+            attack = min(n, int(voice['attack'] * sample_rate))
+            release = min(n - attack, int(voice['release'] * sample_rate))
+            if attack:
+                envelope[:attack] = np.linspace(0, 1, attack, endpoint=False)
+            if release:
+                envelope[n - release:] = np.linspace(1, 0, release)
+            parts.append(samples * envelope)
+        if parts:
+            voices.append(np.concatenate(parts) * voice['gain'])
+
+    length = max((len(v) for v in voices), default=0)
+    mix = np.zeros(length)
+    for v in voices:
+        mix[:len(v)] += v
+
+    peak = np.max(np.abs(mix)) if length else 0
+    if peak > 0:
+        mix = mix / peak * params['volume']
+    pcm = (mix * 32767).astype(np.int16)
+    if params['crush']:
+        pcm = (pcm >> params['crush']) << params['crush']
+    return pcm
+
+def _render_python(params, sample_rate):
+    rng = random.Random(int(params_hash(params, sample_rate, 'python'), 16))
+    voices = []
+    for voice in params['voices']:
+        samples = []
+        for note in voice['notes']:
+            n = _note_samples(note, voice['beat'], sample_rate)
+            attack = min(n, int(voice['attack'] * sample_rate))
+            release = min(n - attack, int(voice['release'] * sample_rate))
+            rest = note[0] <= 0 and voice['wave'] != 'noise'
+            phase = 0.0
+            for i in range(n):
+                if rest:
+                    samples.append(0.0)
+                    continue
+                phase += (note[0] + (note[1] - note[0]) * i / n) / sample_rate
+                cycle = phase % 1.0
+                wave_name = voice['wave']
+                if wave_name == 'sine':
+                    value = math.sin(2 * math.pi * phase)
+                elif wave_name == 'square':
+                    value = 1.0 if cycle < 0.5 else -1.0
+                elif wave_name == 'triangle':
+                    value = 4 * abs(cycle - 0.5) - 1
+                elif wave_name == 'saw':
+                    value = 2 * cycle - 1
+                else:
+                    value = rng.uniform(-1, 1)
+                if voice['noise']:
+                    value = value * (1 - voice['noise']) + rng.uniform(-1, 1) * voice['noise']
+                if i < attack:
+                    value *= i / attack
+                elif i >= n - release:
+                    value *= (n - i) / release
+                samples.append(value * voice['gain'])
+        voices.append(samples)
+
+    length = max((len(v) for v in voices), default=0)
+    mix = [0.0] * length
+    for v in voices:
+        for i, value in enumerate(v):
+            mix[i] += value
+
+    peak = max((abs(v) for v in mix), default=0)
+    scale = params['volume'] / peak * 32767 if peak > 0 else 0
+    crush = params['crush']
+    pcm = array('h', [0] * length)
+    for i, value in enumerate(mix):
+        sample = int(value * scale)
+        if crush:
+            sample = (sample >> crush) << crush
+        pcm[i] = sample
+    return pcm
+
+def get_cached_path(params, sample_rate=AUDIO_FREQUENCY, cache_dir=SYNTH_CACHE_DIR):
+    """Return the path of a rendered WAV for params, rendering it if needed"""
+    backend = synth_backend()
+    path = os.path.join(cache_dir, f"{params_hash(params, sample_rate, backend)}.wav")
+    if os.path.exists(path):
+        return path
+
+    pcm = render(params, sample_rate, backend)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Write to a temporary file first so a crash never leaves a partial cache entry
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    import wave  # Only needed on a cache miss
+    with wave.open(temp_path, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm.tobytes())
+    os.replace(temp_path, path)
+    return path
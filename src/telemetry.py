@@ -0,0 +1,240 @@
+"""
+Gameplay telemetry
+
+Each session records frame times, deaths (position and cause), glitch
+activations, level completions and the score into a Telemetry stream.
+
+Events go into a preallocated ring buffer on the game thread. Recording one
+only stores a few numbers and advances a counter, and never touches a file
+or takes a lock. A background writer drains the buffer every
+TELEMETRY_FLUSH_INTERVAL seconds into files in TELEMETRY_DIR. The files are
+JSON lines or compact binary records, and a new file is started every
+TELEMETRY_FILE_BYTES. Only the newest TELEMETRY_MAX_FILES files are kept.
+If the writer falls a whole buffer behind, new events are dropped and
+counted instead of blocking the game.
+
+Every file starts with the session metadata, so each one can be read on its
+own with read_telemetry(). bench_telemetry.py checks that recording stays
+within TELEMETRY_EVENT_BUDGET_US per event.
+"""
+import os
+import json
+import time
+import struct
+import threading
+from src.constants import *
+from src.config import TELEMETRY_DIR
+
+# Event kinds and the meaning of their value fields
+FRAME = 0
+DEATH = 1
+GLITCH = 2
+LEVEL_COMPLETE = 3
+SESSION_END = 4
+
+EVENT_NAMES = ('frame', 'death', 'glitch', 'level_complete', 'session_end')
+EVENT_FIELDS = (
+    ('frame_ms',),                    # Update and render time of the frame
+    ('x', 'y', 'cause', 'level'),     # Player position, index into DEATH_CAUSES, level index
+    ('glitch',),                      # Index into the session's glitch names
+    ('level', 'seconds', 'bonus'),    # Level index, time taken, time bonus
+    (),
+)
+DEATH_CAUSES = ('enemy', 'fall')
+
+# Binary files: magic, metadata length, JSON metadata, then fixed records of
+# (seconds, frame, kind, score, a, b, c, d)
+BINARY_MAGIC = b'GRT1'
+RECORD = struct.Struct('<dIBi4f')
+HEADER_LENGTH = struct.Struct('<I')
+
+FILE_EXTENSIONS = {'jsonl': '.jsonl', 'binary': '.bin'}
+
+class Telemetry:
+    """Ring buffer of session events, drained to disk by a background writer
+
+    Slots between flushed and written hold events not yet written to disk.
+    Only the game thread advances written and only the writer advances
+    flushed, so the two never wait for each other.
+    """
+
+    def __init__(self, enabled=TELEMETRY_ENABLED, directory=TELEMETRY_DIR, file_format=TELEMETRY_FORMAT,
+                 capacity=TELEMETRY_CAPACITY, file_bytes=TELEMETRY_FILE_BYTES, max_files=TELEMETRY_MAX_FILES):
+        self.enabled = enabled
+        self.directory = directory
+        self.file_format = file_format
+        self.capacity = capacity
+        self.file_bytes = file_bytes
+        self.max_files = max_files
+
+        # Preallocated event storage
+        self.times = [0.0] * capacity
+        self.frames = [0] * capacity
+        self.kinds = [0] * capacity
+        self.scores = [0] * capacity
+        self.a = [0.0] * capacity
+        self.b = [0.0] * capacity
+        self.c = [0.0] * capacity
+        self.d = [0.0] * capacity
+        self.written = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.start_time = time.perf_counter()
+
+        # Writer state
+        self.meta = {}
+        self.session = time.strftime('%Y%m%d-%H%M%S') + f"-{os.getpid()}"
+        self.part = 0
+        self.file = None
+        self.file_size = 0
+        self.files_written = 0
+        self.wake = threading.Event()
+        self.stopping = False
+        self.writer = None
+
+    @property
+    def pending(self):
+        """Events recorded but not yet written"""
+        return self.written - self.flushed
+
+    def record(self, kind, frame, score, a=0, b=0, c=0, d=0):
+        """Store an event; drops it if the writer is a whole buffer behind"""
+        if not self.enabled:
+            return
+        written = self.written
+        if written - self.flushed >= self.capacity:
+            self.dropped += 1
+            return
+        index = written % self.capacity
+        self.times[index] = time.perf_counter() - self.start_time
+        self.frames[index] = frame
+        self.kinds[index] = kind
+        self.scores[index] = score
+        self.a[index] = a
+        self.b[index] = b
+        self.c[index] = c
+        self.d[index] = d
+        # Publish the event only once its slot is filled in
+        self.written = written + 1
+
+    def start(self, meta):
+        """Start the background writer; meta is written at the top of every file"""
+        if not self.enabled or self.writer is not None:
+            return
+        self.meta = dict(meta, session=self.session, format=self.file_format)
+        self.writer = threading.Thread(target=self._write_loop, name="telemetry", daemon=True)
+        self.writer.start()
+
+    def close(self, frame=0, score=0):
+        """Record the end of the session and write everything still buffered"""
+        if self.writer is None:
+            return
+        self.record(SESSION_END, frame, score)
+        self.stopping = True
+        self.wake.set()
+        self.writer.join()
+        self.writer = None
+        if self.dropped:
+            print(f"Telemetry dropped {self.dropped} events")
+
+    def _write_loop(self):
+        while True:
+            self.wake.wait(TELEMETRY_FLUSH_INTERVAL)
+            self.wake.clear()
+            stopping = self.stopping
+            try:
+                self._drain()
+            except OSError as e:
+                # Telemetry must never take the game down
+                print(f"Telemetry disabled, could not write: {e}")
+                self.enabled = False
+                stopping = True
+            if stopping:
+                break
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def _drain(self):
+        """Write out every event recorded so far"""
+        end = self.written
+        start = self.flushed
+        if start == end:
+            return
+        capacity = self.capacity
+        events = []
+        for n in range(start, end):
+            i = n % capacity
+            events.append((self.times[i], self.frames[i], self.kinds[i], self.scores[i],
+                           self.a[i], self.b[i], self.c[i], self.d[i]))
+        # Copied out, so the game thread may reuse the slots
+        self.flushed = end
+
+        if self.file_format == 'binary':
+            data = b''.join(RECORD.pack(*event) for event in events)
+        else:
+            data = ''.join(json.dumps(event_dict(event), separators=(',', ':')) + '\n' for event in events).encode()
+        self._write(data)
+
+    def _write(self, data):
+        # Start a new file when there is none yet or the current one is full
+        if self.file is None or self.file_size >= self.file_bytes:
+            self._open_next()
+        self.file.write(data)
+        self.file.flush()
+        self.file_size += len(data)
+
+    def _open_next(self):
+        if self.file:
+            self.file.close()
+            self.part += 1
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"telemetry-{self.session}-{self.part:03d}{FILE_EXTENSIONS[self.file_format]}"
+        self.file = open(os.path.join(self.directory, name), 'wb')
+        self.files_written += 1
+
+        meta = json.dumps(dict(self.meta, part=self.part), separators=(',', ':')).encode()
+        if self.file_format == 'binary':
+            header = BINARY_MAGIC + HEADER_LENGTH.pack(len(meta)) + meta
+        else:
+            header = b'{"event":"session","meta":' + meta + b'}\n'
+        self.file.write(header)
+        self.file_size = len(header)
+        self._remove_old_files()
+
+    def _remove_old_files(self):
+        """Delete the oldest telemetry files beyond max_files"""
+        names = sorted(name for name in os.listdir(self.directory) if name.startswith('telemetry-'))
+        for name in names[:max(0, len(names) - self.max_files)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+def event_dict(event):
+    """Turn a (seconds, frame, kind, score, a, b, c, d) record into a named dictionary"""
+    seconds, frame, kind, score = event[:4]
+    result = {'event': EVENT_NAMES[kind], 't': round(seconds, 4), 'frame': frame, 'score': score}
+    for name, value in zip(EVENT_FIELDS[kind], event[4:]):
+        result[name] = round(value, 3)
+    return result
+
+def read_telemetry(path):
+    """Read a telemetry file of either format; returns (meta, list of event dictionaries)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    if data.startswith(BINARY_MAGIC):
+        offset = len(BINARY_MAGIC)
+        (length,) = HEADER_LENGTH.unpack_from(data, offset)
+        offset += HEADER_LENGTH.size
+        meta = json.loads(data[offset:offset + length])
+        offset += length
+        # Ignore a partial record left by a session that was cut off
+        end = offset + (len(data) - offset) // RECORD.size * RECORD.size
+        events = [event_dict(event) for event in RECORD.iter_unpack(data[offset:end])]
+        return meta, events
+
+    lines = data.decode().splitlines()
+    meta = json.loads(lines[0])['meta'] if lines else {}
+    return meta, [json.loads(line) for line in lines[1:]]
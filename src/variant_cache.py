@@ -0,0 +1,88 @@
+"""
+Cached tint and alpha variants of surfaces
+
+Flashes and fades used to copy a sprite and tint it or set its alpha every
+frame. VariantCache keeps the variants it builds, keyed by (weak
+reference to the source surface, effect, quantized level). A flash or fade
+is then a dictionary lookup instead of an allocation. Alpha levels are quantized to VARIANT_ALPHA_STEP,
+so a fade touches a fixed handful of variants however many frames it
+takes.
+
+Memory is bounded by VARIANT_CACHE_BYTES. The cache never keeps a source
+surface alive, so the variants are all the memory it holds and all the
+bound counts. Variants of a source that is gone are never looked up again
+and are evicted like any other. The least recently used variants are
+evicted first. Variants are never drawn into once built, so they can
+be handed to the render thread like any other sprite image.
+"""
+import weakref
+import pygame
+from collections import OrderedDict
+from src.constants import *
+
+class VariantCache:
+    """Least-recently-used cache of derived surfaces, bounded in bytes"""
+
+    def __init__(self, max_bytes=VARIANT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.variants = OrderedDict()
+        self.bytes = 0
+
+        # Counts for the debug overlay
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, surface, effect, level, build):
+        """Return the variant of surface for (effect, level), built by build(surface, level) on a miss"""
+        # References to a live surface compare and hash like the surface
+        key = (weakref.ref(surface), effect, level)
+        variant = self.variants.get(key)
+        if variant is not None:
+            self.variants.move_to_end(key)
+            self.hits += 1
+            return variant
+
+        self.misses += 1
+        variant = build(surface, level)
+        self.variants[key] = variant
+        self.bytes += surface_bytes(variant)
+
+        # Evict the least recently used variants, but always keep the new one
+        while self.bytes > self.max_bytes and len(self.variants) > 1:
+            _, old = self.variants.popitem(last=False)
+            self.bytes -= surface_bytes(old)
+            self.evictions += 1
+        return variant
+
+    def faded(self, surface, alpha):
+        """Return surface drawn at a surface alpha, quantized to VARIANT_ALPHA_STEP"""
+        level = min(255, max(0, round(alpha / VARIANT_ALPHA_STEP) * VARIANT_ALPHA_STEP))
+        if level >= 255:
+            return surface
+        return self.get(surface, 'alpha', level, build_faded)
+
+    def flashed(self, surface, strength=128):
+        """Return surface with every channel, alpha included, multiplied by strength/255"""
+        return self.get(surface, 'flash', strength, build_flashed)
+
+    def clear(self):
+        self.variants.clear()
+        self.bytes = 0
+
+def surface_bytes(surface):
+    width, height = surface.get_size()
+    return width * height * surface.get_bytesize()
+
+def build_faded(surface, level):
+    variant = surface.copy()
+    variant.set_alpha(level)
+    return variant
+
+def build_flashed(surface, level):
+    variant = surface.copy()
+    variant.fill((255, 255, 255, level), None, pygame.BLEND_RGBA_MULT)
+    return variant
+
+# Variants shared by all sprites
+VARIANTS = VariantCache()
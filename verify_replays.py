@@ -0,0 +1,105 @@
+"""
+Batch verification of recorded Glitch Runner sessions
+
+Re-simulates every replay in a directory headlessly across a process pool and
+compares the final score, lives and level with what the cabinet claimed, and
+the gameplay state of every tick with the recorded state hashes.
+
+Usage: python verify_replays.py REPLAY_DIR [--workers N] [--report FILE]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+# Add the current directory to the path to ensure imports work
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.env import init_headless
+from src.replay import load_replay, simulate_replay
+
+def verify_replay(path):
+    """Re-simulate one replay and compare it with its claim"""
+    start = time.perf_counter()
+    result = {'path': path}
+    try:
+        replay = load_replay(path)
+        actual = simulate_replay(replay)
+        claimed = replay['claimed']
+        mismatches = [key for key in ('score', 'lives', 'level') if claimed[key] != actual[key]]
+        if actual['diverged_at'] is not None:
+            mismatches.append('state')
+        result.update({
+            'status': 'ok' if not mismatches else 'mismatch',
+            'claimed': claimed,
+            'actual': actual,
+            'mismatches': mismatches,
+        })
+    except Exception as e:
+        result.update({'status': 'error', 'error': f"{type(e).__name__}: {e}"})
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+def find_replays(directory):
+    """List replay files in a directory, sorted for a stable report"""
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith('.json')
+    )
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Verify recorded Glitch Runner sessions")
+    parser.add_argument('directory', help="directory of recorded sessions")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+    parser.add_argument('--report', help="write the full per-replay report as JSON to this file")
+    args = parser.parse_args()
+    
+    paths = find_replays(args.directory)
+    if not paths:
+        print(f"No replays found in {args.directory}")
+        return 1
+    
+    print(f"Verifying {len(paths)} replays with {args.workers} workers...")
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_headless) as pool:
+        # Larger chunks keep the pool busy without per-replay IPC round trips
+        chunksize = max(1, len(paths) // (args.workers * 4))
+        for result in pool.map(verify_replay, paths, chunksize=chunksize):
+            results.append(result)
+            line = f"{result['status'].upper():8} {result['seconds'] * 1000:8.1f} ms  {os.path.basename(result['path'])}"
+            if result['status'] == 'mismatch':
+                line += "  " + ", ".join(
+                    f"state diverged at tick {result['actual']['diverged_at']}" if key == 'state' else
+                    f"{key}: claimed {result['claimed'][key]}, got {result['actual'][key]}"
+                    for key in result['mismatches']
+                )
+            elif result['status'] == 'error':
+                line += f"  {result['error']}"
+            print(line)
+    elapsed = time.perf_counter() - start
+    
+    # Summary report
+    counts = {status: sum(1 for r in results if r['status'] == status) for status in ('ok', 'mismatch', 'error')}
+    replay_seconds = [r['seconds'] for r in results]
+    print("\n=== Summary ===")
+    print(f"Replays:     {len(results)}")
+    print(f"Verified:    {counts['ok']}")
+    print(f"Mismatched:  {counts['mismatch']}")
+    print(f"Errors:      {counts['error']}")
+    print(f"Wall time:   {elapsed:.2f} s ({len(results) / elapsed:.1f} replays/s)")
+    print(f"Per replay:  mean {sum(replay_seconds) / len(replay_seconds) * 1000:.1f} ms, max {max(replay_seconds) * 1000:.1f} ms")
+    
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'summary': dict(counts, replays=len(results), seconds=elapsed), 'results': results}, f, indent=2)
+        print(f"Report written to: {args.report}")
+    
+    return 0 if counts['ok'] == len(results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())